@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from betfair.network import Network
+from betfair.testing import StubServer
+
+
+@pytest.fixture(scope='module')
+def stub_server():
+    server = StubServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def network(stub_server):
+    network = Network(
+        app_key='test', session_token='secret', api_url=stub_server.url)
+    yield network
+    network.close()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Deterministic, realistically shaped Betfair response payloads (camel-cased
+JSON, as returned by the API) and request parameters for benchmarks.
+
+"""
+
+import random
+
+from betfair import models, ticks
+from betfair.constants import OrderType, PersistenceType, Side
+
+
+def _ladder(rng, start, step, depth):
+    return [
+        {
+            'price': round(start + step * idx, 2),
+            'size': round(rng.uniform(2, 500), 2),
+        }
+        for idx in range(depth)
+    ]
+
+
+def market_book(market_id='1.118300217', runners=10, depth=3, seed=0):
+    """Build a `listMarketBook` result entry.
+
+    :param str market_id:
+    :param int runners: Number of runners
+    :param int depth: Ladder depth per side; `EX_ALL_OFFERS` books are
+        typically 10-50 levels deep
+    :param int seed: Random seed
+
+    """
+    rng = random.Random(seed)
+    return {
+        'marketId': market_id,
+        'isMarketDataDelayed': False,
+        'status': 'OPEN',
+        'betDelay': 0,
+        'bspReconciled': False,
+        'complete': True,
+        'inplay': False,
+        'numberOfWinners': 1,
+        'numberOfRunners': runners,
+        'numberOfActiveRunners': runners,
+        'lastMatchTime': '2015-04-14T10:59:33.000Z',
+        'totalMatched': round(rng.uniform(1000, 100000), 2),
+        'totalAvailable': round(rng.uniform(1000, 100000), 2),
+        'crossMatching': True,
+        'runnersVoidable': False,
+        'version': 1000 + seed,
+        'runners': [
+            {
+                'selectionId': 1000 + idx,
+                'handicap': 0.0,
+                'status': 'ACTIVE',
+                'lastPriceTraded': 2.0 + idx,
+                'totalMatched': round(rng.uniform(10, 10000), 2),
+                'ex': {
+                    'availableToBack': _ladder(rng, 2.0 + idx, -0.02, depth),
+                    'availableToLay': _ladder(rng, 2.02 + idx, 0.02, depth),
+                    'tradedVolume': _ladder(rng, 1.5 + idx, 0.02, depth * 2),
+                },
+            }
+            for idx in range(runners)
+        ],
+    }
+
+
+def list_market_book(markets=10, runners=10, depth=3):
+    """Build a full `listMarketBook` result list."""
+    return [
+        market_book('1.1{0:08d}'.format(idx), runners, depth, seed=idx)
+        for idx in range(markets)
+    ]
+
+
+def market_catalogue(market_id='1.118300217', runners=10, seed=0):
+    """Build a `listMarketCatalogue` result entry with `MARKET_DESCRIPTION`,
+    `EVENT` and `RUNNER_METADATA` projections.
+
+    :param str market_id:
+    :param int runners: Number of runners
+    :param int seed: Random seed
+
+    """
+    rng = random.Random(seed)
+    return {
+        'marketId': market_id,
+        'marketName': 'R{0} {1}m Hcap'.format(seed % 10, 1000 + seed),
+        'marketStartTime': '2015-04-14T13:30:00.000Z',
+        'totalMatched': round(rng.uniform(1000, 100000), 2),
+        'description': {
+            'persistenceEnabled': True,
+            'bspMarket': True,
+            'marketTime': '2015-04-14T13:30:00.000Z',
+            'suspendTime': '2015-04-14T13:30:00.000Z',
+            'bettingType': 'ODDS',
+            'turnInPlayEnabled': True,
+            'marketType': 'WIN',
+            'regulator': 'GIBRALTAR REGULATOR',
+            'marketBaseRate': 5.0,
+            'discountAllowed': True,
+            'wallet': 'UK wallet',
+            'rules': '<br>Market information text. ' * 20,
+            'rulesHasDate': True,
+        },
+        'event': {
+            'id': str(27400000 + seed),
+            'name': 'Ascot 14th Apr',
+            'countryCode': 'GB',
+            'timezone': 'Europe/London',
+            'venue': 'Ascot',
+            'openDate': '2015-04-14T13:30:00.000Z',
+        },
+        'runners': [
+            {
+                'selectionId': 1000 + idx,
+                'runnerName': 'Runner {0}'.format(idx),
+                'handicap': 0.0,
+                'sortPriority': idx + 1,
+                'metadata': {
+                    'WEIGHT_VALUE': str(rng.randint(120, 150)),
+                    'JOCKEY_NAME': 'Jockey {0}'.format(idx),
+                    'TRAINER_NAME': 'Trainer {0}'.format(idx),
+                    'AGE': str(rng.randint(2, 9)),
+                    'CLOTH_NUMBER': str(idx + 1),
+                    'FORM': '1-2{0}3'.format(idx % 10),
+                    'DAYS_SINCE_LAST_RUN': str(rng.randint(7, 90)),
+                },
+            }
+            for idx in range(runners)
+        ],
+    }
+
+
+def list_market_catalogue(markets=100, runners=10):
+    """Build a full `listMarketCatalogue` result list."""
+    return [
+        market_catalogue('1.1{0:08d}'.format(idx), runners, seed=idx)
+        for idx in range(markets)
+    ]
+
+
+def response(result):
+    """Wrap a result in a JSON-RPC response object."""
+    return {'jsonrpc': '2.0', 'result': result, 'id': 1}
+
+
+def place_instructions(count=200, seed=0):
+    """Build a `placeOrders` batch of limit orders as `PlaceInstruction`
+    models; Betfair accepts up to 200 instructions per call.
+
+    :param int count: Number of instructions
+    :param int seed: Random seed
+
+    """
+    rng = random.Random(seed)
+    return [
+        models.PlaceInstruction(
+            order_type=OrderType.LIMIT,
+            selection_id=str(1000 + idx % 20),
+            handicap=0.0,
+            side=Side.BACK if idx % 2 else Side.LAY,
+            limit_order=models.LimitOrder(
+                size=round(rng.uniform(2, 100), 2),
+                price=rng.choice(ticks.TICKS[:200]),
+                persistence_type=PersistenceType.LAPSE,
+            ),
+        )
+        for idx in range(count)
+    ]
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Encoding and decoding of `listMarketBook`/`listMarketCatalogue` traffic
+with each installed JSON codec.
+
+"""
+
+import pytest
+
+from betfair import codec
+from betfair import models
+from betfair.constants import PriceData
+from betfair.network import make_json_request
+from betfair.codec import JSONCodec
+from benchmarks import payloads
+
+
+RESPONSES = {
+    'list_market_book': payloads.response(
+        payloads.list_market_book(markets=10, runners=10, depth=10)),
+    'list_market_catalogue': payloads.response(
+        payloads.list_market_catalogue(markets=100, runners=10)),
+}
+
+
+@pytest.mark.parametrize('method', sorted(RESPONSES))
+@pytest.mark.parametrize('name', codec.available_codecs())
+def test_decode(benchmark, name, method):
+    json_codec = codec.get_codec(name)
+    body = JSONCodec().dumps(RESPONSES[method]).encode('utf-8')
+    benchmark.group = 'decode {0}'.format(method)
+    benchmark(json_codec.loads, body)
+
+
+@pytest.mark.parametrize('name', codec.available_codecs())
+def test_encode_market_book_request(benchmark, name):
+    json_codec = codec.get_codec(name)
+    params = {
+        'market_ids': ['1.1{0:08d}'.format(idx) for idx in range(40)],
+        'price_projection': models.PriceProjection(
+            price_data=[PriceData.EX_BEST_OFFERS, PriceData.EX_TRADED]),
+    }
+    benchmark.group = 'encode list_market_book request'
+    benchmark(make_json_request, 'SportsAPING/v1.0/listMarketBook', params,
+              json_codec)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Key inflection on a listMarketBook payload: raw `inflection` calls
+against the per-class tables and memoized fallbacks."""
+
+import inflection
+
+from betfair import models
+from betfair import utils
+from betfair.models import MarketBook, PriceProjection
+from betfair.constants import PriceData
+from benchmarks import payloads
+
+
+def collect_keys(value, keys):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            keys.append(key)
+            collect_keys(item, keys)
+    elif isinstance(value, list):
+        for item in value:
+            collect_keys(item, keys)
+    return keys
+
+
+KEYS = collect_keys(payloads.list_market_book(markets=5, depth=10), [])
+
+
+def test_unserialize_keys_inflection(benchmark):
+    benchmark.group = 'unserialize keys'
+    benchmark(lambda: [inflection.underscore(key) for key in KEYS])
+
+
+def test_unserialize_keys_table(benchmark):
+    benchmark.group = 'unserialize keys'
+    unserialize_key = models.PriceSize.unserialize_key
+    benchmark(lambda: [unserialize_key(key) for key in KEYS])
+
+
+def test_serialize_market_book(benchmark):
+    book = MarketBook(**payloads.market_book(depth=10))
+    benchmark(book.serialize)
+
+
+def test_serialize_params(benchmark):
+    params = {
+        'market_ids': ['1.118300217'],
+        'price_projection': PriceProjection(
+            price_data=[PriceData.EX_BEST_OFFERS, PriceData.EX_TRADED]),
+        'order_projection': None,
+        'match_projection': None,
+        'currency_code': None,
+        'locale': None,
+    }
+    benchmark(utils.serialize_params, params)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Compiled vs generic vs lazy model construction for full-depth market
+books and large market catalogues."""
+
+import pytest
+
+from betfair import models
+from betfair.meta import Model
+from benchmarks import payloads
+
+
+@pytest.mark.parametrize('depth', [3, 10, 50])
+@pytest.mark.parametrize('compiled', [True, False])
+def test_unserialize_market_book(benchmark, monkeypatch, compiled, depth):
+    monkeypatch.setattr(Model, 'compiled', compiled)
+    payload = payloads.market_book(runners=10, depth=depth)
+    benchmark.group = 'market book depth {0}'.format(depth)
+    benchmark(lambda: models.MarketBook(**payload))
+
+
+@pytest.mark.parametrize('depth', [3, 10, 50])
+def test_unserialize_ladder_market_book(benchmark, depth):
+    payload = payloads.market_book(runners=10, depth=depth)
+    benchmark.group = 'market book depth {0}'.format(depth)
+    benchmark(lambda: models.LadderMarketBook(**payload))
+
+
+@pytest.mark.parametrize('depth', [3, 10, 50])
+def test_unserialize_market_book_lazy(benchmark, depth):
+    payload = payloads.market_book(runners=10, depth=depth)
+    benchmark.group = 'market book depth {0}'.format(depth)
+    benchmark(lambda: models.MarketBook.from_dict(payload, lazy=True))
+
+
+@pytest.mark.parametrize('lazy', [True, False])
+def test_market_book_best_price(benchmark, lazy):
+    """Read only the best back price of the first runner."""
+    payload = payloads.market_book(runners=10, depth=10)
+    benchmark.group = 'market book best price'
+
+    def run():
+        book = models.MarketBook.from_dict(payload, lazy=lazy)
+        return book.runners[0].ex.available_to_back[0].price
+    benchmark(run)
+
+
+@pytest.mark.parametrize('runners', [10, 50, 200])
+@pytest.mark.parametrize('lazy', [True, False])
+def test_unserialize_market_catalogue(benchmark, lazy, runners):
+    payload = payloads.market_catalogue(runners=runners)
+    benchmark.group = 'market catalogue {0} runners'.format(runners)
+    benchmark(lambda: models.MarketCatalogue.from_dict(payload, lazy=lazy))
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Per-call latency of `Network.invoke_sync` with pooled sessions, compared
+with the previous one-connection-per-call `requests.post` behaviour, and
+full round trips of realistic `listMarketBook` responses against the local
+stub and replay servers.
+
+Run with ``invoke benchmark`` to save results for comparison, or
+``py.test benchmarks``.
+
+"""
+
+import pytest
+import requests
+
+from betfair import Betfair
+from betfair import models
+from betfair.constants import (
+    Endpoint, Exchange, LIST_MARKET_BOOK, DECODE_MODES,
+)
+from betfair.network import Network
+from betfair.recording import ReplayServer, TrafficRecorder, read_log
+from benchmarks import payloads
+
+
+PARAMS = {'market_ids': ['1.118300217']}
+
+
+def test_requests_post_per_call(benchmark, network):
+    url = network.get_url(Exchange.UK, Endpoint.Betting)
+    data = (
+        '{"jsonrpc": "2.0", "method": "%s", '
+        '"params": {"marketIds": ["1.118300217"]}, "id": 1}'
+        % LIST_MARKET_BOOK
+    )
+    headers = {
+        'Content-Type': 'application/json',
+        'X-Application': network.app_key,
+        'X-Authentication': network.session_token,
+    }
+    benchmark(requests.post, url, data=data, headers=headers)
+
+
+def test_invoke_sync_pooled(benchmark, network):
+    benchmark(
+        network.invoke_sync,
+        Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK, PARAMS)
+
+
+DEPTHS = [3, 10, 50]
+
+
+@pytest.fixture(scope='module')
+def market_book_server(stub_server):
+    """Stub server returning 10 market books at each of `DEPTHS`, keyed by
+    method name `listMarketBook/<depth>`."""
+    stub_server.results.update(
+        ('{0}/{1}'.format(LIST_MARKET_BOOK, depth),
+         payloads.list_market_book(markets=10, runners=10, depth=depth))
+        for depth in DEPTHS
+    )
+    yield stub_server
+
+
+@pytest.mark.parametrize('depth', DEPTHS)
+def test_invoke_sync_market_book(benchmark, network, market_book_server,
+                                 depth):
+    benchmark.group = 'round trip depth {0}'.format(depth)
+    benchmark(
+        network.invoke_sync, Exchange.UK, Endpoint.Betting,
+        '{0}/{1}'.format(LIST_MARKET_BOOK, depth), PARAMS)
+
+
+@pytest.mark.parametrize('decode', DECODE_MODES)
+@pytest.mark.parametrize('depth', DEPTHS)
+def test_list_market_book(benchmark, network, market_book_server, depth,
+                          decode):
+    """`Betfair.make_api_request`, including model construction."""
+    client = Betfair('test', None, Exchange.UK, decode=decode)
+    client.network_client = network
+    benchmark.group = 'round trip depth {0}'.format(depth)
+    benchmark(
+        client.make_api_request, Endpoint.Betting,
+        '{0}/{1}'.format(LIST_MARKET_BOOK, depth), PARAMS,
+        models.MarketBook)
+
+
+@pytest.fixture(scope='module')
+def replay_server(tmpdir_factory, stub_server):
+    """Replay server for a log of 100 recorded market book polls."""
+    path = str(tmpdir_factory.mktemp('replay').join('traffic.log.gz'))
+    stub_server.results[LIST_MARKET_BOOK] = payloads.list_market_book(
+        markets=10, runners=10, depth=10)
+    with TrafficRecorder(path) as recorder:
+        network = Network(
+            app_key='test', session_token='secret', api_url=stub_server.url,
+            recorder=recorder)
+        for idx in range(100):
+            network.invoke_sync(
+                Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK,
+                {'market_ids': ['1.1{0:08d}'.format(idx)]})
+        network.close()
+    server = ReplayServer(list(read_log(path)), speed=None).start()
+    yield server
+    server.stop()
+
+
+def test_replay_market_book(benchmark, replay_server):
+    network = Network(
+        app_key='test', session_token='secret', api_url=replay_server.url)
+    benchmark.group = 'replay'
+    benchmark(
+        network.invoke_sync, Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK,
+        {'market_ids': ['1.100000007']})
+    network.close()
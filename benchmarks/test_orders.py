@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Serialisation of `placeOrders` batches: `Model.serialize`,
+`utils.serialize_params` and JSON-RPC request encoding."""
+
+import pytest
+
+from betfair import utils
+from betfair.constants import PLACE_ORDERS
+from betfair.network import Network
+from benchmarks import payloads
+
+
+SIZES = [1, 20, 200]
+
+
+def place_orders_params(count):
+    return {
+        'market_id': '1.118300217',
+        'instructions': payloads.place_instructions(count),
+        'customer_ref': None,
+    }
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_serialize_instructions(benchmark, count):
+    instructions = payloads.place_instructions(count)
+    benchmark.group = 'serialize {0} instructions'.format(count)
+    benchmark(lambda: [instruction.serialize() for instruction in instructions])
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_serialize_params(benchmark, count):
+    params = place_orders_params(count)
+    benchmark.group = 'serialize {0} instructions'.format(count)
+    benchmark(utils.serialize_params, params)
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_make_json_request(benchmark, count):
+    network = Network(app_key='test', session_token='secret')
+    params = place_orders_params(count)
+    benchmark.group = 'encode {0} instructions'.format(count)
+    benchmark(network._Network__make_json_request, PLACE_ORDERS, params)
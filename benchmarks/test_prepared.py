@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Request encoding of a repeated `listMarketBook` poll: serialising the
+parameters on every call, compared with a `PreparedCall` that only encodes
+the substituted market ids, and the full round trip of each."""
+
+import pytest
+
+from betfair import Betfair
+from betfair import models
+from betfair.constants import (
+    Exchange, LIST_MARKET_BOOK, MatchProjection, OrderProjection, PriceData,
+)
+from betfair.network import Network
+
+
+MARKET_IDS = ['1.1183002{0:02d}'.format(idx) for idx in range(40)]
+
+
+def market_book_params(market_ids):
+    return {
+        'market_ids': market_ids,
+        'price_projection': models.PriceProjection(
+            price_data=[PriceData.EX_BEST_OFFERS, PriceData.EX_TRADED],
+            ex_best_offers_overrides=models.ExBestOffersOverrides(
+                best_prices_depth=3),
+            virtualize=True),
+        'order_projection': OrderProjection.EXECUTABLE,
+        'match_projection': MatchProjection.ROLLED_UP_BY_AVERAGE_PRICE,
+        'currency_code': None,
+        'locale': None,
+    }
+
+
+@pytest.fixture
+def client(network):
+    client = Betfair('test', None, Exchange.UK)
+    client.network_client = network
+    return client
+
+
+def test_encode_per_call(benchmark):
+    network = Network(app_key='test', session_token='secret')
+    params = market_book_params(MARKET_IDS)
+    benchmark.group = 'encode listMarketBook'
+    benchmark(
+        network._Network__make_json_request, LIST_MARKET_BOOK, params)
+
+
+def test_encode_prepared(benchmark, client):
+    prepared = client.prepare('market_ids').list_market_book(
+        **market_book_params(MARKET_IDS))
+    benchmark.group = 'encode listMarketBook'
+    benchmark(prepared.render, market_ids=MARKET_IDS[::-1])
+
+
+def test_round_trip_per_call(benchmark, client):
+    params = market_book_params(MARKET_IDS[:1])
+    benchmark.group = 'round trip listMarketBook'
+    benchmark(client.list_market_book, **params)
+
+
+def test_round_trip_prepared(benchmark, client):
+    prepared = client.prepare('market_ids').list_market_book(
+        **market_book_params(MARKET_IDS[:1]))
+    benchmark.group = 'round trip listMarketBook'
+    benchmark(prepared, market_ids=MARKET_IDS[1:2])
@@ -0,0 +1,826 @@
+# -*- coding: utf-8 -*-
+"""asyncio client for the Betfair API. Requires Python 3.6+ and `aiohttp`.
+
+`AsyncBetfair` mirrors `Betfair` method for method; each call is a coroutine
+and returns the same `models` objects as the synchronous client. All calls
+share one pooled `aiohttp` connector per endpoint, so a single event loop
+can keep many requests in flight at once.
+
+"""
+
+import ssl
+import asyncio
+import collections
+
+import aiohttp
+
+from . import utils
+from . import ticks
+from . import models
+from . import codec as json_codec
+from . import weights
+from . import exceptions
+from .constants import *
+from .network import API_URLS, ENDPOINT_PATHS, IDENTITY_URL
+from .network import make_json_request
+
+
+async def iter_concurrent(func, chunks, concurrency, window=None):
+    """Await `func` for each chunk with at most `window` chunks outstanding
+    and yield the items of each result in chunk order. The asyncio
+    counterpart of `utils.iter_concurrent`.
+
+    :param func: Coroutine function taking one chunk and returning a list
+    :param list chunks: Chunks of arguments, e.g. from `utils.get_chunks`
+    :param int concurrency: Number of requests in flight at once
+    :param int window: Maximum number of outstanding chunks; defaults to
+        twice `concurrency`
+
+    """
+    window = max(window or 2 * concurrency, 1)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(chunk):
+        async with semaphore:
+            return await func(chunk)
+
+    pending = collections.deque()
+    try:
+        for chunk in chunks:
+            if len(pending) >= window:
+                for item in await pending.popleft():
+                    yield item
+            pending.append(asyncio.ensure_future(run(chunk)))
+        while pending:
+            for item in await pending.popleft():
+                yield item
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def iter_pages(fetch, key, from_record=0, prefetch=True,
+                     dedupe_window=1):
+    """Yield the records of a paged method one by one, fetching the next
+    page while the current one is consumed. The asyncio counterpart of
+    `utils.iter_pages`.
+
+    :param fetch: Coroutine function taking `from_record` and returning a
+        report
+    :param str key: Report attribute holding the records
+    :param int from_record: Index of the first record
+    :param bool prefetch: Fetch the next page in the background
+    :param int dedupe_window: Number of previous pages checked for
+        duplicate bet ids
+
+    """
+    def request(start):
+        if prefetch:
+            return asyncio.ensure_future(fetch(start))
+        return fetch(start)
+
+    seen = collections.deque(maxlen=dedupe_window + 1)
+    pending = request(from_record)
+    try:
+        while pending is not None:
+            records, more_available = utils.page_records(await pending, key)
+            from_record += len(records)
+            pending = request(from_record) \
+                if more_available and records else None
+            page_ids = set()
+            seen.append(page_ids)
+            for record in records:
+                bet_id = utils.record_bet_id(record)
+                if bet_id is not None:
+                    if any(bet_id in ids for ids in seen):
+                        continue
+                    page_ids.add(bet_id)
+                yield record
+    finally:
+        if pending is not None:
+            if prefetch:
+                pending.cancel()
+            else:
+                pending.close()
+
+
+class AsyncNetwork(object):
+    """asyncio transport for the Betfair JSON-RPC and identity endpoints.
+
+    :param str app_key: Application key
+    :param str session_token: Session token from a previous login
+    :param cert_file: Client certificate used for non-interactive login; a
+        *.pem file or a tuple of (*.crt, *.key) files
+    :param int pool_maxsize: Maximum number of simultaneous connections per
+        endpoint; 0 for no limit
+    :param float keepalive_timeout: Seconds to keep idle connections open
+    :param str api_url: Override the exchange API root URL
+    :param str identity_url: Override the identity API root URL
+    :param codec: JSON codec, or name of one in `codec.CODECS`; defaults to
+        the fastest installed codec
+
+    """
+    def __init__(self, app_key="", session_token="",
+            cert_file=('certs/betfair.crt', 'certs/betfair.key'),
+            pool_maxsize=100, keepalive_timeout=15, api_url=None,
+            identity_url=None, codec=None):
+        self.app_key = app_key
+        self.session_token = session_token
+        self.cert_file = cert_file
+        self.pool_maxsize = pool_maxsize
+        self.keepalive_timeout = keepalive_timeout
+        self.api_url = api_url
+        self.identity_url = identity_url or IDENTITY_URL
+        self.codec = json_codec.get_codec(codec)
+        self.sessions = {}
+
+    def get_session(self, endpoint):
+        """Get the pooled `aiohttp.ClientSession` for an endpoint, creating
+        it on first use so that it binds to the running event loop.
+
+        :param Endpoint endpoint:
+
+        """
+        session = self.sessions.get(endpoint)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_maxsize,
+                keepalive_timeout=self.keepalive_timeout)
+            session = aiohttp.ClientSession(connector=connector)
+            self.sessions[endpoint] = session
+        return session
+
+    async def close(self):
+        """Close all pooled connections."""
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions = {}
+
+    def get_url(self, exchange, endpoint):
+        url = self.api_url
+        if url is None:
+            url = API_URLS.get(exchange, API_URLS[Exchange.UK])
+        if endpoint == Endpoint.Betting:
+            return url + ENDPOINT_PATHS[Endpoint.Betting]
+        return url + ENDPOINT_PATHS[Endpoint.Account]
+
+    async def invoke(self, exchange, endpoint, method, args, body=False):
+        url = self.get_url(exchange, endpoint)
+        headers = {
+            "Content-Type": "application/json",
+            "X-Application": self.app_key,
+            "X-Authentication": self.session_token or "",
+        }
+        data = make_json_request(method, args, self.codec)
+        session = self.get_session(endpoint)
+        async with session.post(url, data=data, headers=headers) as resp:
+            utils.check_status_code(resp, lambda resp: resp.status == 200)
+            if body:
+                return await resp.read()
+            data = self.codec.loads(await resp.read())
+        return utils.result_or_error(resp, data)
+
+    async def login(self, username, password):
+        """Log in with the client certificate and store the session token.
+
+        :raises: BetfairLoginError
+
+        """
+        context = ssl.create_default_context()
+        if isinstance(self.cert_file, (list, tuple)):
+            context.load_cert_chain(*self.cert_file)
+        else:
+            context.load_cert_chain(self.cert_file)
+        headers = {
+            "X-Application": self.app_key,
+            "Content-Type": "application/x-www-form-urlencoded",
+        }
+        session = self.get_session(Endpoint.Identity)
+        async with session.post(
+                self.identity_url + "certlogin",
+                data={"username": username, "password": password},
+                headers=headers, ssl=context) as resp:
+            data = await resp.json(content_type=None)
+        if data.get("loginStatus") != "SUCCESS":
+            raise exceptions.BetfairLoginError(resp, data)
+        self.session_token = data["sessionToken"]
+
+    async def __identity_request(self, method):
+        headers = {
+            "X-Application": self.app_key,
+            "X-Authentication": self.session_token or "",
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept": "application/json",
+        }
+        session = self.get_session(Endpoint.Identity)
+        async with session.post(
+                self.identity_url + method, headers=headers) as resp:
+            utils.check_status_code(resp, lambda resp: resp.status == 200)
+            data = await resp.json(content_type=None)
+        if data.get("status") != "SUCCESS":
+            raise exceptions.BetfairAuthError(data)
+
+    async def keep_alive(self):
+        await self.__identity_request("keepAlive")
+
+    async def logout(self):
+        await self.__identity_request("logout")
+        self.session_token = None
+
+    def logged_in(self):
+        return self.session_token is not None
+
+
+class AsyncBetfair(object):
+    """asyncio Betfair API client. Takes the same arguments as `Betfair`;
+    extra keyword arguments configure the `AsyncNetwork` transport.
+
+    Use as an async context manager, or await `close` when done, to release
+    pooled connections. `cache` lookups run in the loop's default executor,
+    since backends such as `SqliteCache` block.
+
+    """
+    def __init__(self, app_key, cert_file, exchange, lazy=False,
+                 decode=DECODE_MODEL, cache=None, validate_prices=True,
+                 ladders=False, **network_options):
+        self.app_key = app_key
+        self.cert_file = cert_file
+        self.exchange = exchange
+        self.lazy = lazy
+        self.decode = utils.check_decode(decode)
+        self.cache = cache
+        self.validate_prices = validate_prices
+        self.ladders = ladders
+        if cert_file is not None:
+            network_options.setdefault('cert_file', cert_file)
+        self.network_client = AsyncNetwork(app_key, **network_options)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.network_client.close()
+
+    async def make_api_request(
+            self, endpoint, method, params, model=None, decode=None):
+        """Call a JSON-RPC method and cast the result to `model`.
+
+        :param Endpoint endpoint: `Endpoint.Betting` or `Endpoint.Account`
+        :param str method: JSON-RPC method, e.g. `LIST_MARKET_BOOK`
+        :param dict params: Request parameters
+        :param BetfairModel model: Deserialization format; if `None`, return
+            raw JSON
+        :param str decode: Decoding mode for this call; defaults to the
+            client's `decode`
+
+        """
+        decode = utils.check_decode(decode or self.decode)
+        if decode == DECODE_BYTES:
+            return await self.network_client.invoke(
+                self.exchange, endpoint, method, params, body=True)
+        if self.cache is not None and self.cache.cacheable(method):
+            loop = asyncio.get_event_loop()
+            try:
+                result = await loop.run_in_executor(
+                    None, self.cache.get, self.exchange, method, params)
+            except KeyError:
+                result = await self.network_client.invoke(
+                    self.exchange, endpoint, method, params)
+                await loop.run_in_executor(
+                    None, self.cache.set, self.exchange, method, params,
+                    result)
+        else:
+            result = await self.network_client.invoke(
+                self.exchange, endpoint, method, params)
+        if decode == DECODE_RAW:
+            return result
+        return utils.process_result(result, model, lazy=self.lazy)
+
+    # Authentication methods
+    async def login(self, username, password):
+        """Log in to Betfair. Sets `session_token` if successful.
+
+        :param str username: Username
+        :param str password: Password
+        :raises: BetfairLoginError
+
+        """
+        await self.network_client.login(username, password)
+
+    @utils.requires_login
+    async def keep_alive(self):
+        """Reset session timeout.
+
+        :raises: BetfairAuthError
+
+        """
+        await self.network_client.keep_alive()
+
+    @utils.requires_login
+    async def logout(self):
+        """Log out and clear `session_token`.
+
+        :raises: BetfairAuthError
+
+        """
+        await self.network_client.logout()
+
+    # Bet query methods
+    @utils.requires_login
+    async def list_event_types(self, filter={}, locale=None, decode=None):
+        """
+
+        :param MarketFilter filter:
+        :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_EVENT_TYPES,
+            utils.get_kwargs(locals()),
+            models.EventTypeResult,
+            decode=decode)
+
+    @utils.requires_login
+    async def list_competitions(self, filter={}, locale=None, decode=None):
+        """
+
+        :param MarketFilter filter:
+        :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_COMPETITIONS,
+            utils.get_kwargs(locals()),
+            models.CompetitionResult,
+            decode=decode)
+
+    @utils.requires_login
+    async def list_time_ranges(self, filter, granularity, decode=None):
+        """
+
+        :param MarketFilter filter:
+        :param TimeGranularity granularity:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_TIME_RANGES,
+            utils.get_kwargs(locals()),
+            models.TimeRangeResult,
+            decode=decode)
+
+    @utils.requires_login
+    async def list_events(self, filter={}, locale=None, decode=None):
+        """
+
+        :param MarketFilter filter:
+        :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_EVENTS,
+            utils.get_kwargs(locals()),
+            models.EventResult,
+            decode=decode)
+
+    @utils.requires_login
+    async def list_market_types(self, filter={}, locale=None, decode=None):
+        """
+
+        :param MarketFilter filter:
+        :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_MARKET_TYPES,
+            utils.get_kwargs(locals()),
+            models.MarketTypeResult,
+            decode=decode)
+
+    @utils.requires_login
+    async def list_countries(self, filter={}, locale=None, decode=None):
+        """
+
+        :param MarketFilter filter:
+        :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_COUNTRIES,
+            utils.get_kwargs(locals()),
+            models.CountryCodeResult,
+            decode=decode)
+
+    @utils.requires_login
+    async def list_venues(self, filter={}, locale=None, decode=None):
+        """
+
+        :param MarketFilter filter:
+        :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_VENUES,
+            utils.get_kwargs(locals()),
+            models.VenueResult,
+            decode=decode)
+
+    @utils.requires_login
+    async def list_market_catalogue(
+            self, filter, market_projection=None, sort=None, max_results=10,
+            locale=None, decode=None):
+        """
+
+        :param MarketFilter filter:
+        :param list market_projection:
+        :param MarketSort sort:
+        :param int max_results:
+        :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_MARKET_CATALOGUE,
+            utils.get_kwargs(locals()),
+            models.MarketCatalogue,
+            decode=decode)
+
+    @utils.requires_login
+    async def list_market_book(
+            self, market_ids, price_projection=None, order_projection=None,
+            match_projection=None, currency_code=None, locale=None,
+            decode=None):
+        """
+
+        :param list market_ids: List of market IDs
+        :param PriceProjection price_projection:
+        :param OrderProjection order_projection:
+        :param MatchProjection match_projection:
+        :param str currency_code:
+        :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_MARKET_BOOK,
+            utils.get_kwargs(locals()),
+            models.LadderMarketBook if self.ladders else models.MarketBook,
+            decode=decode)
+
+    @utils.requires_login
+    async def list_market_profit_and_loss(
+            self, market_ids, include_settled_bets=False,
+            include_bsp_bets=False, net_of_commission=False, decode=None):
+        """Retrieve profit and loss for a given list of markets.
+
+        :param list market_ids: List of markets to calculate profit and loss
+        :param bool include_settled_bets: Option to include settled bets
+        :param bool include_bsp_bets: Option to include BSP bets
+        :param bool net_of_commission: Option to return profit and loss net of
+            users current commission rate for this market including any special
+            tariffs
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_MARKET_PROFIT_AND_LOSS,
+            utils.get_kwargs(locals()),
+            models.MarketProfitAndLoss,
+            decode=decode)
+
+    # Chunked iterators for list methods
+    def iter_list_market_book(
+            self, market_ids, chunk_size=None, concurrency=1, window=None,
+            **kwargs):
+        """Split call to `list_market_book` into separate requests. Returns
+        an async iterator over `MarketBook` results.
+
+        :param list market_ids: List of market IDs
+        :param int chunk_size: Number of records per chunk; if `None`, pack
+            as many markets per request as the weight of `price_projection`
+            allows
+        :param int concurrency: Number of chunks to request in parallel
+        :param int window: Maximum number of outstanding chunks
+        :param dict kwargs: Arguments passed to `list_market_book`
+
+        """
+        utils.check_records_decode(kwargs.get('decode') or self.decode)
+        if chunk_size is None:
+            chunks = weights.plan_chunks(
+                market_ids,
+                weights.market_book_weight(kwargs.get('price_projection')))
+        else:
+            chunks = utils.get_chunks(market_ids, chunk_size)
+        return iter_concurrent(
+            lambda chunk: self.list_market_book(chunk, **kwargs),
+            chunks, concurrency, window)
+
+    def iter_list_market_catalogue(
+            self, market_ids, chunk_size=None, filter=None,
+            market_projection=None, concurrency=1, window=None, **kwargs):
+        """Fetch catalogues for a list of markets, split into as few
+        `list_market_catalogue` requests as the weight of `market_projection`
+        allows. Returns an async iterator over `MarketCatalogue` results.
+
+        :param list market_ids: List of market IDs
+        :param int chunk_size: Number of records per chunk; if `None`, pack
+            as many markets per request as the weight limit allows
+        :param MarketFilter filter: Optional extra filter criteria; its
+            `market_ids` are replaced by each chunk
+        :param list market_projection:
+        :param int concurrency: Number of chunks to request in parallel
+        :param int window: Maximum number of outstanding chunks
+        :param dict kwargs: Arguments passed to `list_market_catalogue`
+
+        """
+        utils.check_records_decode(kwargs.get('decode') or self.decode)
+        if chunk_size is None:
+            chunks = weights.plan_chunks(
+                market_ids,
+                weights.market_catalogue_weight(market_projection),
+                max_size=weights.MAX_CATALOGUE_RESULTS)
+        else:
+            chunks = utils.get_chunks(market_ids, chunk_size)
+        return iter_concurrent(
+            lambda chunk: self.list_market_catalogue(
+                utils.with_market_ids(filter, chunk),
+                market_projection=market_projection,
+                max_results=len(chunk), **kwargs),
+            chunks, concurrency, window)
+
+    def iter_list_market_profit_and_loss(
+            self, market_ids, chunk_size, concurrency=1, window=None,
+            **kwargs):
+        """Split call to `list_market_profit_and_loss` into separate requests.
+        Returns an async iterator over `MarketProfitAndLoss` results.
+
+        :param list market_ids: List of market IDs
+        :param int chunk_size: Number of records per chunk
+        :param int concurrency: Number of chunks to request in parallel
+        :param int window: Maximum number of outstanding chunks
+        :param dict kwargs: Arguments passed to `list_market_profit_and_loss`
+
+        """
+        utils.check_records_decode(kwargs.get('decode') or self.decode)
+        return iter_concurrent(
+            lambda chunk: self.list_market_profit_and_loss(chunk, **kwargs),
+            utils.get_chunks(market_ids, chunk_size), concurrency, window)
+
+    def iter_current_orders(self, prefetch=True, dedupe_window=1, **kwargs):
+        """Page through `list_current_orders`. Returns an async iterator
+        over `CurrentOrderSummary` records; see `iter_pages`.
+
+        :param bool prefetch: Fetch the next page while the current one is
+            consumed
+        :param int dedupe_window: Number of previous pages checked for
+            duplicate bet ids
+        :param dict kwargs: Arguments passed to `list_current_orders`
+
+        """
+        utils.check_records_decode(kwargs.get('decode') or self.decode)
+        from_record = kwargs.pop('from_record', None) or 0
+        return iter_pages(
+            lambda start: self.list_current_orders(
+                from_record=start, **kwargs),
+            'current_orders', from_record, prefetch, dedupe_window)
+
+    def iter_cleared_orders(
+            self, bet_status, prefetch=True, dedupe_window=1, **kwargs):
+        """Page through `list_cleared_orders`. Returns an async iterator
+        over `ClearedOrderSummary` records; see `iter_pages`.
+
+        :param BetStatus bet_status:
+        :param bool prefetch: Fetch the next page while the current one is
+            consumed
+        :param int dedupe_window: Number of previous pages checked for
+            duplicate bet ids
+        :param dict kwargs: Arguments passed to `list_cleared_orders`
+
+        """
+        utils.check_records_decode(kwargs.get('decode') or self.decode)
+        from_record = kwargs.pop('from_record', None) or 0
+        return iter_pages(
+            lambda start: self.list_cleared_orders(
+                bet_status, from_record=start, **kwargs),
+            'cleared_orders', from_record, prefetch, dedupe_window)
+
+    # Betting methods
+    @utils.requires_login
+    async def list_current_orders(
+            self, bet_ids=None, market_ids=None, order_projection=None,
+            date_range=None, order_by=None, sort_dir=None, from_record=None,
+            record_count=None, decode=None):
+        """
+
+        :param bet_ids:
+        :param market_ids:
+        :param order_projection:
+        :param date_range:
+        :param order_by:
+        :param sort_dir:
+        :param from_record:
+        :param record_count:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_CURRENT_ORDERS,
+            utils.get_kwargs(locals()),
+            models.CurrentOrderSummaryReport,
+            decode=decode)
+
+    @utils.requires_login
+    async def list_cleared_orders(
+            self, bet_status, event_type_ids=None, event_ids=None,
+            market_ids=None, runner_ids=None, bet_ids=None, side=None,
+            settled_date_range=None, group_by=None,
+            include_item_description=None, locale=None, from_record=None,
+            record_count=None, decode=None):
+        """
+
+        :param bet_status:
+        :param event_type_ids:
+        :param event_ids:
+        :param market_ids:
+        :param runner_ids:
+        :param bet_ids:
+        :param side:
+        :param settled_date_range:
+        :param group_by:
+        :param include_item_description:
+        :param locale:
+        :param from_record:
+        :param record_count:
+        :param str decode: Decoding mode; overrides the client's `decode`
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            LIST_CLEARED_ORDERS,
+            utils.get_kwargs(locals()),
+            models.ClearedOrderSummaryReport,
+            decode=decode)
+
+    @utils.requires_login
+    async def place_orders(
+            self, market_id, instructions, customer_ref=None,
+            validate_prices=None):
+        """Place new orders into market. This operation is atomic in that all
+        orders will be placed or none will be placed.
+
+        :param str market_id: The market id these orders are to be placed on
+        :param list instructions: List of `PlaceInstruction` objects
+        :param str customer_ref: Optional order identifier string
+        :param bool validate_prices: Check prices against the price ladder;
+            overrides the client's `validate_prices`
+
+        """
+        if self.validate_prices if validate_prices is None \
+                else validate_prices:
+            ticks.check_instruction_prices(instructions)
+        return await self.make_api_request(
+            Endpoint.Betting,
+            PLACE_ORDERS,
+            utils.get_kwargs(locals()),
+            models.PlaceExecutionReport)
+
+    @utils.requires_login
+    async def cancel_orders(self, market_id, instructions, customer_ref=None):
+        """Cancel all bets OR cancel all bets on a market OR fully or
+        partially cancel particular orders on a market.
+
+        :param str market_id: If not supplied all bets are cancelled
+        :param list instructions: List of `CancelInstruction` objects
+        :param str customer_ref: Optional order identifier string
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            CANCEL_ORDERS,
+            utils.get_kwargs(locals()),
+            models.CancelExecutionReport)
+
+    @utils.requires_login
+    async def replace_orders(
+            self, market_id, instructions, customer_ref=None,
+            validate_prices=None):
+        """This operation is logically a bulk cancel followed by a bulk place.
+        The cancel is completed first then the new orders are placed.
+
+        :param str market_id: The market id these orders are to be placed on
+        :param list instructions: List of `ReplaceInstruction` objects
+        :param str customer_ref: Optional order identifier string
+        :param bool validate_prices: Check prices against the price ladder;
+            overrides the client's `validate_prices`
+
+        """
+        if self.validate_prices if validate_prices is None \
+                else validate_prices:
+            ticks.check_instruction_prices(instructions)
+        return await self.make_api_request(
+            Endpoint.Betting,
+            REPLACE_ORDERS,
+            utils.get_kwargs(locals()),
+            models.ReplaceExecutionReport)
+
+    @utils.requires_login
+    async def update_orders(self, market_id, instructions, customer_ref=None):
+        """Update non-exposure changing fields.
+
+        :param str market_id: The market id these orders are to be placed on
+        :param list instructions: List of `UpdateInstruction` objects
+        :param str customer_ref: Optional order identifier string
+
+        """
+        return await self.make_api_request(
+            Endpoint.Betting,
+            UPDATE_ORDERS,
+            utils.get_kwargs(locals()),
+            models.UpdateExecutionReport)
+
+    # account api
+    @utils.requires_login
+    async def get_account_funds(self, wallet=None):
+        """Get the current funds in an account
+        """
+        return await self.make_api_request(
+            Endpoint.Account,
+            GET_ACCOUNT_FUNDS,
+            utils.get_kwargs(locals()),
+            models.AccountFundsResponse)
+
+    @utils.requires_login
+    async def get_account_statement(
+            self, locale=None, from_record=None, record_count=None,
+            item_date_range=None, include_item=None, wallet=None):
+        """Get the account statement
+
+        :param str locale: the language to be used
+        :param int from_record: specifies the first record to be returned
+        :param int record_count: the maximum number of records to be returned
+        :param TimeRange item_date_range: return items within this time range
+        :param IncludeItem include_item: which items to include
+        :param Wallet wallet: specify which wallet
+        """
+        return await self.make_api_request(
+            Endpoint.Account,
+            GET_ACCOUNT_STATEMENT,
+            utils.get_kwargs(locals()),
+            models.AccountStatementReport)
+
+    @utils.requires_login
+    async def get_account_details(self):
+        """Get the account details
+        """
+        return await self.make_api_request(
+            Endpoint.Account,
+            GET_ACCOUNT_DETAILS,
+            utils.get_kwargs(locals()),
+            models.AccountDetailsResponse)
+
+    @utils.requires_login
+    async def list_currency_rates(self, from_currency=None, decode=None):
+        """Returns a list of currency rates based on a given currency
+
+        :param str decode: Decoding mode; overrides the client's `decode`
+        """
+        return await self.make_api_request(
+            Endpoint.Account,
+            LIST_CURRENCY_RATES,
+            utils.get_kwargs(locals()),
+            models.CurrencyRate,
+            decode=decode)
+
+    @utils.requires_login
+    async def transfer_funds(self, from_, to, amount):
+        """Transfers funds between UK and Australian Exchange wallets
+
+        :param Wallet from_: source wallet
+        :param Wallet to: desination wallet
+        :param float amount: amount to transfer
+        """
+        return await self.make_api_request(
+            Endpoint.Account,
+            TRANSFER_FUNDS,
+            utils.get_kwargs(locals()),
+            models.TransferResponse)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+import collections
+from timeit import default_timer
+
+import six
+
+from . import utils
+from . import exceptions
+from .betfair import Betfair
+from .constants import DECODE_RAW, DECODE_BYTES
+
+
+class BatchCall(object):
+    """Placeholder for the result of a call made on a `BetfairBatch`.
+
+    :param Endpoint endpoint:
+    :param str method: JSON-RPC method
+    :param dict params: Request parameters
+    :param BetfairModel model: Deserialization format
+    :param bool lazy: Build nested models on first access
+
+    """
+    def __init__(self, endpoint, method, params, model=None, lazy=False):
+        self.endpoint = endpoint
+        self.method = method
+        self.params = params
+        self.model = model
+        self.lazy = lazy
+        self.done = False
+        self.value = None
+        self.error = None
+
+    def set_response(self, response, data):
+        try:
+            result = utils.result_or_error(response, data)
+            self.value = utils.process_result(
+                result, self.model, lazy=self.lazy)
+        except Exception as error:
+            self.error = error
+        self.done = True
+
+    def set_error(self, error):
+        self.error = error
+        self.done = True
+
+    def result(self):
+        """Get the model(s) returned by this call.
+
+        :raises: BetfairError if the batch has not been sent yet
+        :raises: BetfairAPIError if this call failed
+
+        """
+        if not self.done:
+            raise exceptions.BetfairError('Batch has not been sent')
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class BetfairBatch(Betfair):
+    """Client that records API calls instead of sending them, then sends
+    them as one JSON-RPC batch request per endpoint. Create with
+    `Betfair.batch`; shares the session and connections of its client.
+
+    Failed calls raise from their own `BatchCall.result` without affecting
+    the other calls in the batch. If the request to one endpoint fails, each
+    of its calls raises that error; other endpoints are still sent.
+
+    """
+    def __init__(self, client):
+        self.__dict__.update(client.__dict__)
+        self.calls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.send()
+
+    def make_api_request(
+            self, endpoint, method, params, model=None, decode=None):
+        decode = utils.check_decode(decode or self.decode)
+        if decode == DECODE_BYTES:
+            raise ValueError('Batched calls share one response body')
+        if decode == DECODE_RAW:
+            model = None
+        call = BatchCall(endpoint, method, params, model, lazy=self.lazy)
+        self.calls.append(call)
+        return call
+
+    def send(self):
+        """Send all pending calls and resolve their `BatchCall` results.
+
+        :returns: List of sent `BatchCall` objects
+
+        """
+        calls, self.calls = self.calls, []
+        by_endpoint = collections.OrderedDict()
+        for call in calls:
+            by_endpoint.setdefault(call.endpoint, []).append(call)
+        for endpoint, endpoint_calls in six.iteritems(by_endpoint):
+            methods = [call.method for call in endpoint_calls]
+            try:
+                with self.network_client.track(endpoint, methods) as metrics:
+                    response, data = self.network_client.invoke_batch_sync(
+                        self.exchange,
+                        endpoint,
+                        [(call.method, call.params)
+                         for call in endpoint_calls])
+                    started = default_timer()
+                    for call, call_data in zip(endpoint_calls, data):
+                        call.set_response(response, call_data)
+                    metrics.model = default_timer() - started
+            except Exception as error:
+                for call in endpoint_calls:
+                    call.set_error(error)
+        return calls
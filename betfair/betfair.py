@@ -4,14 +4,17 @@ import os
 import json
 import requests
 import itertools
+from timeit import default_timer
 from six.moves import http_client as httplib
 from six.moves import urllib_parse as urllib
 
 from . import utils
+from . import ticks
 from . import models
+from . import weights
 from . import exceptions
-from constants import *
-from network import Network
+from .constants import *
+from .network import Network
 
 class Betfair(object):
     """Betfair API client.
@@ -19,15 +22,130 @@ class Betfair(object):
     :param str app_key: Optional application identifier
     :param str cert_file: Path to self-signed SSL certificate file(s); may be
         a *.pem file or a tuple of (*.crt, *.key) files
+    :param bool lazy: Build nested models (e.g. runners and price ladders)
+        on first access rather than when a response is received
+    :param str decode: How to return results: `DECODE_MODEL` casts them to
+        `models`, `DECODE_RAW` returns the decoded JSON and `DECODE_BYTES`
+        the undecoded response body; each API method can override this with
+        its own `decode` argument
+    :param ResponseCache cache: Cache for catalogue and navigation lookups;
+        see `betfair.cache`
+    :param bool validate_prices: Check the prices of `place_orders` and
+        `replace_orders` instructions against the price ladder in `ticks`
+        before sending them; disable for markets on other ladders
+    :param bool ladders: Return `list_market_book` ladders as read-only,
+        array-backed `ladder.PriceLadder`s (`models.LadderMarketBook`)
+        rather than lists of `PriceSize`
 
 
     JCV - I think we use exchange to specify Australian. Can leave balnk otherwise.
     """
-    def __init__(self, app_key, cert_file, exchange):
+    def __init__(self, app_key, cert_file, exchange, lazy=False,
+                 decode=DECODE_MODEL, cache=None, validate_prices=True,
+                 ladders=False):
         self.app_key = app_key
         self.cert_file = cert_file
         self.exchange = exchange
-        self.network_client = Network(app_key)
+        self.lazy = lazy
+        self.decode = utils.check_decode(decode)
+        self.cache = cache
+        self.validate_prices = validate_prices
+        self.ladders = ladders
+        network_options = {}
+        if cert_file is not None:
+            network_options['cert_file'] = cert_file
+        self.network_client = Network(app_key, **network_options)
+
+
+    def make_api_request(
+            self, endpoint, method, params, model=None, decode=None,
+            request=None):
+        """Call a JSON-RPC method and cast the result to `model`.
+
+        :param Endpoint endpoint: `Endpoint.Betting` or `Endpoint.Account`
+        :param str method: JSON-RPC method, e.g. `LIST_MARKET_BOOK`
+        :param dict params: Request parameters
+        :param BetfairModel model: Deserialization format; if `None`, return
+            raw JSON
+        :param str decode: Decoding mode for this call; defaults to the
+            client's `decode`
+        :param bytes request: Request body already encoded from `params`,
+            e.g. by a `prepared.PreparedCall`; bypasses the cache
+
+        """
+        decode = utils.check_decode(decode or self.decode)
+        if decode == DECODE_BYTES:
+            return self.network_client.invoke_sync(
+                self.exchange, endpoint, method, params, body=True,
+                request=request)
+        cacheable = self.cache is not None and request is None and \
+            self.cache.cacheable(method)
+        if cacheable:
+            # Cache hits are not measured, so they don't skew call metrics
+            try:
+                result = self.cache.get(self.exchange, method, params)
+            except KeyError:
+                pass
+            else:
+                if decode == DECODE_RAW:
+                    return result
+                return utils.process_result(result, model, lazy=self.lazy)
+        with self.network_client.track(endpoint, method) as call:
+            result = self.network_client.invoke_sync(
+                self.exchange, endpoint, method, params, request=request)
+            if cacheable:
+                self.cache.set(self.exchange, method, params, result)
+            if decode == DECODE_RAW:
+                return result
+            started = default_timer()
+            result = utils.process_result(result, model, lazy=self.lazy)
+            call.model = default_timer() - started
+            return result
+
+
+    def invalidate_cache(self, method=None, params=None):
+        """Drop cached results of one request, of a method or, if `method`
+        is `None`, all of them.
+
+        :param str method: JSON-RPC method, e.g. `LIST_EVENTS`
+        :param dict params: Request parameters, as passed to the API method
+
+        """
+        if self.cache is not None:
+            self.cache.invalidate(self.exchange, method, params)
+
+
+    def batch(self):
+        """Collect API calls and send them together as JSON-RPC batch
+        requests, one HTTP round trip per endpoint. Calls made on the batch
+        return `BatchCall` placeholders that resolve when the batch is sent
+        on leaving the `with` block::
+
+            with client.batch() as batch:
+                books = batch.list_market_book(market_ids)
+                orders = batch.list_current_orders()
+            books.result()
+
+        """
+        from .batch import BetfairBatch
+        return BetfairBatch(self)
+
+
+    def prepare(self, *variables):
+        """Build `PreparedCall`s, whose request bodies are encoded once and
+        sent as they are on each call. API methods called on the returned
+        client return a `PreparedCall` instead of a result::
+
+            book = client.prepare('market_ids').list_market_book(
+                market_ids, price_projection=projection)
+            books = book(market_ids=other_market_ids)
+
+        :param variables: Names of parameters that can be substituted on
+            each call
+
+        """
+        from .prepared import BetfairPreparer
+        return BetfairPreparer(self, variables)
 
 
     # Authentication methods
@@ -65,124 +183,128 @@ class Betfair(object):
 
     # Bet query methods
     @utils.requires_login
-    def list_event_types(self, filter={}, locale=None):
+    def list_event_types(self, filter={}, locale=None, decode=None):
         """
 
         :param MarketFilter filter:
         :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_EVENT_TYPES,
-            utils.get_kwargs(locals()))
-        return utils.process_result(result, models.EventTypeResult)
+            utils.get_kwargs(locals()),
+            models.EventTypeResult,
+            decode=decode)
 
 
     @utils.requires_login
-    def list_competitions(self, filter={}, locale=None):
+    def list_competitions(self, filter={}, locale=None, decode=None):
         """
 
         :param MarketFilter filter:
         :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_COMPETITIONS,
-            utils.get_kwargs(locals()))
-        return utils.process_result(result, models.CompetitionResult)
+            utils.get_kwargs(locals()),
+            models.CompetitionResult,
+            decode=decode)
 
 
     @utils.requires_login
-    def list_time_ranges(self, filter, granularity):
+    def list_time_ranges(self, filter, granularity, decode=None):
         """
 
         :param MarketFilter filter:
         :param TimeGranularity granularity:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_TIME_RANGES,
-            utils.get_kwargs(locals()))
-        return utils.process_result(result, models.TimeRangeResult)
+            utils.get_kwargs(locals()),
+            models.TimeRangeResult,
+            decode=decode)
 
 
     @utils.requires_login
-    def list_events(self, filter={}, locale=None):
+    def list_events(self, filter={}, locale=None, decode=None):
         """
 
         :param MarketFilter filter:
         :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_EVENTS,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.EventResult)
+            utils.get_kwargs(locals()),
+            models.EventResult,
+            decode=decode)
 
 
     @utils.requires_login
-    def list_market_types(self, filter={}, locale=None):
+    def list_market_types(self, filter={}, locale=None, decode=None):
         """
 
         :param MarketFilter filter:
         :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_MARKET_TYPES,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.MarketTypeResult)
+            utils.get_kwargs(locals()),
+            models.MarketTypeResult,
+            decode=decode)
 
 
     @utils.requires_login
-    def list_countries(self, filter={}, locale=None):
+    def list_countries(self, filter={}, locale=None, decode=None):
         """
 
         :param MarketFilter filter:
         :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_COUNTRIES,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.CountryCodeResult)
+            utils.get_kwargs(locals()),
+            models.CountryCodeResult,
+            decode=decode)
 
 
     @utils.requires_login
-    def list_venues(self, filter={}, locale=None):
+    def list_venues(self, filter={}, locale=None, decode=None):
         """
 
         :param MarketFilter filter:
         :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_VENUES,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.VenueResult)
+            utils.get_kwargs(locals()),
+            models.VenueResult,
+            decode=decode)
 
 
     @utils.requires_login
     def list_market_catalogue(
-        self, filter, market_projection=None, sort=None, max_results=10, locale=None):
+            self, filter, market_projection=None, sort=None, max_results=10,
+            locale=None, decode=None):
         """
 
         :param MarketFilter filter:
@@ -190,21 +312,22 @@ class Betfair(object):
         :param MarketSort sort:
         :param int max_results:
         :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_MARKET_CATALOGUE,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.MarketCatalogue)
+            utils.get_kwargs(locals()),
+            models.MarketCatalogue,
+            decode=decode)
 
 
     @utils.requires_login
     def list_market_book(
             self, market_ids, price_projection=None, order_projection=None,
-            match_projection=None, currency_code=None, locale=None):
+            match_projection=None, currency_code=None, locale=None,
+            decode=None):
         """
 
         :param list market_ids: List of market IDs
@@ -213,21 +336,21 @@ class Betfair(object):
         :param MatchProjection match_projection:
         :param str currency_code:
         :param str locale:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_MARKET_BOOK,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.MarketBook)
+            utils.get_kwargs(locals()),
+            models.LadderMarketBook if self.ladders else models.MarketBook,
+            decode=decode)
 
 
     @utils.requires_login
     def list_market_profit_and_loss(
             self, market_ids, include_settled_bets=False,
-            include_bsp_bets=False, net_of_commission=False):
+            include_bsp_bets=False, net_of_commission=False, decode=None):
         """Retrieve profit and loss for a given list of markets.
 
         :param list market_ids: List of markets to calculate profit and loss
@@ -236,51 +359,163 @@ class Betfair(object):
         :param bool net_of_commission: Option to return profit and loss net of
             users current commission rate for this market including any special
             tariffs
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_MARKET_PROFIT_AND_LOSS,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.MarketProfitAndLoss)
+            utils.get_kwargs(locals()),
+            models.MarketProfitAndLoss,
+            decode=decode)
 
 
     # Chunked iterators for list methods
-    def iter_list_market_book(self, market_ids, chunk_size, **kwargs):
+    def iter_list_market_book(
+            self, market_ids, chunk_size=None, max_workers=None, window=None,
+            **kwargs):
         """Split call to `list_market_book` into separate requests.
 
         :param list market_ids: List of market IDs
-        :param int chunk_size: Number of records per chunk
+        :param int chunk_size: Number of records per chunk; if `None`, pack
+            as many markets per request as the weight of `price_projection`
+            allows
+        :param int max_workers: Number of chunks to request in parallel; if
+            `None`, request chunks one after another
+        :param int window: Maximum number of chunks in flight or awaiting
+            consumption when running in parallel; defaults to twice
+            `max_workers`
         :param dict kwargs: Arguments passed to `list_market_book`
 
         """
+        utils.check_records_decode(kwargs.get('decode') or self.decode)
+        if chunk_size is None:
+            chunks = weights.plan_chunks(
+                market_ids,
+                weights.market_book_weight(kwargs.get('price_projection')))
+        else:
+            chunks = utils.get_chunks(market_ids, chunk_size)
+        if max_workers:
+            return utils.iter_concurrent(
+                lambda chunk: self.list_market_book(chunk, **kwargs),
+                chunks, max_workers, window)
         return itertools.chain(*(
             self.list_market_book(market_chunk, **kwargs)
-            for market_chunk in utils.get_chunks(market_ids, chunk_size)
+            for market_chunk in chunks
         ))
 
     def iter_list_market_profit_and_loss(
-            self, market_ids, chunk_size, **kwargs):
+            self, market_ids, chunk_size, max_workers=None, window=None,
+            **kwargs):
         """Split call to `list_market_profit_and_loss` into separate requests.
 
         :param list market_ids: List of market IDs
         :param int chunk_size: Number of records per chunk
+        :param int max_workers: Number of chunks to request in parallel; if
+            `None`, request chunks one after another
+        :param int window: Maximum number of chunks in flight or awaiting
+            consumption when running in parallel; defaults to twice
+            `max_workers`
         :param dict kwargs: Arguments passed to `list_market_profit_and_loss`
 
         """
+        utils.check_records_decode(kwargs.get('decode') or self.decode)
+        chunks = utils.get_chunks(market_ids, chunk_size)
+        if max_workers:
+            return utils.iter_concurrent(
+                lambda chunk: self.list_market_profit_and_loss(chunk, **kwargs),
+                chunks, max_workers, window)
         return itertools.chain(*(
             self.list_market_profit_and_loss(market_chunk, **kwargs)
-            for market_chunk in utils.get_chunks(market_ids, chunk_size)
+            for market_chunk in chunks
         ))
 
+    def iter_list_market_catalogue(
+            self, market_ids, chunk_size=None, filter=None,
+            market_projection=None, max_workers=None, window=None, **kwargs):
+        """Fetch catalogues for a list of markets, split into as few
+        `list_market_catalogue` requests as the weight of `market_projection`
+        allows.
+
+        :param list market_ids: List of market IDs
+        :param int chunk_size: Number of records per chunk; if `None`, pack
+            as many markets per request as the weight limit allows
+        :param MarketFilter filter: Optional extra filter criteria; its
+            `market_ids` are replaced by each chunk
+        :param list market_projection:
+        :param int max_workers: Number of chunks to request in parallel; if
+            `None`, request chunks one after another
+        :param int window: Maximum number of chunks in flight or awaiting
+            consumption when running in parallel
+        :param dict kwargs: Arguments passed to `list_market_catalogue`
+
+        """
+        utils.check_records_decode(kwargs.get('decode') or self.decode)
+        if chunk_size is None:
+            chunks = weights.plan_chunks(
+                market_ids,
+                weights.market_catalogue_weight(market_projection),
+                max_size=weights.MAX_CATALOGUE_RESULTS)
+        else:
+            chunks = utils.get_chunks(market_ids, chunk_size)
+
+        def fetch(chunk):
+            return self.list_market_catalogue(
+                utils.with_market_ids(filter, chunk),
+                market_projection=market_projection,
+                max_results=len(chunk), **kwargs)
+
+        if max_workers:
+            return utils.iter_concurrent(fetch, chunks, max_workers, window)
+        return itertools.chain(*(fetch(chunk) for chunk in chunks))
+
+    def iter_current_orders(self, prefetch=True, dedupe_window=1, **kwargs):
+        """Page through `list_current_orders`, yielding `CurrentOrderSummary`
+        records one by one; see `utils.iter_pages`.
+
+        :param bool prefetch: Fetch the next page while the current one is
+            consumed
+        :param int dedupe_window: Number of previous pages checked for
+            duplicate bet ids
+        :param dict kwargs: Arguments passed to `list_current_orders`;
+            `record_count` sets the page size
+
+        """
+        utils.check_records_decode(kwargs.get('decode') or self.decode)
+        from_record = kwargs.pop('from_record', None) or 0
+        return utils.iter_pages(
+            lambda start: self.list_current_orders(
+                from_record=start, **kwargs),
+            'current_orders', from_record, prefetch, dedupe_window)
+
+    def iter_cleared_orders(
+            self, bet_status, prefetch=True, dedupe_window=1, **kwargs):
+        """Page through `list_cleared_orders`, yielding `ClearedOrderSummary`
+        records one by one; see `utils.iter_pages`.
+
+        :param BetStatus bet_status:
+        :param bool prefetch: Fetch the next page while the current one is
+            consumed
+        :param int dedupe_window: Number of previous pages checked for
+            duplicate bet ids
+        :param dict kwargs: Arguments passed to `list_cleared_orders`;
+            `record_count` sets the page size
+
+        """
+        utils.check_records_decode(kwargs.get('decode') or self.decode)
+        from_record = kwargs.pop('from_record', None) or 0
+        return utils.iter_pages(
+            lambda start: self.list_cleared_orders(
+                bet_status, from_record=start, **kwargs),
+            'cleared_orders', from_record, prefetch, dedupe_window)
+
     # Betting methods
 
     @utils.requires_login
     def list_current_orders(
-            self, bet_ids = None, market_ids = None, order_projection = None, date_range = None, order_by = None,
-            sort_dir = None, from_record = None, record_count = None):
+            self, bet_ids = None, market_ids = None, order_projection = None,
+            date_range = None, order_by = None, sort_dir = None,
+            from_record = None, record_count = None, decode=None):
         """
 
         :param bet_ids:
@@ -291,22 +526,24 @@ class Betfair(object):
         :param sort_dir:
         :param from_record:
         :param record_count:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_CURRENT_ORDERS,
-            utils.get_kwargs(locals())
-        )
-        return utils.process_result(result, models.CurrentOrderSummaryReport)
+            utils.get_kwargs(locals()),
+            models.CurrentOrderSummaryReport,
+            decode=decode)
 
 
     @utils.requires_login
     def list_cleared_orders(
-            self, bet_status, event_type_ids=None, event_ids=None, market_ids=None,
-            runner_ids=None, bet_ids=None, side=None, settled_date_range=None, group_by=None,
-            include_item_description=None, locale=None, from_record=None, record_count=None):
+            self, bet_status, event_type_ids=None, event_ids=None,
+            market_ids=None, runner_ids=None, bet_ids=None, side=None,
+            settled_date_range=None, group_by=None,
+            include_item_description=None, locale=None, from_record=None,
+            record_count=None, decode=None):
         """
 
         :param bet_status:
@@ -322,34 +559,39 @@ class Betfair(object):
         :param locale:
         :param from_record:
         :param record_count:
+        :param str decode: Decoding mode; overrides the client's `decode`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             LIST_CLEARED_ORDERS,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.ClearedOrderSummaryReport)
+            utils.get_kwargs(locals()),
+            models.ClearedOrderSummaryReport,
+            decode=decode)
 
 
     @utils.requires_login
-    def place_orders(self, market_id, instructions, customer_ref=None):
+    def place_orders(
+            self, market_id, instructions, customer_ref=None,
+            validate_prices=None):
         """Place new orders into market. This operation is atomic in that all
         orders will be placed or none will be placed.
 
         :param str market_id: The market id these orders are to be placed on
         :param list instructions: List of `PlaceInstruction` objects
         :param str customer_ref: Optional order identifier string
+        :param bool validate_prices: Check prices against the price ladder;
+            overrides the client's `validate_prices`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        if self.validate_prices if validate_prices is None \
+                else validate_prices:
+            ticks.check_instruction_prices(instructions)
+        return self.make_api_request(
             Endpoint.Betting,
             PLACE_ORDERS,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.PlaceExecutionReport)
+            utils.get_kwargs(locals()),
+            models.PlaceExecutionReport)
 
 
     @utils.requires_login
@@ -362,32 +604,35 @@ class Betfair(object):
         :param str customer_ref: Optional order identifier string
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             CANCEL_ORDERS,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.CancelExecutionReport)
+            utils.get_kwargs(locals()),
+            models.CancelExecutionReport)
 
 
     @utils.requires_login
-    def replace_orders(self, market_id, instructions, customer_ref=None):
+    def replace_orders(
+            self, market_id, instructions, customer_ref=None,
+            validate_prices=None):
         """This operation is logically a bulk cancel followed by a bulk place.
         The cancel is completed first then the new orders are placed.
 
         :param str market_id: The market id these orders are to be placed on
         :param list instructions: List of `ReplaceInstruction` objects
         :param str customer_ref: Optional order identifier string
+        :param bool validate_prices: Check prices against the price ladder;
+            overrides the client's `validate_prices`
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        if self.validate_prices if validate_prices is None \
+                else validate_prices:
+            ticks.check_instruction_prices(instructions)
+        return self.make_api_request(
             Endpoint.Betting,
             REPLACE_ORDERS,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.ReplaceExecutionReport)
+            utils.get_kwargs(locals()),
+            models.ReplaceExecutionReport)
 
 
     @utils.requires_login
@@ -399,13 +644,11 @@ class Betfair(object):
         :param str customer_ref: Optional order identifier string
 
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Betting,
             UPDATE_ORDERS,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.UpdateExecutionReport)
+            utils.get_kwargs(locals()),
+            models.UpdateExecutionReport)
 
 
     # account api
@@ -413,13 +656,11 @@ class Betfair(object):
     def get_account_funds(self, wallet=None):
         """Get the current funds in an account
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Account,
             GET_ACCOUNT_FUNDS,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.AccountFundsResponse)
+            utils.get_kwargs(locals()),
+            models.AccountFundsResponse)
 
     @utils.requires_login
     def get_account_statement(self, locale=None, from_record=None, record_count=None,
@@ -433,37 +674,34 @@ class Betfair(object):
         :param IncludeItem include_item: which items to include
         :param Wallet wallet: specify which wallet
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Account,
             GET_ACCOUNT_STATEMENT,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.AccountStatementReport)
+            utils.get_kwargs(locals()),
+            models.AccountStatementReport)
 
     @utils.requires_login
     def get_account_details(self):
         """Get the account details
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Account,
             GET_ACCOUNT_DETAILS,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.AccountDetailsResponse)
+            utils.get_kwargs(locals()),
+            models.AccountDetailsResponse)
 
     @utils.requires_login
-    def list_currency_rates(self, from_currency=None):
+    def list_currency_rates(self, from_currency=None, decode=None):
         """Returns a list of currency rates based on a given currency
+
+        :param str decode: Decoding mode; overrides the client's `decode`
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Account,
             LIST_CURRENCY_RATES,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.CurrencyRate)
+            utils.get_kwargs(locals()),
+            models.CurrencyRate,
+            decode=decode)
 
     @utils.requires_login
     def transfer_funds(self, from_, to, amount):
@@ -473,10 +711,8 @@ class Betfair(object):
         :param Wallet to: desination wallet
         :param float amount: amount to transfer
         """
-        result = self.network_client.invoke_sync(
-            self.exchange,
+        return self.make_api_request(
             Endpoint.Account,
             TRANSFER_FUNDS,
-            utils.get_kwargs(locals()))
-
-        return utils.process_result(result, models.TransferResponse)
+            utils.get_kwargs(locals()),
+            models.TransferResponse)
@@ -1,6 +1,6 @@
 import datetime
-from models import *
-from constants import *
+from .models import *
+from .constants import *
 
 
 def horse_race_filter(countries_list=[]):
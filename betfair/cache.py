@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""Response cache for near-static Betfair lookups such as market catalogues
+and event navigation. Results are cached as decoded JSON, before model
+construction, under a key built from the canonicalised request parameters.
+
+Cached results are shared between calls; treat raw (`DECODE_RAW`) results
+taken from the cache as read-only.
+
+"""
+
+import json
+import time
+import sqlite3
+import threading
+import collections
+
+import six
+
+from . import utils
+from . import codec
+from .constants import *
+
+
+# Seconds to keep results of each cacheable method
+DEFAULT_TTLS = {
+    LIST_EVENT_TYPES: 3600,
+    LIST_COMPETITIONS: 3600,
+    LIST_COUNTRIES: 86400,
+    LIST_VENUES: 86400,
+    LIST_EVENTS: 300,
+    LIST_MARKET_CATALOGUE: 300,
+}
+
+
+def canonicalize(value):
+    """Drop unset (`None` or empty list) entries from serialised dicts."""
+    if isinstance(value, dict):
+        return {
+            key: canonicalize(item) for key, item in six.iteritems(value)
+            if item is not None and item != []
+        }
+    if isinstance(value, list):
+        return [canonicalize(item) for item in value]
+    return value
+
+
+def make_key(exchange, method, params):
+    """Build a cache key from a request. Parameters are serialised as in the
+    request body, with sorted keys and without unset values, so equivalent
+    requests share a key.
+
+    :param Exchange exchange:
+    :param str method: JSON-RPC method
+    :param dict params: Request parameters
+
+    """
+    exchange = getattr(exchange, 'name', exchange) or ''
+    return json.dumps(
+        [exchange, method, canonicalize(utils.serialize_params(params))],
+        sort_keys=True, separators=(',', ':'), default=codec.default)
+
+
+class MemoryCache(object):
+    """In-process LRU cache backend.
+
+    :param int max_size: Maximum number of entries
+
+    """
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, now):
+        """Get an unexpired value.
+
+        :param str key:
+        :param float now: Current time
+        :raises: KeyError if the key is missing or expired
+
+        """
+        with self.lock:
+            value, expires = self.entries.pop(key)
+            if expires <= now:
+                raise KeyError(key)
+            self.entries[key] = (value, expires)
+            return value
+
+    def set(self, key, value, expires, now):
+        """Store a value, evicting the least recently used entries beyond
+        `max_size`.
+
+        :param str key:
+        :param value: JSON-serialisable value
+        :param float expires: Expiry time
+        :param float now: Current time
+
+        """
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (value, expires)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, prefix=''):
+        """Delete entries whose keys start with `prefix`."""
+        with self.lock:
+            for key in list(self.entries):
+                if key.startswith(prefix):
+                    del self.entries[key]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SqliteCache(object):
+    """On-disk LRU cache backend, so that a restarted process starts warm.
+
+    :param str path: Database file
+    :param int max_size: Maximum number of entries
+    :param JSONCodec json_codec: Codec for stored values; defaults to the
+        fastest installed codec
+
+    """
+    def __init__(self, path, max_size=10000, json_codec=None):
+        self.path = path
+        self.max_size = max_size
+        self.codec = codec.get_codec(json_codec)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL)')
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)')
+        self.connection.commit()
+
+    def get(self, key, now):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT value FROM cache WHERE key = ? AND expires > ?',
+                (key, now)).fetchone()
+            if row is None:
+                raise KeyError(key)
+            self.connection.execute(
+                'UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+            self.connection.commit()
+        return self.codec.loads(bytes(row[0]))
+
+    def set(self, key, value, expires, now):
+        data = self.codec.dumps(value)
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)',
+                (key, sqlite3.Binary(data), expires, now))
+            self.connection.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_size, ))
+            self.connection.commit()
+
+    def delete(self, prefix=''):
+        """Delete entries whose keys start with `prefix`."""
+        with self.lock:
+            self.connection.execute(
+                "DELETE FROM cache WHERE substr(key, 1, ?) = ?",
+                (len(prefix), prefix))
+            self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                'SELECT COUNT(*) FROM cache').fetchone()[0]
+
+
+class ResponseCache(object):
+    """Cache results of the methods in `ttls`.
+
+    :param backend: `MemoryCache` (default), `SqliteCache` or an object with
+        the same `get`, `set` and `delete` methods
+    :param dict ttls: Seconds to keep results, by JSON-RPC method; defaults
+        to `DEFAULT_TTLS`. Methods not listed are not cached
+    :param timer: Clock returning seconds
+
+    """
+    def __init__(self, backend=None, ttls=None, timer=time.time):
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.timer = timer
+
+    def cacheable(self, method):
+        return method in self.ttls
+
+    def get(self, exchange, method, params):
+        """Get a cached result.
+
+        :raises: KeyError on a cache miss
+
+        """
+        return self.backend.get(
+            make_key(exchange, method, params), self.timer())
+
+    def set(self, exchange, method, params, result):
+        now = self.timer()
+        self.backend.set(
+            make_key(exchange, method, params), result,
+            now + self.ttls[method], now)
+
+    def invalidate(self, exchange=None, method=None, params=None):
+        """Drop cached results: those of one request if `params` is given,
+        else those of `method`, else all of them.
+
+        """
+        if params is not None:
+            prefix = make_key(exchange, method, params)
+        elif method is not None:
+            # Keys are JSON lists starting with the exchange and method
+            prefix = make_key(exchange, method, {})[:-3]
+        else:
+            prefix = ''
+        self.backend.delete(prefix)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""JSON codecs for request encoding and response decoding. `get_codec`
+picks the fastest installed library (orjson, ujson, then simdjson for
+decoding) and falls back to the standard library `json` module.
+
+Codecs encode parameters as prepared by `utils.serialize_params`, i.e. plain
+JSON types plus datetimes, which are written in ISO 8601 format.
+
+"""
+
+import json
+import collections
+
+import six
+
+
+def default(obj):
+    """Encode values that JSON libraries do not handle natively.
+
+    :param obj: Datetime, `Enum` member or model
+    :raises: TypeError for other types
+
+    """
+    # for datetime objects
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    # for enum objects
+    if hasattr(obj, 'name'):
+        return obj.name
+    if hasattr(obj, 'serialize'):
+        return obj.serialize()
+    raise TypeError(
+        'Object of type {0} is not JSON serializable'.format(type(obj)))
+
+
+class JSONCodec(object):
+    """Standard library codec."""
+
+    name = 'json'
+
+    def dumps(self, obj):
+        """Encode `obj` as a JSON string or UTF-8 bytes."""
+        return json.dumps(obj, default=default)
+
+    def loads(self, data):
+        """Decode a JSON document from a string or UTF-8 bytes."""
+        if not isinstance(data, six.string_types):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+
+    def dumps(self, obj):
+        return self.orjson.dumps(obj, default=default)
+
+    def loads(self, data):
+        return self.orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self.ujson = ujson
+
+    def dumps(self, obj):
+        return self.ujson.dumps(obj, default=default)
+
+    def loads(self, data):
+        return self.ujson.loads(data)
+
+
+class SimdjsonCodec(JSONCodec):
+    """Decodes with simdjson; encodes with the standard library."""
+
+    name = 'simdjson'
+
+    def __init__(self):
+        import simdjson
+        self.simdjson = simdjson
+
+    def loads(self, data):
+        return self.simdjson.loads(data)
+
+
+# Codecs in order of preference
+CODECS = collections.OrderedDict([
+    ('orjson', OrjsonCodec),
+    ('ujson', UjsonCodec),
+    ('simdjson', SimdjsonCodec),
+    ('json', JSONCodec),
+])
+
+
+def get_codec(codec=None):
+    """Get a JSON codec.
+
+    :param codec: Codec instance, name from `CODECS`, or `None` to use the
+        fastest installed codec
+    :raises: ImportError if a named codec's library is not installed
+    :raises: ValueError for unknown codec names
+
+    """
+    if codec is None:
+        for codec_class in CODECS.values():
+            try:
+                return codec_class()
+            except ImportError:
+                pass
+    if not isinstance(codec, six.string_types):
+        return codec
+    if codec not in CODECS:
+        raise ValueError('Unknown JSON codec {0!r}'.format(codec))
+    return CODECS[codec]()
+
+
+def available_codecs():
+    """Get the names of codecs whose libraries are installed."""
+    names = []
+    for name, codec_class in CODECS.items():
+        try:
+            codec_class()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
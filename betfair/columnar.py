@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Columnar export of API results to Arrow record batches and Parquet files.
+Requires `pyarrow`.
+
+Column names and types are derived from the field declarations in `models`:
+scalar fields become columns, nested models are flattened into prefixed
+columns (e.g. `item_description_market_desc`), enums are written by name
+and datetimes as UTC timestamps. List fields are left out, except for the
+ladders that `MarketBookWriter` explodes into one row per level.
+
+Writers buffer at most `batch_size` rows before writing them to the file as
+a record batch, so memory stays bounded however many results are written.
+Each writer appends to one Parquet file until it is closed; write each
+session to its own file, e.g. within a dataset directory.
+
+"""
+
+import datetime
+import collections
+
+import six
+import pyarrow
+import pyarrow.parquet
+from dateutil import tz
+
+from . import models
+from .datatype import EnumType, ModelType
+from .ladder import LadderField, iter_levels
+from .meta.field import ListField
+from .tracker import LADDERS
+
+
+ARROW_TYPES = {
+    bool: pyarrow.bool_(),
+    int: pyarrow.int64(),
+    float: pyarrow.float64(),
+    six.text_type: pyarrow.string(),
+    datetime.datetime: pyarrow.timestamp('us', tz='UTC'),
+}
+
+Column = collections.namedtuple('Column', ['name', 'type', 'getter'])
+
+
+def _enum_name(value):
+    return value.name if value is not None else None
+
+
+def _nested(outer, inner):
+    def getter(obj):
+        value = outer(obj)
+        return inner(value) if value is not None else None
+    return getter
+
+
+def _attribute(name, convert=None):
+    def getter(obj):
+        value = getattr(obj, name)
+        return convert(value) if convert and value is not None else value
+    return getter
+
+
+def model_columns(model, prefix=''):
+    """Derive columns from the scalar and nested model fields of `model`.
+
+    :param type model: `BetfairModel` subclass
+    :param str prefix: Prefix of column names
+    :returns: List of `Column`
+
+    """
+    columns = []
+    for name, field in six.iteritems(model._fields):
+        if isinstance(field, (ListField, LadderField)):
+            continue
+        data_type = field.data_type
+        if isinstance(data_type, ModelType) and \
+                hasattr(data_type.type, '_fields'):
+            columns.extend(
+                column._replace(getter=_nested(
+                    _attribute(name), column.getter))
+                for column in model_columns(
+                    data_type.type, prefix + name + '_')
+            )
+            continue
+        if isinstance(data_type, EnumType):
+            columns.append(Column(
+                prefix + name, pyarrow.string(),
+                _attribute(name, _enum_name)))
+            continue
+        columns.append(Column(
+            prefix + name, ARROW_TYPES[data_type.type], _attribute(name)))
+    return columns
+
+
+class ColumnarWriter(object):
+    """Write rows to a Parquet file in record batches.
+
+    :param str path: Parquet file
+    :param list columns: List of `Column`
+    :param int batch_size: Rows buffered before each write
+    :param str compression: Parquet compression codec
+
+    """
+    def __init__(self, path, columns, batch_size=65536,
+                 compression='snappy'):
+        self.path = path
+        self.columns = columns
+        self.batch_size = batch_size
+        self.schema = pyarrow.schema([
+            (column.name, column.type) for column in columns
+        ])
+        self.writer = pyarrow.parquet.ParquetWriter(
+            path, self.schema, compression=compression)
+        self.buffers = [[] for _ in columns]
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, values):
+        """Buffer one row of values, in column order."""
+        for buffer, value in six.moves.zip(self.buffers, values):
+            buffer.append(value)
+        self.rows += 1
+        if self.rows >= self.batch_size:
+            self.flush()
+
+    def record_batch(self):
+        """Build a record batch from the buffered rows."""
+        return pyarrow.RecordBatch.from_arrays([
+            pyarrow.array(buffer, type=column.type)
+            for buffer, column in six.moves.zip(self.buffers, self.columns)
+        ], schema=self.schema)
+
+    def flush(self):
+        """Write buffered rows to the file."""
+        if not self.rows:
+            return
+        self.writer.write_batch(self.record_batch())
+        self.buffers = [[] for _ in self.columns]
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def _to_model(model, item):
+    return item if isinstance(item, model) else model(**item)
+
+
+class MarketBookWriter(ColumnarWriter):
+    """Write `MarketBook` results with one row per market, runner, ladder
+    and level. Runners with empty ladders get one row with null ladder
+    columns.
+
+    Columns are `received_at`, the `MarketBook` fields, the `Runner` fields
+    prefixed with `runner_`, then `ladder` (e.g. `available_to_back`),
+    `level` (0 for the best price), `price` and `size`.
+
+    """
+    LADDER_COLUMNS = [
+        Column('ladder', pyarrow.string(), None),
+        Column('level', pyarrow.int32(), None),
+        Column('price', pyarrow.float64(), None),
+        Column('size', pyarrow.float64(), None),
+    ]
+
+    def __init__(self, path, **kwargs):
+        self.market_columns = model_columns(models.MarketBook)
+        self.runner_columns = model_columns(models.Runner, 'runner_')
+        columns = (
+            [Column('received_at', ARROW_TYPES[datetime.datetime], None)] +
+            self.market_columns + self.runner_columns + self.LADDER_COLUMNS
+        )
+        super(MarketBookWriter, self).__init__(path, columns, **kwargs)
+
+    def write(self, books, received_at=None):
+        """Buffer rows for `MarketBook` results.
+
+        :param list books: `MarketBook` models or raw result dicts
+        :param datetime received_at: Snapshot time; defaults to now (UTC)
+
+        """
+        if received_at is None:
+            received_at = datetime.datetime.now(tz.tzutc())
+        for book in books:
+            book = _to_model(models.MarketBook, book)
+            market = [received_at] + [
+                column.getter(book) for column in self.market_columns
+            ]
+            for runner in book.runners:
+                prefix = market + [
+                    column.getter(runner) for column in self.runner_columns
+                ]
+                ex = runner.ex
+                empty = True
+                for ladder in LADDERS if ex is not None else ():
+                    for level, (price, size) in enumerate(
+                            iter_levels(getattr(ex, ladder))):
+                        self.append(prefix + [ladder, level, price, size])
+                        empty = False
+                if empty:
+                    self.append(prefix + [None, None, None, None])
+
+
+class ClearedOrderWriter(ColumnarWriter):
+    """Write `ClearedOrderSummary` results, one row per order."""
+
+    def __init__(self, path, **kwargs):
+        super(ClearedOrderWriter, self).__init__(
+            path, model_columns(models.ClearedOrderSummary), **kwargs)
+
+    def write(self, orders):
+        """Buffer rows for cleared orders.
+
+        :param orders: `ClearedOrderSummaryReport`, or list of
+            `ClearedOrderSummary` models or raw result dicts
+
+        """
+        if isinstance(orders, models.ClearedOrderSummaryReport):
+            orders = orders.cleared_orders
+        for order in orders:
+            order = _to_model(models.ClearedOrderSummary, order)
+            self.append([column.getter(order) for column in self.columns])
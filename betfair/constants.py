@@ -246,6 +246,7 @@ Endpoint = Enum(
     "Endpoint", [
         "Betting",
         "Account",
+        "Identity",
     ]
 )
 
@@ -293,3 +294,9 @@ GET_ACCOUNT_FUNDS = "AccountAPING/v1.0/getAccountFunds"
 GET_ACCOUNT_STATEMENT = "AccountAPING/v1.0/getAccountStatement"
 LIST_CURRENCY_RATES = "AccountAPING/v1.0/listCurrencyRates"
 TRANSFER_FUNDS = "AccountAPING/v1.0/transferFunds"
+
+# Response decoding modes
+DECODE_MODEL = "model"  # Cast results to `models` objects
+DECODE_RAW = "raw"  # Return the decoded JSON result
+DECODE_BYTES = "bytes"  # Return the undecoded JSON-RPC response body
+DECODE_MODES = (DECODE_MODEL, DECODE_RAW, DECODE_BYTES)
@@ -26,6 +26,10 @@ class EnumType(DataType):
 
 class ModelType(DataType):
 
+    @property
+    def deferrable(self):
+        return hasattr(self.type, 'from_dict')
+
     def serialize(self, value):
         return value.serialize() if value else None
 
@@ -38,6 +42,12 @@ class ModelType(DataType):
 
         #return self.type(**value)
 
+    def unserialize_lazy(self, value):
+        value = self.preprocess(value)
+        if self.type == type(value) or not self.deferrable:
+            return self.unserialize(value)
+        return self.type.from_dict(value, lazy=True)
+
 
 def preprocess_date(date):
     if isinstance(date, datetime.datetime):
@@ -33,3 +33,12 @@ class BetfairAPIError(BetfairError):
             self.message = 'UNKNOWN'
             self.details = None
         super(BetfairAPIError, self).__init__(self.message)
+
+
+class InvalidPriceError(BetfairError, ValueError):
+    """Price that is not on the Betfair price ladder."""
+
+    def __init__(self, price):
+        self.price = price
+        self.message = 'Invalid price {0!r}'.format(price)
+        super(InvalidPriceError, self).__init__(self.message)
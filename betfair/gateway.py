@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""Coalescing of order instructions into batched API calls.
+
+`OrderGateway` collects the instructions submitted for each market and
+method over a short window (2 ms by default), then sends them in a single
+`place_orders`, `cancel_orders`, `replace_orders` or `update_orders` call.
+A batch is sent early once it reaches the method's per-call instruction
+limit. Each caller gets a `Future` of an execution report holding only the
+instruction reports of its own instructions.
+
+Betfair executes the instructions of one `place_orders` call atomically, so
+coalesced instructions share the fate of their batch: an invalid
+instruction fails the others placed with it, and a batch-level error (e.g.
+`MARKET_SUSPENDED`) is reported to every caller. Per-call `customer_ref`s
+are not supported, since several callers share one call. Cancelling a
+future before its batch is sent withdraws its instructions.
+
+"""
+
+import copy
+import threading
+from timeit import default_timer
+
+from concurrent import futures
+
+from . import ticks
+from .constants import (
+    PLACE_ORDERS, CANCEL_ORDERS, REPLACE_ORDERS, UPDATE_ORDERS,
+)
+
+
+# Maximum instructions per call, by method
+MAX_INSTRUCTIONS = {
+    PLACE_ORDERS: 200,
+    CANCEL_ORDERS: 60,
+    REPLACE_ORDERS: 60,
+    UPDATE_ORDERS: 60,
+}
+
+# Client method called for each JSON-RPC method
+CLIENT_METHODS = {
+    PLACE_ORDERS: 'place_orders',
+    CANCEL_ORDERS: 'cancel_orders',
+    REPLACE_ORDERS: 'replace_orders',
+    UPDATE_ORDERS: 'update_orders',
+}
+
+
+def split_report(report, start, stop):
+    """Copy an execution report, keeping the instruction reports from
+    `start` to `stop`.
+
+    :param report: Execution report model, or raw (`DECODE_RAW`) dict
+    :param int start:
+    :param int stop:
+
+    """
+    if isinstance(report, dict):
+        part = dict(report)
+        part['instructionReports'] = \
+            (report.get('instructionReports') or [])[start:stop]
+        return part
+    part = copy.copy(report)
+    part.instruction_reports = list(report.instruction_reports[start:stop])
+    return part
+
+
+class _Batch(object):
+    """Instructions waiting to be sent in one call."""
+
+    __slots__ = ('method', 'market_id', 'deadline', 'instructions', 'callers')
+
+    def __init__(self, method, market_id, deadline):
+        self.method = method
+        self.market_id = market_id
+        self.deadline = deadline
+        self.instructions = []
+        # (future, start, stop) of each caller's instructions
+        self.callers = []
+
+    def add(self, instructions, future):
+        start = len(self.instructions)
+        self.instructions.extend(instructions)
+        self.callers.append((future, start, len(self.instructions)))
+
+
+class OrderGateway(object):
+    """Batch order instructions per market; see the module docstring.
+
+    :param Betfair client: Logged-in client
+    :param float window: Seconds to wait for more instructions after the
+        first instruction of a batch; 0 sends each submission at once
+    :param int max_workers: Calls in flight at once
+    :param dict limits: Maximum instructions per call, by method; defaults
+        to `MAX_INSTRUCTIONS`
+    :param timer: Clock returning seconds
+
+    """
+    def __init__(self, client, window=0.002, max_workers=4, limits=None,
+                 timer=default_timer):
+        self.client = client
+        self.window = window
+        self.limits = dict(MAX_INSTRUCTIONS)
+        self.limits.update(limits or {})
+        self.timer = timer
+        self.executor = futures.ThreadPoolExecutor(max_workers)
+        self.condition = threading.Condition()
+        self.pending = {}
+        self.closed = False
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, method, market_id, instructions):
+        """Queue instructions for the next call on a market.
+
+        :param str method: `PLACE_ORDERS`, `CANCEL_ORDERS`, `REPLACE_ORDERS`
+            or `UPDATE_ORDERS`
+        :param str market_id:
+        :param list instructions: Instructions of the method's type; kept
+            together in one call
+        :returns: `Future` of the execution report of these instructions
+        :raises: ValueError if there are no instructions or more than fit
+            in one call
+        :raises: InvalidPriceError if the client validates prices and one
+            is off the ladder
+
+        """
+        instructions = list(instructions)
+        limit = self.limits[method]
+        if not instructions or len(instructions) > limit:
+            raise ValueError(
+                'Expected 1 to {0} instructions, got {1}'.format(
+                    limit, len(instructions)))
+        if method in (PLACE_ORDERS, REPLACE_ORDERS) and \
+                getattr(self.client, 'validate_prices', False):
+            # Fail bad prices here rather than the whole batch
+            ticks.check_instruction_prices(instructions)
+        future = futures.Future()
+        key = (method, market_id)
+        with self.condition:
+            if self.closed:
+                raise RuntimeError('Gateway is closed')
+            batch = self.pending.get(key)
+            if batch is not None and \
+                    len(batch.instructions) + len(instructions) > limit:
+                self._send(self.pending.pop(key))
+                batch = None
+            if batch is None:
+                batch = self.pending[key] = _Batch(
+                    method, market_id, self.timer() + self.window)
+                self.condition.notify()
+            batch.add(instructions, future)
+            if self.window <= 0 or len(batch.instructions) >= limit:
+                self._send(self.pending.pop(key))
+        return future
+
+    def place_orders(self, market_id, instructions):
+        """Queue `PlaceInstruction`s; returns a `Future` of a
+        `PlaceExecutionReport`.
+
+        """
+        return self.submit(PLACE_ORDERS, market_id, instructions)
+
+    def cancel_orders(self, market_id, instructions):
+        """Queue `CancelInstruction`s; returns a `Future` of a
+        `CancelExecutionReport`.
+
+        """
+        return self.submit(CANCEL_ORDERS, market_id, instructions)
+
+    def replace_orders(self, market_id, instructions):
+        """Queue `ReplaceInstruction`s; returns a `Future` of a
+        `ReplaceExecutionReport`.
+
+        """
+        return self.submit(REPLACE_ORDERS, market_id, instructions)
+
+    def update_orders(self, market_id, instructions):
+        """Queue `UpdateInstruction`s; returns a `Future` of an
+        `UpdateExecutionReport`.
+
+        """
+        return self.submit(UPDATE_ORDERS, market_id, instructions)
+
+    def flush(self):
+        """Send all queued instructions now."""
+        with self.condition:
+            for key in list(self.pending):
+                self._send(self.pending.pop(key))
+
+    def close(self, wait=True):
+        """Send queued instructions and stop accepting new ones.
+
+        :param bool wait: Wait for calls in flight to complete
+
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.flush()
+        self.thread.join()
+        self.executor.shutdown(wait=wait)
+
+    def _run(self):
+        with self.condition:
+            while not self.closed:
+                now = self.timer()
+                timeout = None
+                for key, batch in list(self.pending.items()):
+                    if batch.deadline <= now:
+                        self._send(self.pending.pop(key))
+                    elif timeout is None or batch.deadline - now < timeout:
+                        timeout = batch.deadline - now
+                self.condition.wait(timeout)
+
+    def _send(self, batch):
+        # Instructions whose futures were cancelled are not sent
+        callers = batch.callers
+        running = [
+            future.set_running_or_notify_cancel() for future, _, _ in callers
+        ]
+        if not all(running):
+            instructions = batch.instructions
+            batch.instructions = []
+            batch.callers = []
+            for future, start, stop in callers:
+                if future.running():
+                    batch.add(instructions[start:stop], future)
+            if not batch.callers:
+                return
+        self.executor.submit(self._call, batch)
+
+    def _call(self, batch):
+        method = getattr(self.client, CLIENT_METHODS[batch.method])
+        try:
+            report = method(batch.market_id, batch.instructions)
+        except Exception as error:
+            for future, _, _ in batch.callers:
+                future.set_exception(error)
+            return
+        for future, start, stop in batch.callers:
+            future.set_result(split_report(report, start, stop))
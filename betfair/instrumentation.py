@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""Per-call instrumentation of the synchronous transport.
+
+`Network` builds a `CallMetrics` for each API call and passes it to the
+`before_call` and `after_call` methods of its instruments. By the time
+`after_call` runs, the call's byte counts and the time spent in each phase
+have been filled in; phases that did not happen (e.g. connecting, when a
+pooled connection was reused) are 0, and phases that were not reached are
+`None`.
+
+`MetricsAggregator` keeps histograms of these values per method, which
+`prometheus_text` renders in the Prometheus text format. `StatsdExporter`
+sends them to a statsd server instead.
+
+"""
+
+import bisect
+import socket
+import threading
+import collections
+
+import six
+
+
+# Phases of a call, in order, all in seconds:
+# queue: waiting for the rate limiter
+# dns: resolving the host name of a new connection
+# connect: opening the TCP connection
+# tls: the TLS handshake
+# server: from sending the request until the response headers arrive
+# transfer: reading (and decompressing) the response body
+# decode: decoding the JSON response
+# model: building models from the result
+TIMINGS = (
+    'queue', 'dns', 'connect', 'tls', 'server', 'transfer', 'decode',
+    'model', 'total',
+)
+
+SIZES = (
+    'request_bytes', 'request_wire_bytes', 'response_bytes',
+    'response_wire_bytes',
+)
+
+
+def method_name(method):
+    """Short name of a JSON-RPC method, e.g. `listMarketBook` for
+    `SportsAPING/v1.0/listMarketBook`; `batch` for batch requests.
+
+    """
+    if isinstance(method, (list, tuple)):
+        return 'batch'
+    return method.rsplit('/', 1)[-1] if method else 'unknown'
+
+
+class CallMetrics(object):
+    """Measurements of one API call.
+
+    :param endpoint: `Endpoint` called
+    :param method: JSON-RPC method, or list of methods of a batch request
+
+    """
+    __slots__ = (
+        ('endpoint', 'method', 'started', 'status', 'error') + TIMINGS +
+        SIZES
+    )
+
+    def __init__(self, endpoint, method):
+        self.endpoint = endpoint
+        self.method = method
+        self.started = None
+        self.status = None
+        self.error = None
+        for key in TIMINGS + SIZES:
+            setattr(self, key, None)
+
+    @property
+    def name(self):
+        return method_name(self.method)
+
+    def timings(self):
+        """Get the measured phases as a dict of seconds."""
+        return dict(
+            (key, getattr(self, key)) for key in TIMINGS
+            if getattr(self, key) is not None
+        )
+
+    def __repr__(self):
+        return '<CallMetrics {0} {1}>'.format(self.name, ', '.join(
+            '{0}={1:.6f}'.format(key, value)
+            for key, value in sorted(six.iteritems(self.timings()))
+        ))
+
+
+class Instrument(object):
+    """Base class of instruments; override either method."""
+
+    def before_call(self, call):
+        """Called with a new `CallMetrics` before a call is made."""
+
+    def after_call(self, call):
+        """Called with the completed `CallMetrics` of a call, including
+        failed calls (see `CallMetrics.error`).
+
+        """
+
+
+# Histogram bounds: 50us to ~26s for timings, 64B to 64MB for sizes
+TIMING_BOUNDS = tuple(0.00005 * 2 ** idx for idx in range(20))
+SIZE_BOUNDS = tuple(64 * 2 ** idx for idx in range(21))
+
+
+class Histogram(object):
+    """Histogram with fixed bucket bounds.
+
+    :param tuple bounds: Ascending upper bounds of the buckets; values above
+        the last bound fall in a final, unbounded bucket
+
+    """
+    def __init__(self, bounds=TIMING_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def cumulative(self):
+        """Get `(upper bound, count of values <= bound)` pairs, ending with
+        `(inf, count)`.
+
+        """
+        total = 0
+        pairs = []
+        for bound, count in six.moves.zip(
+                self.bounds + (float('inf'), ), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q):
+        """Estimate the `q` quantile (0 to 1) by interpolating within its
+        bucket, or `None` if empty.
+
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower = 0.0
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if idx == len(self.bounds):
+                    return self.bounds[-1]
+                upper = self.bounds[idx]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            if idx < len(self.bounds):
+                lower = self.bounds[idx]
+        return self.bounds[-1]
+
+
+class MetricsAggregator(Instrument):
+    """Keep histograms of call timings and sizes, keyed by
+    `(metric, method name)`, and count calls and errors per method.
+
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.calls = collections.Counter()
+        self.errors = collections.Counter()
+
+    def histogram(self, metric, name):
+        key = (metric, name)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            bounds = SIZE_BOUNDS if metric in SIZES else TIMING_BOUNDS
+            histogram = self.histograms[key] = Histogram(bounds)
+        return histogram
+
+    def after_call(self, call):
+        name = call.name
+        with self.lock:
+            self.calls[name] += 1
+            if call.error is not None:
+                self.errors[name] += 1
+            for metric in TIMINGS + SIZES:
+                value = getattr(call, metric)
+                if value is not None:
+                    self.histogram(metric, name).observe(value)
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        """Get `{method name: {metric: {'count', 'mean', quantiles...}}}`."""
+        result = collections.defaultdict(dict)
+        with self.lock:
+            for (metric, name), histogram in six.iteritems(self.histograms):
+                stats = {'count': histogram.count, 'mean': histogram.mean}
+                for q in quantiles:
+                    stats['p{0:g}'.format(q * 100)] = histogram.quantile(q)
+                result[name][metric] = stats
+        return dict(result)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.calls.clear()
+            self.errors.clear()
+
+
+def _labels(**labels):
+    return '{' + ','.join(
+        '{0}="{1}"'.format(key, value)
+        for key, value in sorted(six.iteritems(labels))
+    ) + '}'
+
+
+def _bound(value):
+    return '+Inf' if value == float('inf') else repr(value)
+
+
+def prometheus_text(aggregator, prefix='betfair'):
+    """Render the histograms of a `MetricsAggregator` in the Prometheus text
+    exposition format: `<prefix>_call_seconds` by method and phase,
+    `<prefix>_call_bytes` by method and kind, and call and error counters.
+
+    """
+    lines = []
+    with aggregator.lock:
+        items = sorted(six.iteritems(aggregator.histograms))
+        calls = sorted(six.iteritems(aggregator.calls))
+        errors = sorted(six.iteritems(aggregator.errors))
+    for metric, label, unit in (
+            ('seconds', 'phase', TIMINGS), ('bytes', 'kind', SIZES)):
+        name = '{0}_call_{1}'.format(prefix, metric)
+        lines.append('# TYPE {0} histogram'.format(name))
+        for (key, method), histogram in items:
+            if key not in unit:
+                continue
+            labels = {'method': method, label: key}
+            for bound, count in histogram.cumulative():
+                lines.append('{0}_bucket{1} {2}'.format(
+                    name, _labels(le=_bound(bound), **labels), count))
+            lines.append('{0}_sum{1} {2!r}'.format(
+                name, _labels(**labels), histogram.sum))
+            lines.append('{0}_count{1} {2}'.format(
+                name, _labels(**labels), histogram.count))
+    for metric, counter in (('calls', calls), ('errors', errors)):
+        name = '{0}_{1}_total'.format(prefix, metric)
+        lines.append('# TYPE {0} counter'.format(name))
+        for method, count in counter:
+            lines.append('{0}{1} {2}'.format(
+                name, _labels(method=method), count))
+    return '\n'.join(lines) + '\n'
+
+
+class StatsdExporter(Instrument):
+    """Send call timings (as `ms` timers) and sizes (as `h` histograms) to a
+    statsd server over UDP, named `<prefix>.<method>.<metric>`, with
+    `<prefix>.<method>.calls` and `.errors` counters.
+
+    :param str host:
+    :param int port:
+    :param str prefix: Metric name prefix
+
+    """
+    def __init__(self, host='127.0.0.1', port=8125, prefix='betfair'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def lines(self, call):
+        """Build the statsd lines for a call."""
+        name = '{0}.{1}'.format(self.prefix, call.name)
+        lines = ['{0}.calls:1|c'.format(name)]
+        if call.error is not None:
+            lines.append('{0}.errors:1|c'.format(name))
+        for metric in TIMINGS:
+            value = getattr(call, metric)
+            if value is not None:
+                lines.append('{0}.{1}:{2:.3f}|ms'.format(
+                    name, metric, value * 1000))
+        for metric in SIZES:
+            value = getattr(call, metric)
+            if value is not None:
+                lines.append('{0}.{1}:{2}|h'.format(name, metric, value))
+        return lines
+
+    def after_call(self, call):
+        try:
+            self.socket.sendto(
+                '\n'.join(self.lines(call)).encode('ascii'), self.address)
+        except socket.error:
+            pass
+
+    def close(self):
+        self.socket.close()
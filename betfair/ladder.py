@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""Compact price ladders. `PriceLadder` keeps the levels of a ladder in two
+contiguous `array('d')` buffers of prices and sizes instead of a list of
+`PriceSize` models, and computes depth, cumulative size and weighted
+average price without building per-level objects.
+
+Ladders are read-only sequences: indexing or iterating still yields
+`PriceSize`-like items for compatibility, while `prices` and `sizes` (or
+`to_numpy`, if NumPy is installed) give direct access to the data.
+
+"""
+
+import array
+
+import six
+from six.moves import collections_abc
+
+from .meta.datatype import DataType
+from .meta.field import Field
+
+
+class PriceLadder(collections_abc.Sequence):
+    """Ladder of `(price, size)` levels, in the order returned by Betfair
+    (best price first for available-to-back and available-to-lay ladders).
+
+    :param levels: Iterable of `{'price': ..., 'size': ...}` dicts, objects
+        with `price` and `size` attributes, or `(price, size)` pairs
+    :param item_type: Callable taking `price` and `size` keywords, used to
+        build items on indexing; defaults to `(price, size)` tuples
+
+    """
+    __slots__ = ('prices', 'sizes', 'item_type')
+
+    def __init__(self, levels=(), item_type=None):
+        self.item_type = item_type
+        levels = list(levels)
+        if levels and isinstance(levels[0], dict):
+            self.prices = array.array('d', [item['price'] for item in levels])
+            self.sizes = array.array('d', [item['size'] for item in levels])
+        elif levels and hasattr(levels[0], 'price'):
+            self.prices = array.array('d', [item.price for item in levels])
+            self.sizes = array.array('d', [item.size for item in levels])
+        else:
+            self.prices = array.array('d', [item[0] for item in levels])
+            self.sizes = array.array('d', [item[1] for item in levels])
+
+    @classmethod
+    def from_arrays(cls, prices, sizes, item_type=None):
+        """Build a ladder from sequences of prices and sizes."""
+        ladder = cls.__new__(cls)
+        ladder.item_type = item_type
+        ladder.prices = array.array('d', prices)
+        ladder.sizes = array.array('d', sizes)
+        return ladder
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.from_arrays(
+                self.prices[index], self.sizes[index], self.item_type)
+        price, size = self.prices[index], self.sizes[index]
+        if self.item_type is None:
+            return price, size
+        return self.item_type(price=price, size=size)
+
+    def __eq__(self, other):
+        if isinstance(other, PriceLadder):
+            return self.prices == other.prices and self.sizes == other.sizes
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<PriceLadder {0!r}>'.format(list(self.levels()))
+
+    def levels(self):
+        """Iterate over `(price, size)` pairs."""
+        return six.moves.zip(self.prices, self.sizes)
+
+    def best(self):
+        """Get the best `(price, size)` level, or `None` if empty."""
+        if not self.prices:
+            return None
+        return self.prices[0], self.sizes[0]
+
+    def best_price(self):
+        return self.prices[0] if self.prices else None
+
+    def size_at(self, price):
+        """Get the size available at `price`, or 0."""
+        for level_price, size in six.moves.zip(self.prices, self.sizes):
+            if level_price == price:
+                return size
+        return 0.0
+
+    def total_size(self, depth=None):
+        """Get the total size of the first `depth` levels (all by default).
+        """
+        return sum(self.sizes[:depth])
+
+    def cumulative_sizes(self):
+        """Get the running total of sizes, level by level."""
+        return array.array('d', _accumulate(self.sizes))
+
+    def vwap(self, depth=None):
+        """Get the size-weighted average price of the first `depth` levels
+        (all by default), or `None` if they hold no size.
+
+        """
+        sizes = self.sizes[:depth]
+        total = sum(sizes)
+        if not total:
+            return None
+        return sum(
+            price * size for price, size in six.moves.zip(self.prices, sizes)
+        ) / total
+
+    def to_numpy(self):
+        """Get `(prices, sizes)` as NumPy arrays sharing the ladder's memory.
+
+        :raises: ImportError if NumPy is not installed
+
+        """
+        import numpy
+        return (
+            numpy.frombuffer(self.prices, dtype=numpy.float64),
+            numpy.frombuffer(self.sizes, dtype=numpy.float64),
+        )
+
+    def serialize(self):
+        return [
+            {'price': price, 'size': size} for price, size in self.levels()
+        ]
+
+
+def iter_levels(ladder):
+    """Iterate over the `(price, size)` pairs of a `PriceLadder` or a list
+    of `PriceSize` models.
+
+    """
+    if isinstance(ladder, PriceLadder):
+        return ladder.levels()
+    return ((level.price, level.size) for level in ladder)
+
+
+def _accumulate(values):
+    total = 0.0
+    for value in values:
+        total += value
+        yield total
+
+
+class LadderType(DataType):
+    """Decode a list of price/size levels into a `PriceLadder`.
+
+    :param type item_type: Model built when indexing the ladder, e.g.
+        `PriceSize`
+
+    """
+    def __init__(self, item_type=None):
+        super(LadderType, self).__init__(PriceLadder)
+        self.item_type = item_type
+
+    def serialize(self, value):
+        return value.serialize() if value is not None else None
+
+    def unserialize(self, value):
+        if isinstance(value, PriceLadder):
+            return value
+        if not isinstance(value, collections_abc.Sequence):
+            raise ValueError
+        return PriceLadder(value, self.item_type)
+
+
+class LadderField(Field):
+    """Field holding a `PriceLadder`; empty when unset."""
+
+    def missing_value(self):
+        return PriceLadder((), self.data_type.item_type)
+
+    def is_null(self, value):
+        return not value
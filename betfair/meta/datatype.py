@@ -2,6 +2,9 @@
 
 class DataType(object):
 
+    # Whether values may be kept raw and unserialized on first access
+    deferrable = False
+
     def __init__(self, type, preprocessor=None):
         self.type = type
         self.preprocessor = preprocessor
@@ -19,3 +22,10 @@ class DataType(object):
         if type(processed) == dict:
             return self.type(**processed)
         return self.type(processed)
+
+    def unserialize_lazy(self, value):
+        """Unserialize `value`, deferring the unserialization of any nested
+        models until they are accessed.
+
+        """
+        return self.unserialize(value)
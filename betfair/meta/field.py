@@ -1,30 +1,115 @@
 # -*- coding: utf-8 -*-
 
-import weakref
-import collections
+from six.moves import collections_abc
 
 from . import exceptions
+from .datatype import DataType
+
+
+class RawValue(object):
+    """Raw value of a lazily loaded field, unserialized on first access."""
+
+    __slots__ = ('raw', )
+
+    def __init__(self, raw):
+        self.raw = raw
 
 
 class Field(object):
+    """Model attribute. Values are kept in a per-instance slot created by
+    `ModelMeta`, which binds each field to its slot via `bind`. A slot may
+    hold a `RawValue` when the model was loaded lazily.
 
+    """
     def __init__(self, data_type, required=False):
         self.data_type = data_type
         self.required = required
-        self.data = weakref.WeakKeyDictionary()
+        self.name = None
+        self.member = None
+
+    def bind(self, name, member):
+        """Attach the field to its model attribute.
+
+        :param str name: Attribute name
+        :param member: Slot descriptor storing the value on instances
+
+        """
+        self.name = name
+        self.member = member
 
     def __get__(self, instance, owner):
+        if instance is None:
+            return self
         try:
-            return self.data[instance]
-        except KeyError:
-            self.data[instance] = self.missing_value()
-            return self.data[instance]
+            value = self.member.__get__(instance, owner)
+        except AttributeError:
+            value = self.missing_value()
+            self.member.__set__(instance, value)
+            return value
+        if type(value) is RawValue:
+            value = self.materialize(value.raw)
+            self.member.__set__(instance, value)
+        return value
 
     def __set__(self, instance, value, safe=False):
         value = self.data_type.unserialize(value)
         if self.required and self.is_null(value) and not safe:
             raise exceptions.MissingValueError('Value must not be `None`')
-        self.data[instance] = value
+        self.member.__set__(instance, value)
+
+    def make_loader(self):
+        """Build a function that unserializes a value onto an instance, as
+        `__set__` with `safe=True` does, without the per-call attribute
+        lookups. Used by compiled model constructors.
+
+        """
+        set_value = self.member.__set__
+        unserialize = self.data_type.unserialize
+        if type(self.data_type) is DataType and \
+                self.data_type.preprocessor is None:
+            value_type = self.data_type.type
+
+            def load(instance, value):
+                if type(value) is not value_type:
+                    value = unserialize(value)
+                set_value(instance, value)
+        else:
+            def load(instance, value):
+                set_value(instance, unserialize(value))
+        return load
+
+    def make_lazy_loader(self):
+        """Build a loader that keeps nested model data raw until the field
+        is first accessed.
+
+        """
+        if not self.data_type.deferrable:
+            return self.make_loader()
+        set_value = self.member.__set__
+        unserialize = self.data_type.unserialize
+
+        def load(instance, value):
+            if type(value) is dict:
+                set_value(instance, RawValue(value))
+            else:
+                set_value(instance, unserialize(value))
+        return load
+
+    def materialize(self, raw):
+        return self.data_type.unserialize_lazy(raw)
+
+    def is_missing(self, instance):
+        """Check whether a required value is absent, without unserializing
+        raw values.
+
+        """
+        try:
+            value = self.member.__get__(instance, None)
+        except AttributeError:
+            return True
+        if type(value) is RawValue:
+            value = value.raw
+        return self.is_null(value)
 
     def missing_value(self):
         return None
@@ -37,13 +122,14 @@ class Field(object):
         return self.data_type.serialize(value)
 
 
-class ListContainer(collections.MutableSequence):
+class ListContainer(collections_abc.MutableSequence):
 
-    def __init__(self, data_type, value=None):
-        self.data = []
+    def __init__(self, data_type, value=None, lazy=False):
         self.data_type = data_type
-        for item in (value or []):
-            self.append(item)
+        unserialize = (
+            data_type.unserialize_lazy if lazy else data_type.unserialize
+        )
+        self.data = [unserialize(item) for item in (value or [])]
 
     def __getitem__(self, key):
         return self.data[key]
@@ -66,9 +152,33 @@ class ListField(Field):
     def __set__(self, instance, value, safe=False):
         if self.required and self.is_null(value) and not safe:
             raise ValueError
-        if not isinstance(value, collections.MutableSequence):
+        if not isinstance(value, collections_abc.MutableSequence):
             raise ValueError
-        self.data[instance] = ListContainer(self.data_type, value)
+        self.member.__set__(instance, ListContainer(self.data_type, value))
+
+    def make_loader(self):
+        set_value = self.member.__set__
+        data_type = self.data_type
+
+        def load(instance, value):
+            if not isinstance(value, collections_abc.MutableSequence):
+                raise ValueError
+            set_value(instance, ListContainer(data_type, value))
+        return load
+
+    def make_lazy_loader(self):
+        if not self.data_type.deferrable:
+            return self.make_loader()
+        set_value = self.member.__set__
+
+        def load(instance, value):
+            if not isinstance(value, collections_abc.MutableSequence):
+                raise ValueError
+            set_value(instance, RawValue(value))
+        return load
+
+    def materialize(self, raw):
+        return ListContainer(self.data_type, raw, lazy=True)
 
     def missing_value(self):
         return ListContainer(self.data_type)
@@ -11,23 +11,52 @@ class Model(object):
     are collected in `_fields`. Note: to avoid circular definitions, the
     `ModelMeta` metaclass is not applied until after `Model` has been defined.
 
+    Field values live in `__slots__` generated by `ModelMeta`. When
+    `compiled` is true (the default), construction uses per-class key maps
+    and field loaders built at class-creation time; set it to false on a
+    class (or on `Model`) to fall back to the generic, per-key path.
+
+    Compiled models can also be loaded lazily (see `from_dict`): nested
+    model fields then keep their raw data and are unserialized on first
+    access.
+
     """
+    compiled = True
+
     def __init__(self, **kwargs):
         self.unserialize(kwargs)
 
-    def serialize_key(self, key):
+    @classmethod
+    def from_dict(cls, data, lazy=False):
+        """Build an instance from a dictionary of (external or internal) keys.
+
+        :param dict data: Field values
+        :param bool lazy: Defer unserializing nested models until they are
+            accessed; ignored unless the model is compiled
+
+        """
+        instance = cls.__new__(cls)
+        instance.unserialize(data, lazy=lazy)
+        return instance
+
+    @classmethod
+    def serialize_key(cls, key):
         return key
 
-    def unserialize_key(self, key):
+    @classmethod
+    def unserialize_key(cls, key):
         return key
 
     def serialize(self):
+        keys = self._serialized_keys
         return {
-            self.serialize_key(key): value.serialize(self)
+            keys[key]: value.serialize(self)
             for key, value in six.iteritems(self._fields)
         }
 
-    def unserialize(self, kwargs):
+    def unserialize(self, kwargs, lazy=False):
+        if self.compiled:
+            return self.unserialize_compiled(kwargs, lazy)
         for key, value in six.iteritems(kwargs):
             key = self.unserialize_key(key)
             if key not in self._fields:
@@ -35,6 +64,26 @@ class Model(object):
             self._fields[key].__set__(self, value, safe=True)
         self.check_complete()
 
+    def unserialize_compiled(self, kwargs, lazy=False):
+        key_map = self._key_map
+        loaders = self._lazy_loaders if lazy else self._loaders
+        for key, value in six.iteritems(kwargs):
+            name = key_map.get(key)
+            if name is None:
+                name = self.unserialize_key(key)
+                if name not in loaders:
+                    raise ValueError(
+                        'Key {0} not in model schema'.format(name))
+            loaders[name](self, value)
+        missing = [
+            key for key, value in self._required
+            if value.is_missing(self)
+        ]
+        if missing:
+            raise ValueError('Missing values on fields {0}'.format(
+                ', '.join(missing)
+            ))
+
     def check_complete(self):
         missing = [
             key for key, value in six.iteritems(self._fields)
@@ -48,7 +97,7 @@ class Model(object):
 
 
 def copy_fields(bases):
-    """Deep-copy and collect `Field` descriptors from base classes.
+    """Copy and collect `Field` descriptors from base classes.
 
     :param list bases: Base classes
     :returns: Dictionary of `Field` descriptors
@@ -58,17 +107,39 @@ def copy_fields(bases):
     for base in bases[::-1]:
         if issubclass(base, Model):
             fields.update({
-                key: copy.deepcopy(value)
+                key: copy.copy(value)
                 for key, value in six.iteritems(base._fields)
             })
     return fields
 
 
+def slot_name(key):
+    """Name of the slot holding the value of field `key`."""
+    return '_' + key
+
+
 class ModelMeta(type):
     """Model metaclass. Collects field descriptors and inherits fields from
-    parent.
+    parent, adds a `__slots__` entry for each new field and precomputes
+    lookup tables: `_serialized_keys` (field name to external key),
+    `_key_map` (external or internal key to field name), `_loaders` and
+    `_lazy_loaders` (field name to loader function) and `_required`
+    (required fields).
 
     """
+    def __new__(mcs, name, bases, dct):
+        if '__slots__' not in dct:
+            inherited = set()
+            for base in bases:
+                inherited.update(getattr(base, '_fields', {}))
+            dct = dict(dct)
+            dct['__slots__'] = tuple(
+                slot_name(key)
+                for key, value in six.iteritems(dct)
+                if isinstance(value, Field) and key not in inherited
+            )
+        return super(ModelMeta, mcs).__new__(mcs, name, bases, dct)
+
     def __init__(cls, name, bases, dct):
         cls._fields = copy_fields(bases)
         cls._fields.update({
@@ -76,6 +147,32 @@ class ModelMeta(type):
             for key, value in six.iteritems(dct)
             if isinstance(value, Field)
         })
+        for key, value in six.iteritems(cls._fields):
+            value.bind(key, getattr(cls, slot_name(key)))
+        # Reset inherited tables so key hooks compute entries from scratch
+        cls._serialized_keys = {}
+        cls._key_map = {}
+        serialized_keys = {
+            key: cls.serialize_key(key) for key in cls._fields
+        }
+        key_map = {key: key for key in cls._fields}
+        for key, serialized_key in six.iteritems(serialized_keys):
+            key_map.setdefault(serialized_key, key)
+        cls._serialized_keys = serialized_keys
+        cls._key_map = key_map
+        cls._loaders = {
+            key: value.make_loader()
+            for key, value in six.iteritems(cls._fields)
+        }
+        cls._lazy_loaders = {
+            key: value.make_lazy_loader()
+            for key, value in six.iteritems(cls._fields)
+        }
+        cls._required = [
+            (key, value)
+            for key, value in six.iteritems(cls._fields)
+            if value.required
+        ]
         super(ModelMeta, cls).__init__(name, bases, dct)
 
 
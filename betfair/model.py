@@ -1,23 +1,30 @@
 # -*- coding: utf-8 -*-
 
-import inflection
-
+from . import utils
 from .meta.model import Model
 
 
 class BetfairModel(Model):
     """Handle conversions between internal (underscore) and external (camel-
     cased) key formatting; handle trailing underscores used to avoid conflicts
-    with build-ins (e.g. from_).
+    with build-ins (e.g. from_). Keys of declared fields are looked up in the
+    tables built by `ModelMeta`; other keys fall back to memoized inflection.
 
     """
-    def serialize_key(self, key):
-        return inflection.camelize(
-            key, uppercase_first_letter=False
-        ).rstrip('_')
+    @classmethod
+    def serialize_key(cls, key):
+        try:
+            return cls._serialized_keys[key]
+        except KeyError:
+            return utils.camelize_key(key)
 
-    def unserialize_key(self, key):
-        key = inflection.underscore(key)
-        if key in self._fields:
+    @classmethod
+    def unserialize_key(cls, key):
+        try:
+            return cls._key_map[key]
+        except KeyError:
+            pass
+        key = utils.underscore_key(key)
+        if key in cls._fields:
             return key
         return key + '_'
@@ -7,9 +7,12 @@ from . import constants
 from .meta.datatype import DataType
 from .meta.field import Field, ListField
 from .datatype import EnumType, ModelType, datetime_type
+from .ladder import LadderField, LadderType
 
 from .model import BetfairModel
 
+long = six.integer_types[-1]
+
 
 class Event(BetfairModel):
     id = Field(DataType(six.text_type))
@@ -171,6 +174,30 @@ class MarketBook(BetfairModel):
     runners = ListField(ModelType(Runner))
 
 
+# Variants of the market book models whose ladders are read-only
+# `ladder.PriceLadder`s instead of lists of `PriceSize`; returned by
+# `list_market_book` on clients created with `ladders=True`
+
+class LadderStartingPrices(StartingPrices):
+    back_stake_taken = LadderField(LadderType(PriceSize))
+    lay_liability_taken = LadderField(LadderType(PriceSize))
+
+
+class LadderExchangePrices(ExchangePrices):
+    available_to_back = LadderField(LadderType(PriceSize))
+    available_to_lay = LadderField(LadderType(PriceSize))
+    traded_volume = LadderField(LadderType(PriceSize))
+
+
+class LadderRunner(Runner):
+    sp = Field(ModelType(LadderStartingPrices))
+    ex = Field(ModelType(LadderExchangePrices))
+
+
+class LadderMarketBook(MarketBook):
+    runners = ListField(ModelType(LadderRunner))
+
+
 class RunnerProfitAndLoss(BetfairModel):
     selection_id = Field(DataType(six.text_type))
     if_win = Field(DataType(float))
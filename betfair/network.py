@@ -1,53 +1,416 @@
+from __future__ import print_function
+
+import zlib
+import time
 import treq
+import socket
 import requests
-import json
 import logging
+import threading
+import contextlib
+from timeit import default_timer
+from requests.adapters import HTTPAdapter
+from urllib3 import connection as urllib3_connection
+from urllib3 import connectionpool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+from . import codec as json_codec
 from . import utils
-from constants import Endpoint, Exchange
+from . import exceptions
+from .instrumentation import CallMetrics
+from .constants import Endpoint, Exchange
+from twisted.internet import reactor, task
 from twisted.internet.defer import inlineCallbacks, returnValue
 
 
+API_URLS = {
+    Exchange.UK: "https://api.betfair.com/exchange",
+    Exchange.AUS: "https://api-au.betfair.com/exchange",
+}
+
+ENDPOINT_PATHS = {
+    Endpoint.Betting: "/betting/json-rpc/v1",
+    Endpoint.Account: "/account/json-rpc/v1",
+}
+
+IDENTITY_URL = "https://identitysso.betfair.com/api/"
+
+
+def make_json_payload(method, params, id=1):
+    """Build a Betfair JSON-RPC request object.
+
+    :param str method: JSON-RPC method, e.g. `LIST_MARKET_BOOK`
+    :param dict params: Request parameters
+    :param int id: JSON-RPC request id
+
+    """
+    return {
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": utils.serialize_params(params),
+        "id": id,
+    }
+
+
+# Codec used when none is given; the standard library keeps request bodies
+# byte-for-byte compatible with earlier versions
+DEFAULT_CODEC = json_codec.JSONCodec()
+
+
+def make_json_request(method, params, codec=None):
+    """Encode a Betfair JSON-RPC request body.
+
+    :param str method: JSON-RPC method, e.g. `LIST_MARKET_BOOK`
+    :param dict params: Request parameters
+    :param JSONCodec codec: JSON codec; defaults to the standard library
+
+    """
+    codec = codec or DEFAULT_CODEC
+    return codec.dumps(make_json_payload(method, params))
+
+
+def make_json_batch_request(calls, codec=None):
+    """Encode a JSON-RPC batch request body. Calls are numbered from 1 in
+    order.
+
+    :param list calls: List of (method, params) pairs
+    :param JSONCodec codec: JSON codec; defaults to the standard library
+
+    """
+    codec = codec or DEFAULT_CODEC
+    return codec.dumps([
+        make_json_payload(method, params, id)
+        for id, (method, params) in enumerate(calls, 1)
+    ])
+
+
+def gzip_bytes(data, level=6):
+    """Compress `data` in gzip format.
+
+    :param bytes data:
+    :param int level: Compression level, from 1 (fastest) to 9 (smallest)
+
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class TransferStats(object):
+    """Byte counts of one or more HTTP calls. `request_bytes` and
+    `response_bytes` count the JSON bodies; the `*_wire_bytes` counts are
+    what was sent or received after compression.
+
+    """
+    __slots__ = (
+        'calls', 'request_bytes', 'request_wire_bytes', 'response_bytes',
+        'response_wire_bytes',
+    )
+
+    def __init__(self, calls=0, request_bytes=0, request_wire_bytes=0,
+                 response_bytes=0, response_wire_bytes=0):
+        self.calls = calls
+        self.request_bytes = request_bytes
+        self.request_wire_bytes = request_wire_bytes
+        self.response_bytes = response_bytes
+        self.response_wire_bytes = response_wire_bytes
+
+    def add(self, other):
+        for key in self.__slots__:
+            setattr(self, key, getattr(self, key) + getattr(other, key))
+
+    @property
+    def saved_bytes(self):
+        """Bytes saved by compression."""
+        return (
+            self.request_bytes - self.request_wire_bytes +
+            self.response_bytes - self.response_wire_bytes
+        )
+
+    def __repr__(self):
+        return '<TransferStats {0}>'.format(', '.join(
+            '{0}={1}'.format(key, getattr(self, key))
+            for key in self.__slots__
+        ))
+
+
+# Call being timed on this thread, if any
+_timing = threading.local()
+
+
+class _TimedConnectionMixin(object):
+    """Add the time taken to resolve the host and open new connections to
+    the `CallMetrics` being timed on this thread.
+
+    The host is resolved here, through whatever `socket.getaddrinfo` is
+    current, so that lookups are timed without patching the `socket` module;
+    urllib3 then connects to each resolved address in turn until one
+    accepts.
+
+    """
+    def _new_conn(self):
+        call = getattr(_timing, "call", None)
+        if call is None:
+            return super(_TimedConnectionMixin, self)._new_conn()
+        host = self._dns_host
+        started = default_timer()
+        try:
+            addresses = socket.getaddrinfo(
+                host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror:
+            # Let urllib3 resolve again and raise its own error
+            addresses = [None]
+        finally:
+            call.dns += default_timer() - started
+        started = default_timer()
+        try:
+            for index, address in enumerate(addresses, 1):
+                if address is not None:
+                    self._dns_host = address[4][0]
+                try:
+                    return super(_TimedConnectionMixin, self)._new_conn()
+                except ConnectTimeoutError:
+                    # Also raised for refused connections
+                    if index == len(addresses):
+                        raise
+        finally:
+            self._dns_host = host
+            call.connect += default_timer() - started
+
+
+class _TimedHTTPConnection(
+        _TimedConnectionMixin, urllib3_connection.HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(
+        _TimedConnectionMixin, urllib3_connection.HTTPSConnection):
+
+    def connect(self):
+        call = getattr(_timing, "call", None)
+        if call is None:
+            return super(_TimedHTTPSConnection, self).connect()
+        opened = call.dns + call.connect
+        started = default_timer()
+        try:
+            super(_TimedHTTPSConnection, self).connect()
+        finally:
+            # Time not spent resolving or connecting went on the handshake
+            call.tls += max(
+                default_timer() - started - (call.dns + call.connect - opened),
+                0.0)
+
+
+class _TimedHTTPConnectionPool(connectionpool.HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(connectionpool.HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """`HTTPAdapter` whose connections report DNS, connect and TLS times to
+    the call being timed. Used by `Network` when `time_connections` is set.
+
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super(TimedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
 class Network(object):
+    """Transport for the Betfair JSON-RPC and identity endpoints.
+
+    Synchronous calls go through one pooled `requests.Session` per endpoint
+    (betting, account and identity), so repeated calls reuse open TCP/TLS
+    connections instead of handshaking on every request. Byte counts of each
+    call are kept in `last_transfer` (per thread) and `transfer_totals`.
+
+    Each call is measured in a `CallMetrics` (see `instrumentation`), passed
+    to the `before_call` and `after_call` methods of each of `instruments`
+    and then kept in `last_call` (per thread).
+
+    :param str app_key: Application key
+    :param str session_token: Session token from a previous login
+    :param cert_file: Client certificate used for non-interactive login; a
+        *.pem file or a tuple of (*.crt, *.key) files
+    :param bool gzip_compress: Ask for gzip/deflate-compressed responses,
+        which are decompressed as they are read; if false, ask for
+        uncompressed responses (`Accept-Encoding: identity`)
+    :param int pool_connections: Number of connection pools to cache per
+        endpoint session
+    :param int pool_maxsize: Maximum number of connections kept open per pool
+    :param bool pool_block: Block when no free connection is available rather
+        than opening a throwaway one
+    :param int max_retries: Retries for failed connection attempts
+    :param bool connection_keep_alive: Ask the server to keep connections
+        open between calls
+    :param str api_url: Override the exchange API root URL (e.g. for a local
+        stub server)
+    :param str identity_url: Override the identity API root URL
+    :param codec: JSON codec, or name of one in `codec.CODECS`; defaults to
+        the fastest installed codec
+    :param int compress_request_min_size: Gzip request bodies of at least
+        this many bytes, e.g. large `placeOrders` batches; if `None`, send
+        requests uncompressed
+    :param recorder: Object whose `record` method is called after each
+        JSON-RPC call, e.g. `recording.TrafficRecorder`
+    :param list instruments: `instrumentation.Instrument`s called before and
+        after each call, e.g. `instrumentation.MetricsAggregator`
+    :param rate_limiter: `ratelimit.RateLimiter` that JSON-RPC calls wait
+        for; the wait is reported as `CallMetrics.queue`
+    :param bool time_connections: Time the DNS, connect and TLS phases of
+        new connections (see `TimedHTTPAdapter`); if false, they are `None`
+        and counted in `CallMetrics.server`
+    """
     def __init__(self, app_key="", session_token="", \
-            pre_request_action=None, gzip_compress=False):
+            pre_request_action=None, gzip_compress=False, \
+            pool_connections=10, pool_maxsize=10, pool_block=False, \
+            max_retries=0, connection_keep_alive=True, api_url=None, \
+            identity_url=None, codec=None, compress_request_min_size=None, \
+            recorder=None, instruments=None, rate_limiter=None, \
+            time_connections=False, \
+            cert_file=('certs/betfair.crt', 'certs/betfair.key')):
         self.app_key = app_key
         self.session_token = session_token
+        self.cert_file = cert_file
         self.pre_request_action = pre_request_action
         self.gzip_compress = gzip_compress
-        self.logger = logging.getLogger(name="BetfairNetwork")     
-
-    @classmethod
-    def __make_json_request(cls, method, params):
-        def _dthandler(obj):
-            # for datetime objects
-            if hasattr(obj, 'isoformat'):
-                return obj.isoformat()
-            # for enum objects
-            if hasattr(obj, 'name'):
-                return obj.name
-            if hasattr(obj, 'serialize'):
-                return obj.serialize()
-            else:
-                raise TypeError, "Object of type %s is not JSON serializable" \
-                    % type(obj)
-
-        json_resp = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": utils.serialize_params(params),
-            "id": 1,
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.max_retries = max_retries
+        self.connection_keep_alive = connection_keep_alive
+        self.api_url = api_url
+        self.identity_url = identity_url or IDENTITY_URL
+        self.codec = json_codec.get_codec(codec)
+        self.compress_request_min_size = compress_request_min_size
+        self.recorder = recorder
+        self.instruments = list(instruments or [])
+        self.rate_limiter = rate_limiter
+        self.time_connections = time_connections
+        self.transfer_totals = TransferStats()
+        self.__transfer_lock = threading.Lock()
+        self.__local = threading.local()
+        self.logger = logging.getLogger(name="BetfairNetwork")
+        self.sessions = {
+            endpoint: self.__make_session() for endpoint in Endpoint
         }
-        return json.dumps(json_resp, default=_dthandler)
+
+    def __make_session(self):
+        adapter_class = \
+            TimedHTTPAdapter if self.time_connections else HTTPAdapter
+        adapter = adapter_class(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            max_retries=self.max_retries)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.connection_keep_alive:
+            session.headers["Connection"] = "close"
+        session.headers["Accept-Encoding"] = \
+            "gzip, deflate" if self.gzip_compress else "identity"
+        return session
+
+    @property
+    def last_transfer(self):
+        """`TransferStats` of the last call made on this thread."""
+        return getattr(self.__local, "transfer", None)
+
+    @property
+    def last_call(self):
+        """`CallMetrics` of the last call made on this thread."""
+        return getattr(self.__local, "last_call", None)
+
+    @contextlib.contextmanager
+    def track(self, endpoint, method):
+        """Measure a call and notify `instruments`. Nested calls on the same
+        thread, such as `invoke_sync` within `Betfair.make_api_request`,
+        add to the outermost call.
+
+        :param Endpoint endpoint:
+        :param method: JSON-RPC method, or list of methods of a batch
+        :returns: Context manager yielding the `CallMetrics`
+        """
+        call = getattr(self.__local, "call", None)
+        if call is not None:
+            yield call
+            return
+        call = CallMetrics(endpoint, method)
+        call.started = time.time()
+        for instrument in self.instruments:
+            instrument.before_call(call)
+        self.__local.call = call
+        started = default_timer()
+        try:
+            yield call
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            call.total = default_timer() - started
+            self.__local.call = None
+            self.__local.last_call = call
+            for instrument in self.instruments:
+                instrument.after_call(call)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(repr(call))
+
+    def __record_transfer(self, data, body, response):
+        content = response.content
+        try:
+            # Bytes read from the socket, before decompression
+            wire_bytes = response.raw.tell()
+        except AttributeError:
+            wire_bytes = len(content)
+        stats = TransferStats(
+            1, len(data), len(body), len(content), wire_bytes or len(content))
+        self.__local.transfer = stats
+        call = getattr(self.__local, "call", None)
+        if call is not None:
+            call.request_bytes = stats.request_bytes
+            call.request_wire_bytes = stats.request_wire_bytes
+            call.response_bytes = stats.response_bytes
+            call.response_wire_bytes = stats.response_wire_bytes
+        with self.__transfer_lock:
+            self.transfer_totals.add(stats)
+
+    def close(self):
+        """Close all pooled connections."""
+        for session in self.sessions.values():
+            session.close()
+
+    def get_url(self, exchange, endpoint):
+        """Build the JSON-RPC URL for an exchange and endpoint.
+
+        :param Exchange exchange: Exchange; anything but `Exchange.AUS` uses
+            the UK exchange
+        :param Endpoint endpoint: `Endpoint.Betting` or `Endpoint.Account`
+        """
+        url = self.api_url
+        if url is None:
+            url = API_URLS.get(exchange, API_URLS[Exchange.UK])
+        if endpoint == Endpoint.Betting:
+            return url + ENDPOINT_PATHS[Endpoint.Betting]
+        return url + ENDPOINT_PATHS[Endpoint.Account]
+
+    def __make_json_request(self, method, params):
+        return make_json_request(method, params, self.codec)
 
 
     @classmethod
     def __error_handler(cls, failure):
         from twisted.web import _newclient
         if failure.check(_newclient.RequestGenerationFailed):
-            print "printError: RequestGenerationFailed"
+            print("printError: RequestGenerationFailed")
             for f in failure.value.reasons:
-                print "printError > %r" % f
-                print f.getTraceback()
+                print("printError > %r" % f)
+                print(f.getTraceback())
 
 
     @inlineCallbacks
@@ -57,10 +420,8 @@ class Network(object):
             "X-Application": [self.app_key.encode("ascii", "ignore")], \
             "X-Authentication": [self.session_token.encode("ascii", "ignore")]}
 
-        data = data.encode("ascii", "ignore")
-        self.logger.debug(url)
-        self.logger.debug(headers)
-        self.logger.debug(data)
+        if not isinstance(data, bytes):
+            data = data.encode("ascii", "ignore")
 
         request = treq.request(method="POST", \
                 url=url.encode("ascii", "ignore"), headers=headers, data=data)
@@ -70,69 +431,146 @@ class Network(object):
         returnValue(content)
 
 
-    def __request_sync(self, url, data, content_type):
+    def __request_sync(self, endpoint, url, data, content_type, method=None):
         headers = \
             {"Content-Type": content_type.encode("ascii", "ignore"), \
             "X-Application": self.app_key.encode("ascii", "ignore"), \
             "X-Authentication": self.session_token.encode("ascii", "ignore")}
 
-        data = data.encode("ascii", "ignore")
-        self.logger.debug(url)
-        self.logger.debug(headers)
-        self.logger.debug(data)
-
-        r = requests.post(url, data=data, headers=headers)
+        if not isinstance(data, bytes):
+            data = data.encode("ascii", "ignore")
+
+        body = data
+        if self.compress_request_min_size is not None and \
+                len(data) >= self.compress_request_min_size:
+            body = gzip_bytes(data)
+            headers["Content-Encoding"] = "gzip"
+
+        call = getattr(self.__local, "call", None)
+        if call is not None and self.time_connections:
+            call.dns = call.connect = call.tls = 0.0
+            _timing.call = call
+        started = time.time()
+        timer = default_timer()
+        try:
+            r = self.sessions[endpoint].post(url, data=body, headers=headers)
+        finally:
+            _timing.call = None
+        if call is not None:
+            call.status = r.status_code
+            # `elapsed` runs until the response headers are parsed
+            elapsed = r.elapsed.total_seconds()
+            call.server = max(elapsed - sum(
+                getattr(call, key) or 0.0
+                for key in ("dns", "connect", "tls")), 0.0)
+            call.transfer = max(default_timer() - timer - elapsed, 0.0)
+        self.__record_transfer(data, body, r)
+        if self.recorder is not None:
+            self.recorder.record(
+                endpoint, method, data, r.status_code, r.content, started,
+                time.time() - started)
         return r
 
 
     @inlineCallbacks
     def invoke(self, exchange, endpoint, method, args):
-        url = ""
-        if exchange == Exchange.AUS:
-            url = "https://api-au.betfair.com/exchange"
-        else:
-            url = "https://api.betfair.com/exchange"
-
-        if endpoint == Endpoint.Betting:
-            url = url + "/betting/json-rpc/v1"
-        else:
-            url = url + "/account/json-rpc/v1"
-
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve(method, args)
+            if delay:
+                yield task.deferLater(reactor, delay, lambda: None)
+        url = self.get_url(exchange, endpoint)
         request = self.__make_json_request(method, args)
         content = yield self.__request(url, request, "application/json")
         returnValue(utils.result_or_error(content))
 
 
-    def invoke_sync(self, exchange, endpoint, method, args):
-        url = ""
-        if exchange == Exchange.AUS:
-            url = "https://api-au.betfair.com/exchange"
-        else:
-            url = "https://api.betfair.com/exchange"
-
-        if endpoint == Endpoint.Betting:
-            url = url + "/betting/json-rpc/v1"
-        else:
-            url = url + "/account/json-rpc/v1"
+    def invoke_sync(self, exchange, endpoint, method, args, body=False,
+                    request=None):
+        """Call a JSON-RPC method.
+
+        :param bool body: Return the undecoded response body instead of the
+            decoded `result`; JSON-RPC errors are then left to the caller
+        :param bytes request: Encoded request body to send instead of
+            encoding `args`, which are then only used by the rate limiter
+
+        """
+        with self.track(endpoint, method) as call:
+            if self.rate_limiter is not None:
+                call.queue = self.rate_limiter.acquire(method, args)
+            url = self.get_url(exchange, endpoint)
+            if request is None:
+                request = self.__make_json_request(method, args)
+            content = self.__request_sync(
+                endpoint, url, request, "application/json", method)
+            if body:
+                utils.check_status_code(content)
+                return content.content
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(content.text)
+            started = default_timer()
+            data = self.codec.loads(content.content)
+            call.decode = default_timer() - started
+            return utils.result_or_error(content, data)
+
+    def invoke_batch_sync(self, exchange, endpoint, calls):
+        """Send several JSON-RPC calls to one endpoint in a single HTTP
+        request.
+
+        :param Exchange exchange:
+        :param Endpoint endpoint:
+        :param list calls: List of (method, params) pairs
+        :returns: Tuple of the HTTP response and a list holding the decoded
+            JSON-RPC response object for each call, in the order of `calls`
+        :raises: BetfairError if the server fails with a 5xx status
+
+        """
+        methods = [method for method, _ in calls]
+        with self.track(endpoint, methods) as call:
+            if self.rate_limiter is not None:
+                call.queue = sum(
+                    self.rate_limiter.acquire(method, params)
+                    for method, params in calls)
+            url = self.get_url(exchange, endpoint)
+            request = make_json_batch_request(calls, self.codec)
+            content = self.__request_sync(
+                endpoint, url, request, "application/json", methods)
+            # Error bodies of server failures are not JSON-RPC responses
+            utils.check_status_code(
+                content, lambda resp: resp.status_code < 500)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(content.text)
+            started = default_timer()
+            data = self.codec.loads(content.content)
+            call.decode = default_timer() - started
+        if not isinstance(data, list):
+            # A single error object applies to the whole batch
+            return content, [data] * len(calls)
+        by_id = dict((item.get("id"), item) for item in data)
+        return content, [
+            by_id.get(id, {"error": {"message": "No response for call"}})
+            for id in range(1, len(calls) + 1)
+        ]
 
-        request = self.__make_json_request(method, args)
-        content = self.__request_sync(url, request, "application/json")
-        self.logger.debug(content.text)
-        return utils.result_or_error(content)
-       
     def login(self, username, password):
+        """Log in with the client certificate and store the session token.
+
+        :raises: BetfairLoginError
 
+        """
+        cert = self.cert_file
+        if isinstance(cert, list):
+            cert = tuple(cert)
         headers = {'X-Application': self.app_key, 'Content-Type': 'application/x-www-form-urlencoded'}
-        resp = requests.post('https://identitysso.betfair.com/api/certlogin',
-                data='username='+username+'&password='+password,
-                cert=('certs/betfair.crt', 'certs/betfair.key'), headers=headers)
-        
-        if resp.json()['loginStatus'] == 'SUCCESS':
-          print 'Logged in.'
-          self.session_token=resp.json()['sessionToken']
-          print self.session_token
-        else:
-          print resp.json()['loginStatus']
+        resp = self.sessions[Endpoint.Identity].post(
+                self.identity_url + 'certlogin',
+                data={'username': username, 'password': password},
+                cert=cert, headers=headers)
+        utils.check_status_code(resp)
+        data = resp.json()
+        if data.get('loginStatus') != 'SUCCESS':
+            raise exceptions.BetfairLoginError(resp, data)
+        print('Logged in.')
+        self.session_token = data['sessionToken']
 
 
     def __identity_request(self, method):
@@ -143,11 +581,10 @@ class Network(object):
             message = "Logged out successfully."
         else:
             message = "Unknown success."
-            
+
         self.logger.debug("network.__identity_request")
-        print self.session_token
-        resp = requests.post(
-            url="https://identitysso.betfair.com/api/" + method,
+        resp = self.sessions[Endpoint.Identity].post(
+            url=self.identity_url + method,
             headers={
                 "X-Application": self.app_key,
                 "X-Authentication": self.session_token,
@@ -156,13 +593,13 @@ class Network(object):
         )
         utils.check_status_code(resp)
         if resp.json()['status'] != 'SUCCESS':
-            print "Request failed."
-            print resp.json()['status']
+            print("Request failed.")
+            print(resp.json()['status'])
         else:
-            print message
+            print(message)
             if method=="logout":
                 self.session_token==""
- 
+
 
     def keep_alive(self):
         self.__identity_request("keepAlive")
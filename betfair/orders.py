@@ -0,0 +1,595 @@
+# -*- coding: utf-8 -*-
+"""Local order book kept up to date from execution reports.
+
+`OrderManager` applies the instruction reports of `place_orders`,
+`cancel_orders`, `replace_orders` and `update_orders` to an in-memory store
+of `Order`s, indexed by bet id, market and runner, so that strategies can
+read their orders and positions without calling `list_current_orders`
+after every operation. Matches that happen after an order is placed are
+not reported by these calls; `reconcile` (or `maybe_reconcile`, on an
+interval) brings the store in line with `list_current_orders`.
+
+Each `Position` holds the matched and unmatched totals of one runner and is
+adjusted in O(1) whenever one of its orders changes.
+
+"""
+
+import threading
+import collections
+from timeit import default_timer
+
+import six
+
+from . import models
+from .constants import (
+    ExecutionReportStatus, InstructionReportStatus, OrderProjection,
+    OrderStatus, OrderType, Side,
+)
+
+
+def _runner_key(selection_id, handicap=0.0):
+    """Key of a runner within a market. Selection ids are text in order
+    reports and numbers in market books, so they are normalised to text
+    (`1`, `1.0` and `'1'` are the same runner) and handicaps to floats.
+
+    """
+    if isinstance(selection_id, float) and selection_id.is_integer():
+        selection_id = int(selection_id)
+    return six.text_type(selection_id), float(handicap or 0.0)
+
+
+class Order(object):
+    """State of one bet.
+
+    `price` and `size` are those requested; for `LIMIT_ON_CLOSE` and
+    `MARKET_ON_CLOSE` orders `size` is `None` and `bsp_liability` holds
+    the requested liability.
+
+    """
+    __slots__ = (
+        'bet_id', 'market_id', 'selection_id', 'handicap', 'side',
+        'order_type', 'persistence_type', 'status', 'price', 'size',
+        'bsp_liability', 'average_price_matched', 'size_matched',
+        'size_remaining', 'size_cancelled', 'size_lapsed', 'size_voided',
+        'placed_date', 'customer_ref',
+    )
+
+    def __init__(self, bet_id, market_id, selection_id, handicap=0.0,
+                 side=None, order_type=None, persistence_type=None,
+                 status=OrderStatus.EXECUTABLE, price=None, size=None,
+                 bsp_liability=None, average_price_matched=None,
+                 size_matched=0.0, size_remaining=None, size_cancelled=0.0,
+                 size_lapsed=0.0, size_voided=0.0, placed_date=None,
+                 customer_ref=None):
+        self.bet_id = bet_id
+        self.market_id = market_id
+        self.selection_id = selection_id
+        self.handicap = handicap or 0.0
+        self.side = side
+        self.order_type = order_type
+        self.persistence_type = persistence_type
+        self.status = status
+        self.price = price
+        self.size = size
+        self.bsp_liability = bsp_liability
+        self.average_price_matched = average_price_matched
+        self.size_matched = size_matched or 0.0
+        if size_remaining is None:
+            size_remaining = max((size or 0.0) - self.size_matched, 0.0)
+        self.size_remaining = size_remaining
+        self.size_cancelled = size_cancelled or 0.0
+        self.size_lapsed = size_lapsed or 0.0
+        self.size_voided = size_voided or 0.0
+        self.placed_date = placed_date
+        self.customer_ref = customer_ref
+
+    @property
+    def runner_key(self):
+        return (self.market_id,) + _runner_key(
+            self.selection_id, self.handicap)
+
+    @property
+    def executable(self):
+        return self.status == OrderStatus.EXECUTABLE
+
+    def __repr__(self):
+        return '<Order {0} {1} {2}@{3} matched={4} remaining={5}>'.format(
+            self.bet_id, getattr(self.side, 'name', self.side), self.size,
+            self.price, self.size_matched, self.size_remaining)
+
+
+class Position(object):
+    """Matched and unmatched totals of the orders on one runner.
+
+    Matched backs win `back_profit` if the runner wins and lose
+    `back_stake` otherwise; matched lays lose `lay_liability` if it wins
+    and win `lay_stake` otherwise.
+
+    """
+    __slots__ = (
+        'back_stake', 'back_profit', 'lay_stake', 'lay_liability',
+        'back_unmatched', 'lay_unmatched', 'lay_unmatched_liability',
+    )
+
+    def __init__(self):
+        for key in self.__slots__:
+            setattr(self, key, 0.0)
+
+    def add(self, order, sign=1):
+        """Add (or, with `sign=-1`, remove) the contribution of an order."""
+        matched = order.size_matched
+        if matched and order.average_price_matched:
+            odds = order.average_price_matched - 1
+            if order.side == Side.BACK:
+                self.back_stake += sign * matched
+                self.back_profit += sign * matched * odds
+            else:
+                self.lay_stake += sign * matched
+                self.lay_liability += sign * matched * odds
+        remaining = order.size_remaining if order.executable else 0.0
+        if remaining and order.price is not None:
+            if order.side == Side.BACK:
+                self.back_unmatched += sign * remaining
+            else:
+                self.lay_unmatched += sign * remaining
+                self.lay_unmatched_liability += \
+                    sign * remaining * (order.price - 1)
+
+    @property
+    def matched(self):
+        return self.back_stake + self.lay_stake
+
+    @property
+    def unmatched(self):
+        return self.back_unmatched + self.lay_unmatched
+
+    @property
+    def if_win(self):
+        """Profit on matched bets if the runner wins."""
+        return self.back_profit - self.lay_liability
+
+    @property
+    def if_lose(self):
+        """Profit on matched bets if the runner loses."""
+        return self.lay_stake - self.back_stake
+
+
+class MarketPosition(object):
+    """Positions of the runners of one market, with the sum of their
+    `if_lose` profits kept alongside.
+
+    """
+    __slots__ = ('market_id', 'runners', 'if_lose')
+
+    def __init__(self, market_id):
+        self.market_id = market_id
+        self.runners = {}
+        self.if_lose = 0.0
+
+    def profit_if_wins(self, selection_id, handicap=0.0):
+        """Profit on matched bets if one runner wins and the rest lose."""
+        position = self.runners.get(_runner_key(selection_id, handicap))
+        if position is None:
+            return self.if_lose
+        return position.if_win + self.if_lose - position.if_lose
+
+    def worst_case(self):
+        """Lowest profit over the outcomes where one of the runners with
+        orders, or none of them, wins.
+
+        """
+        return min([self.if_lose] + [
+            position.if_win + self.if_lose - position.if_lose
+            for position in six.itervalues(self.runners)
+        ])
+
+    @property
+    def exposure(self):
+        """Matched exposure: the worst-case loss, as a positive number."""
+        return max(-self.worst_case(), 0.0)
+
+    @property
+    def unmatched_exposure(self):
+        """Largest additional loss if all unmatched orders were matched."""
+        return sum(
+            position.back_unmatched + position.lay_unmatched_liability
+            for position in six.itervalues(self.runners)
+        )
+
+
+def _to_model(model, item):
+    return item if isinstance(item, model) else model(**item)
+
+
+def _succeeded(report):
+    return report is not None and \
+        report.status == InstructionReportStatus.SUCCESS
+
+
+class OrderManager(object):
+    """In-memory order store fed by execution reports.
+
+    :param Betfair client: Client used by the order methods and
+        `reconcile`; optional if reports are applied by hand
+    :param float reconcile_interval: Seconds between reconciliations in
+        `maybe_reconcile`
+    :param timer: Clock returning seconds
+
+    """
+    def __init__(self, client=None, reconcile_interval=60,
+                 timer=default_timer):
+        self.client = client
+        self.reconcile_interval = reconcile_interval
+        self.timer = timer
+        self.reconciled_at = None
+        self.lock = threading.RLock()
+        self.orders = {}
+        self.by_market = collections.defaultdict(set)
+        self.by_runner = collections.defaultdict(set)
+        self.positions = {}
+
+    # Queries
+
+    def get(self, bet_id):
+        """Get an order by bet id, or `None`."""
+        return self.orders.get(bet_id)
+
+    def market_orders(self, market_id):
+        return [self.orders[bet_id] for bet_id in self.by_market[market_id]]
+
+    def runner_orders(self, market_id, selection_id, handicap=0.0):
+        return [
+            self.orders[bet_id] for bet_id in
+            self.by_runner[(market_id,) + _runner_key(selection_id, handicap)]
+        ]
+
+    def executable_orders(self, market_id=None):
+        orders = six.itervalues(self.orders) if market_id is None \
+            else self.market_orders(market_id)
+        return [order for order in orders if order.executable]
+
+    def market_position(self, market_id):
+        """Get the `MarketPosition` of a market (empty if unknown)."""
+        position = self.positions.get(market_id)
+        return position if position is not None else MarketPosition(market_id)
+
+    def position(self, market_id, selection_id, handicap=0.0):
+        """Get the `Position` of a runner (empty if unknown)."""
+        position = self.market_position(market_id).runners.get(
+            _runner_key(selection_id, handicap))
+        return position if position is not None else Position()
+
+    # Store updates
+
+    def _contribute(self, order, sign):
+        market = self.positions.get(order.market_id)
+        if market is None:
+            market = self.positions[order.market_id] = \
+                MarketPosition(order.market_id)
+        key = _runner_key(order.selection_id, order.handicap)
+        position = market.runners.get(key)
+        if position is None:
+            position = market.runners[key] = Position()
+        market.if_lose -= position.if_lose
+        position.add(order, sign)
+        market.if_lose += position.if_lose
+
+    def add(self, order):
+        """Add or replace an order."""
+        with self.lock:
+            previous = self.orders.get(order.bet_id)
+            if previous is not None:
+                self._contribute(previous, -1)
+            self.orders[order.bet_id] = order
+            self.by_market[order.market_id].add(order.bet_id)
+            self.by_runner[order.runner_key].add(order.bet_id)
+            self._contribute(order, 1)
+        return order
+
+    def update(self, bet_id, **values):
+        """Set attributes of an order, keeping positions in step.
+
+        :returns: The order, or `None` if it is not in the store
+
+        """
+        with self.lock:
+            order = self.orders.get(bet_id)
+            if order is None:
+                return None
+            self._contribute(order, -1)
+            for key, value in six.iteritems(values):
+                setattr(order, key, value)
+            # Without a requested size (market-on-close orders) nothing
+            # remaining does not mean the order is complete
+            if order.size is not None and not order.size_remaining:
+                order.status = OrderStatus.EXECUTION_COMPLETE
+            self._contribute(order, 1)
+        return order
+
+    def remove(self, bet_id):
+        """Drop an order, e.g. once it has been settled."""
+        with self.lock:
+            order = self.orders.pop(bet_id, None)
+            if order is None:
+                return None
+            self._contribute(order, -1)
+            self.by_market[order.market_id].discard(bet_id)
+            self.by_runner[order.runner_key].discard(bet_id)
+        return order
+
+    def clear_market(self, market_id):
+        """Drop all orders of a market, e.g. once it has closed."""
+        with self.lock:
+            for bet_id in list(self.by_market.pop(market_id, ())):
+                order = self.orders.pop(bet_id)
+                self.by_runner[order.runner_key].discard(bet_id)
+            self.positions.pop(market_id, None)
+
+    # Execution reports
+
+    def apply_place(self, report, customer_ref=None):
+        """Add the orders placed by a `PlaceExecutionReport`.
+
+        :returns: List of new `Order`s
+
+        """
+        report = _to_model(models.PlaceExecutionReport, report)
+        return [
+            self._apply_place_instruction(
+                instruction_report, report.market_id,
+                customer_ref or report.customer_ref)
+            for instruction_report in report.instruction_reports
+            if _succeeded(instruction_report) and instruction_report.bet_id
+        ]
+
+    def _apply_place_instruction(self, report, market_id, customer_ref=None):
+        instruction = report.instruction
+        price = size = bsp_liability = persistence_type = None
+        if instruction.order_type == OrderType.LIMIT:
+            limit_order = instruction.limit_order
+            price = limit_order.price
+            size = limit_order.size
+            persistence_type = limit_order.persistence_type
+        elif instruction.order_type == OrderType.LIMIT_ON_CLOSE:
+            price = instruction.limit_on_close_order.price
+            bsp_liability = instruction.limit_on_close_order.liability
+        else:
+            bsp_liability = instruction.market_on_close_order.liability
+        size_matched = report.size_matched or 0.0
+        executable = size is None or size_matched < size
+        return self.add(Order(
+            report.bet_id, market_id, instruction.selection_id,
+            handicap=instruction.handicap, side=instruction.side,
+            order_type=instruction.order_type,
+            persistence_type=persistence_type,
+            status=OrderStatus.EXECUTABLE if executable
+            else OrderStatus.EXECUTION_COMPLETE,
+            price=price, size=size, bsp_liability=bsp_liability,
+            average_price_matched=report.average_price_matched,
+            size_matched=size_matched, placed_date=report.placed_date,
+            customer_ref=customer_ref,
+        ))
+
+    def apply_cancel(self, report):
+        """Reduce or cancel the orders of a `CancelExecutionReport`.
+
+        :returns: List of updated `Order`s
+
+        """
+        report = _to_model(models.CancelExecutionReport, report)
+        orders = []
+        for instruction_report in report.instruction_reports:
+            order = self._apply_cancel_instruction(instruction_report)
+            if order is not None:
+                orders.append(order)
+        return orders
+
+    def _apply_cancel_instruction(self, report):
+        if not _succeeded(report) or report.instruction is None:
+            return None
+        order = self.orders.get(report.instruction.bet_id)
+        if order is None:
+            return None
+        cancelled = report.size_cancelled or 0.0
+        return self.update(
+            order.bet_id,
+            size_cancelled=order.size_cancelled + cancelled,
+            size_remaining=max(order.size_remaining - cancelled, 0.0))
+
+    def apply_replace(self, report):
+        """Apply a `ReplaceExecutionReport`: each replaced order is
+        cancelled and a new order is placed at the new price.
+
+        :returns: List of new `Order`s
+
+        """
+        report = _to_model(models.ReplaceExecutionReport, report)
+        orders = []
+        for instruction_report in report.instruction_reports:
+            self._apply_cancel_instruction(
+                instruction_report.cancel_instruction_report)
+            place_report = instruction_report.place_instruction_report
+            if _succeeded(place_report) and place_report.bet_id:
+                orders.append(self._apply_place_instruction(
+                    place_report, report.market_id, report.customer_ref))
+        return orders
+
+    def apply_update(self, report):
+        """Apply the persistence changes of an `UpdateExecutionReport`.
+
+        :returns: List of updated `Order`s
+
+        """
+        report = _to_model(models.UpdateExecutionReport, report)
+        orders = []
+        for instruction_report in report.instruction_reports:
+            if not _succeeded(instruction_report):
+                continue
+            instruction = instruction_report.instruction
+            order = self.update(
+                instruction.bet_id,
+                persistence_type=instruction.new_persistence_type)
+            if order is not None:
+                orders.append(order)
+        return orders
+
+    def apply(self, report):
+        """Apply any execution report."""
+        if isinstance(report, models.PlaceExecutionReport):
+            return self.apply_place(report)
+        if isinstance(report, models.CancelExecutionReport):
+            return self.apply_cancel(report)
+        if isinstance(report, models.ReplaceExecutionReport):
+            return self.apply_replace(report)
+        if isinstance(report, models.UpdateExecutionReport):
+            return self.apply_update(report)
+        raise TypeError('Unknown report {0!r}'.format(report))
+
+    # Order operations
+
+    def place_orders(self, market_id, instructions, customer_ref=None):
+        """Call `Betfair.place_orders` and apply its report."""
+        report = self.client.place_orders(
+            market_id, instructions, customer_ref=customer_ref)
+        self.apply_place(report)
+        return report
+
+    def cancel_orders(self, market_id=None, instructions=None,
+                      customer_ref=None):
+        """Call `Betfair.cancel_orders` and apply its report.
+
+        Without `instructions` every executable order of `market_id`, or of
+        all markets if it is `None`, is cancelled once the call succeeds.
+
+        """
+        report = self.client.cancel_orders(
+            market_id, instructions, customer_ref=customer_ref)
+        if instructions:
+            self.apply_cancel(report)
+            return report
+        # Cancelling whole markets reports no instructions
+        if _to_model(models.CancelExecutionReport, report).status != \
+                ExecutionReportStatus.SUCCESS:
+            return report
+        with self.lock:
+            for order in self.executable_orders(market_id):
+                self.update(
+                    order.bet_id,
+                    size_cancelled=order.size_cancelled + order.size_remaining,
+                    size_remaining=0.0,
+                    status=OrderStatus.EXECUTION_COMPLETE)
+        return report
+
+    def replace_orders(self, market_id, instructions, customer_ref=None):
+        """Call `Betfair.replace_orders` and apply its report."""
+        report = self.client.replace_orders(
+            market_id, instructions, customer_ref=customer_ref)
+        self.apply_replace(report)
+        return report
+
+    def update_orders(self, market_id, instructions, customer_ref=None):
+        """Call `Betfair.update_orders` and apply its report."""
+        report = self.client.update_orders(
+            market_id, instructions, customer_ref=customer_ref)
+        self.apply_update(report)
+        return report
+
+    # Reconciliation
+
+    def reconcile(self, summaries, complete=False, market_ids=None,
+                  bet_ids=None, known=None):
+        """Overwrite orders with `list_current_orders` results.
+
+        If `complete` is set, `summaries` hold every current order matching
+        `market_ids` and `bet_ids`, so executable orders in that scope that
+        are missing from them (e.g. lapsed, or cancelled from another
+        session) are marked `EXECUTION_COMPLETE` with nothing remaining.
+
+        :param summaries: `CurrentOrderSummaryReport`, or list of
+            `CurrentOrderSummary` models or raw result dicts
+        :param bool complete: Whether `summaries` are a full snapshot
+        :param list market_ids: Market ids the snapshot was filtered by
+        :param list bet_ids: Bet ids the snapshot was filtered by
+        :param set known: Only complete these bet ids, e.g. those stored
+            before the snapshot was requested; defaults to all
+        :returns: Number of orders reconciled
+
+        """
+        if isinstance(summaries, models.CurrentOrderSummaryReport):
+            summaries = summaries.current_orders
+        count = 0
+        seen = set()
+        with self.lock:
+            for summary in summaries:
+                summary = _to_model(models.CurrentOrderSummary, summary)
+                seen.add(summary.bet_id)
+                previous = self.orders.get(summary.bet_id)
+                price_size = summary.price_size
+                self.add(Order(
+                    summary.bet_id, summary.market_id, summary.selection_id,
+                    handicap=summary.handicap, side=summary.side,
+                    order_type=summary.order_type,
+                    persistence_type=summary.persistence_type,
+                    status=summary.status,
+                    price=price_size.price if price_size else None,
+                    size=price_size.size if price_size else None,
+                    bsp_liability=summary.bsp_liability,
+                    average_price_matched=summary.average_price_matched,
+                    size_matched=summary.size_matched,
+                    size_remaining=summary.size_remaining or 0.0,
+                    size_cancelled=summary.size_cancelled,
+                    size_lapsed=summary.size_lapsed,
+                    size_voided=summary.size_voided,
+                    placed_date=summary.placed_date,
+                    customer_ref=previous.customer_ref if previous else None,
+                ))
+                count += 1
+            if complete:
+                self._complete_missing(seen, market_ids, bet_ids, known)
+        self.reconciled_at = self.timer()
+        return count
+
+    def _complete_missing(self, seen, market_ids, bet_ids, known):
+        if market_ids is not None:
+            candidates = set()
+            for market_id in market_ids:
+                candidates.update(self.by_market.get(market_id, ()))
+        else:
+            candidates = set(self.orders)
+        if bet_ids is not None:
+            candidates.intersection_update(bet_ids)
+        if known is not None:
+            candidates.intersection_update(known)
+        for bet_id in candidates - seen:
+            if self.orders[bet_id].executable:
+                self.update(
+                    bet_id, size_remaining=0.0,
+                    status=OrderStatus.EXECUTION_COMPLETE)
+
+    def maybe_reconcile(self, **kwargs):
+        """Reconcile with `list_current_orders` if `reconcile_interval` has
+        passed since the last reconciliation.
+
+        Every page is fetched, so executable orders in the queried scope
+        that the API no longer reports are completed; see `reconcile`.
+
+        :param dict kwargs: Arguments passed to `list_current_orders`
+        :returns: Whether the store was reconciled
+
+        """
+        now = self.timer()
+        if self.reconciled_at is not None and \
+                now - self.reconciled_at < self.reconcile_interval:
+            return False
+        # Date filters and completed-only projections leave out orders that
+        # may still be executable
+        complete = kwargs.get('date_range') is None and \
+            kwargs.get('order_projection') in (
+                None, OrderProjection.ALL, OrderProjection.EXECUTABLE)
+        with self.lock:
+            known = set(self.orders)
+        self.reconcile(
+            list(self.client.iter_current_orders(**kwargs)),
+            complete=complete, market_ids=kwargs.get('market_ids'),
+            bet_ids=kwargs.get('bet_ids'), known=known)
+        return True
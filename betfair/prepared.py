@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Pre-encoded request bodies for calls that are repeated many times, such
+as polling `list_market_book` with the same projections.
+
+A `PreparedCall` serialises its parameters and encodes the JSON-RPC body
+once. Parameters named as variables are left as gaps in the encoded body;
+each call encodes only the values substituted into them (e.g. a new list of
+market ids) and joins them with the fixed parts, then sends the bytes
+through `Network.invoke_sync` as they are.
+
+Prepared calls are created from the client's own methods::
+
+    book = client.prepare('market_ids').list_market_book(
+        market_ids, price_projection=projection)
+    books = book()
+    books = book(market_ids=other_market_ids)
+
+They bypass the client's `cache`.
+
+"""
+
+import uuid
+
+import six
+
+from . import utils
+from .betfair import Betfair
+from .network import make_json_request
+
+
+def _encode(codec, value):
+    data = codec.dumps(value)
+    return data if isinstance(data, bytes) else data.encode('utf-8')
+
+
+class PreparedCall(object):
+    """A call with its request body encoded ahead of time.
+
+    :param Betfair client: Client the call is sent with
+    :param Endpoint endpoint:
+    :param str method: JSON-RPC method
+    :param dict params: Request parameters, including initial values of the
+        variables
+    :param BetfairModel model: Deserialization format
+    :param str decode: Decoding mode; defaults to the client's `decode`
+    :param tuple variables: Names of the parameters that can be substituted
+        on each call
+
+    """
+    def __init__(self, client, endpoint, method, params, model=None,
+                 decode=None, variables=()):
+        self.client = client
+        self.endpoint = endpoint
+        self.method = method
+        self.params = params
+        self.model = model
+        self.decode = decode
+        self.codec = client.network_client.codec
+        missing = [name for name in variables if name not in params]
+        if missing:
+            raise ValueError('Unknown parameters {0}'.format(
+                ', '.join(missing)))
+        # Encode the body with a unique string in place of each variable,
+        # then split it around them
+        tokens = dict(
+            (name, '__{0}_{1}__'.format(name, uuid.uuid4().hex))
+            for name in variables
+        )
+        template = dict(params)
+        template.update(tokens)
+        body = make_json_request(method, template, self.codec)
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+        positions = []
+        for name, token in six.iteritems(tokens):
+            marker = _encode(self.codec, token)
+            start = body.find(marker)
+            positions.append((start, start + len(marker), name))
+        positions.sort()
+        self.variables = tuple(name for _, _, name in positions)
+        self.segments = []
+        offset = 0
+        for start, stop, _ in positions:
+            self.segments.append(body[offset:start])
+            offset = stop
+        self.segments.append(body[offset:])
+        self.body = None
+        self.body = self.render()
+
+    def render(self, **values):
+        """Build the request body with `values` substituted for the initial
+        values of variables.
+
+        :returns: Encoded request body
+
+        """
+        if not values and self.body is not None:
+            return self.body
+        unknown = set(values) - set(self.variables)
+        if unknown:
+            raise ValueError('Not a variable: {0}'.format(
+                ', '.join(sorted(unknown))))
+        segments = self.segments
+        parts = [segments[0]]
+        for idx, name in enumerate(self.variables, 1):
+            value = values[name] if name in values else self.params[name]
+            parts.append(_encode(
+                self.codec, utils.serialize_value(value)))
+            parts.append(segments[idx])
+        return b''.join(parts)
+
+    def __call__(self, **values):
+        """Send the call, substituting `values` for variables.
+
+        :returns: Result of the call, as returned by the client method
+
+        """
+        params = self.params
+        if values:
+            params = dict(params)
+            params.update(values)
+        return self.client.make_api_request(
+            self.endpoint, self.method, params, self.model,
+            decode=self.decode, request=self.render(**values))
+
+
+class BetfairPreparer(Betfair):
+    """Client whose API methods return `PreparedCall`s instead of sending
+    requests. Create with `Betfair.prepare`.
+
+    """
+    def __init__(self, client, variables=()):
+        self.__dict__.update(client.__dict__)
+        self.client = client
+        self.variables = tuple(variables)
+
+    def make_api_request(
+            self, endpoint, method, params, model=None, decode=None,
+            request=None):
+        return PreparedCall(
+            self.client, endpoint, method, params, model, decode,
+            self.variables)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""Client-side rate limiting of API calls.
+
+Each JSON-RPC method belongs to a category (`ORDERS`, `DATA` or
+`CATALOGUE` by default) with its own token bucket, and optionally to a
+bucket shared by all calls. A call takes one token, or, for order methods,
+one per instruction, which is how Betfair counts transactions.
+
+Calls that have to wait are queued by priority: order operations first,
+then market data, then catalogue and account lookups. A call only overtakes
+earlier calls that do not need any of the same buckets, so lower-priority
+calls never take tokens that a higher-priority call is waiting for.
+
+Betfair does not publish per-second request limits; `DEFAULT_BUDGETS`
+are conservative and should be tuned to the account.
+
+"""
+
+import heapq
+import threading
+import itertools
+import collections
+from timeit import default_timer
+
+import six
+
+from .constants import *
+
+
+ORDERS = 'orders'
+DATA = 'data'
+CATALOGUE = 'catalogue'
+
+ORDER_METHODS = (PLACE_ORDERS, CANCEL_ORDERS, REPLACE_ORDERS, UPDATE_ORDERS)
+
+DEFAULT_CATEGORIES = dict(
+    [(method, ORDERS) for method in ORDER_METHODS] +
+    [(method, DATA) for method in (
+        LIST_MARKET_BOOK, LIST_MARKET_PROFIT_AND_LOSS, LIST_CURRENT_ORDERS,
+        LIST_CLEARED_ORDERS,
+    )]
+)
+
+# Rate (tokens per second) and burst size of each category; order budgets
+# count instructions, and default to Betfair's 5000 transactions per hour
+Budget = collections.namedtuple('Budget', ['rate', 'burst'])
+
+DEFAULT_BUDGETS = {
+    ORDERS: Budget(5000 / 3600.0, 200),
+    DATA: Budget(20, 20),
+    CATALOGUE: Budget(5, 10),
+}
+
+# Lower values go first
+DEFAULT_PRIORITIES = {
+    ORDERS: 0,
+    DATA: 1,
+    CATALOGUE: 2,
+}
+
+
+class TokenBucket(object):
+    """Token bucket refilled at `rate` tokens per second, holding at most
+    `burst` tokens. The balance goes negative when tokens are reserved
+    ahead of time.
+
+    :param float rate: Tokens added per second
+    :param float burst: Capacity
+    :param timer: Clock returning seconds
+
+    """
+    def __init__(self, rate, burst, timer=default_timer):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.timer = timer
+        self.tokens = self.burst
+        self.updated = timer()
+
+    def refill(self, now):
+        if now > self.updated:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, tokens, now):
+        """Get the seconds until `tokens` are available (0 if they are).
+        Requests for more than `burst` tokens wait for a full bucket.
+
+        """
+        self.refill(now)
+        missing = min(tokens, self.burst) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, tokens, now):
+        self.refill(now)
+        self.tokens -= min(tokens, self.burst)
+
+
+def call_cost(method, params):
+    """Get the tokens taken by a call: its number of instructions for order
+    methods, else 1.
+
+    :param str method: JSON-RPC method
+    :param dict params: Request parameters
+
+    """
+    if method in ORDER_METHODS and params:
+        instructions = params.get('instructions')
+        if instructions:
+            return len(instructions)
+    return 1
+
+
+class RateLimiter(object):
+    """Token-bucket scheduler for API calls; see the module docstring.
+
+    :param dict budgets: `Budget` by category; defaults to
+        `DEFAULT_BUDGETS`. Categories without a budget are not limited
+    :param Budget total: Budget shared by all calls, or `None`
+    :param dict categories: Category by JSON-RPC method, added to
+        `DEFAULT_CATEGORIES`; other methods are `CATALOGUE`
+    :param dict priorities: Priority by category; lower values go first
+    :param timer: Clock returning seconds
+
+    """
+    def __init__(self, budgets=None, total=None, categories=None,
+                 priorities=None, timer=default_timer):
+        budgets = DEFAULT_BUDGETS if budgets is None else budgets
+        self.timer = timer
+        self.buckets = dict(
+            (category, TokenBucket(budget.rate, budget.burst, timer))
+            for category, budget in six.iteritems(budgets)
+        )
+        self.total = TokenBucket(total.rate, total.burst, timer) \
+            if total is not None else None
+        self.categories = dict(DEFAULT_CATEGORIES)
+        self.categories.update(categories or {})
+        self.priorities = dict(DEFAULT_PRIORITIES)
+        self.priorities.update(priorities or {})
+        self.condition = threading.Condition()
+        self.waiters = []
+        self.counter = itertools.count()
+
+    def category(self, method):
+        return self.categories.get(method, CATALOGUE)
+
+    def _buckets(self, category):
+        buckets = []
+        if category in self.buckets:
+            buckets.append(self.buckets[category])
+        if self.total is not None:
+            buckets.append(self.total)
+        return buckets
+
+    def _blocked(self, entry):
+        """Check whether a waiter ahead of `entry` needs the same buckets."""
+        buckets = entry[2]
+        for other in sorted(self.waiters):
+            if other is entry:
+                return False
+            if any(bucket in other[2] for bucket in buckets):
+                return True
+        return False
+
+    def acquire(self, method, params=None, priority=None):
+        """Wait until a call may be made and take its tokens.
+
+        :param str method: JSON-RPC method
+        :param dict params: Request parameters, used to count instructions
+        :param int priority: Override the priority of the method's category
+        :returns: Seconds spent waiting
+
+        """
+        category = self.category(method)
+        if priority is None:
+            priority = self.priorities.get(category, 0)
+        cost = call_cost(method, params)
+        buckets = self._buckets(category)
+        if not buckets:
+            return 0.0
+        started = self.timer()
+        with self.condition:
+            entry = (priority, next(self.counter), buckets)
+            heapq.heappush(self.waiters, entry)
+            try:
+                while True:
+                    now = self.timer()
+                    timeout = None
+                    if not self._blocked(entry):
+                        timeout = max(
+                            bucket.wait_time(cost, now) for bucket in buckets)
+                        if timeout <= 0:
+                            for bucket in buckets:
+                                bucket.take(cost, now)
+                            return now - started
+                    self.condition.wait(timeout)
+            finally:
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+                self.condition.notify_all()
+
+    def reserve(self, method, params=None):
+        """Take a call's tokens without waiting, for callers that cannot
+        block (e.g. asynchronous clients). Reserved calls are not queued by
+        priority.
+
+        :returns: Seconds the caller should wait before making the call
+
+        """
+        buckets = self._buckets(self.category(method))
+        cost = call_cost(method, params)
+        with self.condition:
+            now = self.timer()
+            delay = max(
+                [bucket.wait_time(cost, now) for bucket in buckets] + [0.0])
+            for bucket in buckets:
+                bucket.take(cost, now)
+        return delay
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""Record JSON-RPC traffic and replay it from a local HTTP server.
+
+`TrafficRecorder` is passed to `Network` as `recorder` and appends one line
+per call to a log: the call time, how long it took, the endpoint and
+method, and the request and response bodies. Headers, and so the session
+token, are not recorded. Logs ending in `.gz` are gzip-compressed.
+
+`ReplayServer` serves a log over HTTP, so that a client pointed at it with
+`Network(api_url=server.url)` sees the recorded responses:
+
+    network = Network(app_key, token, recorder=TrafficRecorder('poll.log'))
+    ...
+    server = ReplayServer('poll.log', speed=10).start()
+    client.network_client = Network(app_key, token, api_url=server.url)
+
+"""
+
+import io
+import gzip
+import json
+import time
+import zlib
+import threading
+import collections
+
+import six
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from . import codec
+from .constants import Endpoint
+from .network import ENDPOINT_PATHS, gzip_bytes
+
+
+# One recorded call. `timestamp` is when the request was sent (seconds since
+# the epoch) and `elapsed` how long the call took, in seconds; `method` is a
+# list of methods for batch requests
+Record = collections.namedtuple('Record', [
+    'timestamp', 'elapsed', 'endpoint', 'method', 'request', 'status',
+    'response',
+])
+
+
+def _text(data):
+    return data.decode('utf-8') if isinstance(data, bytes) else data
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode)
+    return io.open(path, mode)
+
+
+class TrafficRecorder(object):
+    """Append calls to a log file, one JSON object per line.
+
+    :param str path: Log file; compressed with gzip if it ends in `.gz`
+    :param JSONCodec json_codec: Codec for log lines; defaults to the
+        fastest installed codec
+
+    """
+    def __init__(self, path, json_codec=None):
+        self.path = path
+        self.codec = codec.get_codec(json_codec)
+        self.lock = threading.Lock()
+        self.file = _open(path, 'ab')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, endpoint, method, request, status, response, timestamp,
+               elapsed):
+        """Append one call.
+
+        :param Endpoint endpoint:
+        :param method: JSON-RPC method, or list of methods of a batch
+        :param bytes request: Request body, before compression
+        :param int status: HTTP status code
+        :param bytes response: Response body, after decompression
+        :param float timestamp: Time the request was sent
+        :param float elapsed: Seconds taken by the call
+
+        """
+        line = self.codec.dumps({
+            't': timestamp,
+            'e': elapsed,
+            'endpoint': getattr(endpoint, 'name', endpoint),
+            'method': method,
+            'request': _text(request),
+            'status': status,
+            'response': _text(response),
+        })
+        if not isinstance(line, bytes):
+            line = line.encode('utf-8')
+        with self.lock:
+            self.file.write(line + b'\n')
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def read_log(path, json_codec=None):
+    """Iterate over the `Record`s of a log. A truncated last line, e.g. from
+    a process that was killed while recording, is skipped.
+
+    :param str path: Log file written by `TrafficRecorder`
+    :param JSONCodec json_codec: Codec for log lines
+
+    """
+    json_codec = codec.get_codec(json_codec)
+    with _open(path, 'rb') as fp:
+        while True:
+            try:
+                line = fp.readline()
+            except (EOFError, IOError, zlib.error):
+                return
+            if not line:
+                return
+            if not line.endswith(b'\n'):
+                return
+            item = json_codec.loads(line)
+            yield Record(
+                item['t'], item['e'], Endpoint[item['endpoint']],
+                item['method'], item['request'], item['status'],
+                item['response'],
+            )
+
+
+def canonical_request(request):
+    """Normalise a JSON-RPC request body so that requests differing only in
+    key order or whitespace compare equal.
+
+    """
+    return json.dumps(
+        json.loads(_text(request)), sort_keys=True, separators=(',', ':'))
+
+
+def _method_key(method):
+    return tuple(method) if isinstance(method, list) else method
+
+
+class _Replies(object):
+    """Recorded replies to one kind of request, served in order."""
+
+    def __init__(self):
+        self.records = []
+        self.position = 0
+
+    def pop(self, loop):
+        record = self.records[self.position]
+        if self.position + 1 < len(self.records):
+            self.position += 1
+        elif loop:
+            self.position = 0
+        return record
+
+
+# JSON-RPC error returned for requests that were not recorded
+MISSING_RESPONSE = json.dumps({
+    'jsonrpc': '2.0',
+    'error': {'code': -32601, 'message': 'No recorded response'},
+}).encode('utf-8')
+
+
+class ReplayHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    # HTTP/1.1 so that clients can keep connections alive between calls
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        data = self.rfile.read(length)
+        if self.headers.get('Content-Encoding') == 'gzip':
+            data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+        endpoint = self.server.endpoint(self.path)
+        record = self.server.match(endpoint, data) \
+            if endpoint is not None else None
+        compress = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if record is None:
+            status = 200
+            body = gzip_bytes(MISSING_RESPONSE) if compress \
+                else MISSING_RESPONSE
+        else:
+            delay = self.server.delay(record)
+            if delay:
+                time.sleep(delay)
+            status, body = record.status, self.server.body(record, compress)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if compress:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Serve recorded responses over local HTTP.
+
+    A request gets the recorded response to an identical request (compared
+    by `canonical_request`) or, failing that, to a request for the same
+    method. Repeated requests get the recorded responses in order, starting
+    over once all have been served if `loop` is set and repeating the last
+    one otherwise. Requests for methods that were not recorded get a JSON-RPC
+    error.
+
+    :param records: Log file or iterable of `Record`
+    :param float speed: Replay speed; each response is delayed by its
+        recorded duration divided by `speed`. If `None`, respond at once
+    :param bool loop: Start over once all recorded responses are served
+    :param tuple address: Address to listen on; defaults to a free port on
+        localhost
+
+    """
+    daemon_threads = True
+
+    def __init__(self, records, speed=1.0, loop=True,
+                 address=('127.0.0.1', 0)):
+        BaseHTTPServer.HTTPServer.__init__(self, address, ReplayHandler)
+        if isinstance(records, six.string_types):
+            records = read_log(records)
+        self.speed = speed
+        self.loop = loop
+        self.lock = threading.Lock()
+        self.by_request = collections.defaultdict(_Replies)
+        self.by_method = collections.defaultdict(_Replies)
+        self.bodies = {}
+        for record in records:
+            self.add(record)
+        self.thread = None
+
+    @property
+    def url(self):
+        return 'http://{0}:{1}'.format(*self.server_address)
+
+    def add(self, record):
+        """Add a recorded call to the replies."""
+        with self.lock:
+            self.by_request[
+                (record.endpoint, canonical_request(record.request))
+            ].records.append(record)
+            self.by_method[
+                (record.endpoint, _method_key(record.method))
+            ].records.append(record)
+
+    def endpoint(self, path):
+        """Get the `Endpoint` of a request path, or `None`."""
+        for endpoint, suffix in ENDPOINT_PATHS.items():
+            if path.endswith(suffix):
+                return endpoint
+        return None
+
+    def match(self, endpoint, request):
+        """Get the `Record` to reply to a request with, or `None`."""
+        try:
+            key = (endpoint, canonical_request(request))
+        except ValueError:
+            return None
+        with self.lock:
+            replies = self.by_request.get(key)
+            if replies is None:
+                payload = json.loads(key[1])
+                method = [item.get('method') for item in payload] \
+                    if isinstance(payload, list) else payload.get('method')
+                replies = self.by_method.get((endpoint, _method_key(method)))
+            if replies is None:
+                return None
+            return replies.pop(self.loop)
+
+    def body(self, record, compress):
+        """Get the encoded response of a record, gzipped if `compress` is
+        set. Encoded responses are cached.
+
+        """
+        key = (id(record), compress)
+        body = self.bodies.get(key)
+        if body is None:
+            body = record.response.encode('utf-8')
+            if compress:
+                body = gzip_bytes(body)
+            self.bodies[key] = body
+        return body
+
+    def delay(self, record):
+        """Get the seconds to wait before sending a response."""
+        if not self.speed:
+            return 0
+        return record.elapsed / self.speed
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""Local store of cleared orders for profit and loss reporting.
+
+`ClearedOrderStore` keeps `list_cleared_orders` results in a sqlite
+database, keyed by bet id and indexed by settled date, market and event
+type. `sync` remembers the latest settled date it has stored for each bet
+status and only asks for orders settled since then (less `overlap`, to
+catch settlements that are reported late); orders fetched twice are
+replaced, not duplicated. `profit_by` then reports from the local index
+without calling the API.
+
+Run `python -m betfair.settlements sync <db>` to sync from the command line,
+with credentials in the `BETFAIR_APP_KEY`, `BETFAIR_CERT_FILE`,
+`BETFAIR_USERNAME` and `BETFAIR_PASSWORD` environment variables, and
+`python -m betfair.settlements report <db> --by day` to print a report.
+
+"""
+
+import os
+import sys
+import sqlite3
+import argparse
+import datetime
+import threading
+import collections
+
+from dateutil import tz
+from dateutil.parser import parse as parse_date
+
+from . import models
+from . import codec
+from .constants import BetStatus, Exchange, DECODE_RAW
+from .exceptions import BetfairLoginError
+
+
+# Reporting groups: column (or expression) grouped by
+GROUPS = {
+    'event_type': 'event_type_id',
+    'event': 'event_id',
+    'market': 'market_id',
+    'day': 'substr(settled_date, 1, 10)',
+}
+
+COLUMNS = (
+    'bet_id', 'bet_status', 'settled_date', 'placed_date', 'event_type_id',
+    'event_id', 'market_id', 'selection_id', 'handicap', 'side',
+    'price_matched', 'size_settled', 'profit', 'commission', 'record',
+)
+
+ProfitRow = collections.namedtuple(
+    'ProfitRow', ['key', 'bet_count', 'size_settled', 'profit', 'commission'])
+
+
+def format_date(value):
+    """Format a datetime or ISO 8601 string as a UTC timestamp that sorts
+    chronologically, e.g. `2016-01-01T12:00:00.000Z`.
+
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime.datetime):
+        value = parse_date(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(tz.tzutc()).replace(tzinfo=None)
+    return value.strftime('%Y-%m-%dT%H:%M:%S.') + \
+        '{0:03d}Z'.format(value.microsecond // 1000)
+
+
+def _latest(*dates):
+    dates = [date for date in dates if date is not None]
+    return max(dates) if dates else None
+
+
+class ClearedOrderStore(object):
+    """Cleared orders in a sqlite database; see the module docstring.
+
+    :param str path: Database file
+    :param JSONCodec json_codec: Codec for stored records; defaults to the
+        fastest installed codec
+
+    """
+    def __init__(self, path, json_codec=None):
+        self.path = path
+        self.codec = codec.get_codec(json_codec)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(
+            'CREATE TABLE IF NOT EXISTS cleared_orders ('
+            'bet_id TEXT PRIMARY KEY, bet_status TEXT, settled_date TEXT, '
+            'placed_date TEXT, event_type_id TEXT, event_id TEXT, '
+            'market_id TEXT, selection_id INTEGER, handicap REAL, '
+            'side TEXT, price_matched REAL, size_settled REAL, '
+            'profit REAL, commission REAL, record BLOB);'
+            'CREATE INDEX IF NOT EXISTS cleared_orders_settled_date '
+            'ON cleared_orders (settled_date);'
+            'CREATE INDEX IF NOT EXISTS cleared_orders_market_id '
+            'ON cleared_orders (market_id);'
+            'CREATE INDEX IF NOT EXISTS cleared_orders_event_type_id '
+            'ON cleared_orders (event_type_id);'
+            'CREATE TABLE IF NOT EXISTS sync_state ('
+            'bet_status TEXT PRIMARY KEY, settled_to TEXT, synced_at TEXT);'
+        )
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                'SELECT COUNT(*) FROM cleared_orders').fetchone()[0]
+
+    def _row(self, record, bet_status):
+        data = self.codec.dumps(record)
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        return (
+            record['betId'], bet_status,
+            format_date(record.get('settledDate')),
+            format_date(record.get('placedDate')),
+            record.get('eventTypeId'), record.get('eventId'),
+            record.get('marketId'), record.get('selectionId'),
+            record.get('handicap'), record.get('side'),
+            record.get('priceMatched'), record.get('sizeSettled'),
+            record.get('profit'), record.get('commission'),
+            sqlite3.Binary(data),
+        )
+
+    def add(self, orders, bet_status=BetStatus.SETTLED):
+        """Store cleared orders, replacing those already stored. Orders
+        without a bet id (i.e. grouped with `group_by`) are skipped.
+
+        :param orders: Raw (`DECODE_RAW`) `ClearedOrderSummary` dicts
+        :param BetStatus bet_status: Status the orders were listed with
+        :returns: Latest settled date of the orders, or `None`
+
+        """
+        status = getattr(bet_status, 'name', bet_status)
+        rows = [
+            self._row(order, status) for order in orders if order.get('betId')
+        ]
+        with self.lock:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO cleared_orders ({0}) VALUES ({1})'
+                .format(', '.join(COLUMNS), ', '.join('?' * len(COLUMNS))),
+                rows)
+            self.connection.commit()
+        dates = [row[2] for row in rows if row[2] is not None]
+        return max(dates) if dates else None
+
+    def high_water(self, bet_status=BetStatus.SETTLED):
+        """Get the latest settled date synced for a bet status, or `None`."""
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT settled_to FROM sync_state WHERE bet_status = ?',
+                (getattr(bet_status, 'name', bet_status), )).fetchone()
+        return row[0] if row else None
+
+    def set_high_water(self, bet_status, settled_to):
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)',
+                (getattr(bet_status, 'name', bet_status), settled_to,
+                 format_date(datetime.datetime.now(tz.tzutc()))))
+            self.connection.commit()
+
+    def sync(self, client, bet_status=BetStatus.SETTLED,
+             overlap=datetime.timedelta(minutes=10), batch_size=1000,
+             **kwargs):
+        """Fetch the orders settled since the last sync and store them.
+
+        The high-water mark is only advanced once every page has been
+        stored, so an interrupted sync is picked up again from the same
+        point.
+
+        :param Betfair client: Logged-in client
+        :param BetStatus bet_status:
+        :param datetime.timedelta overlap: How far before the high-water mark
+            to start fetching
+        :param int batch_size: Orders stored per transaction
+        :param dict kwargs: Arguments passed to `iter_cleared_orders`, e.g.
+            `event_type_ids` or `record_count`; `settled_date_range` sets the
+            range of the first sync
+        :returns: Number of orders fetched
+
+        """
+        high_water = self.high_water(bet_status)
+        if high_water is not None:
+            since = parse_date(high_water) - overlap
+            kwargs['settled_date_range'] = models.TimeRange(
+                from_=format_date(since))
+        orders = client.iter_cleared_orders(
+            bet_status, decode=DECODE_RAW, **kwargs)
+        count = 0
+        batch = []
+        for order in orders:
+            batch.append(order)
+            if len(batch) >= batch_size:
+                high_water = _latest(high_water, self.add(batch, bet_status))
+                count += len(batch)
+                batch = []
+        if batch:
+            high_water = _latest(high_water, self.add(batch, bet_status))
+            count += len(batch)
+        if high_water is not None:
+            self.set_high_water(bet_status, high_water)
+        return count
+
+    def _where(self, bet_status, settled_from, settled_to):
+        clauses = ['bet_status = ?']
+        params = [getattr(bet_status, 'name', bet_status)]
+        if settled_from is not None:
+            clauses.append('settled_date >= ?')
+            params.append(format_date(settled_from))
+        if settled_to is not None:
+            clauses.append('settled_date < ?')
+            params.append(format_date(settled_to))
+        return ' AND '.join(clauses), params
+
+    def orders(self, bet_status=BetStatus.SETTLED, settled_from=None,
+               settled_to=None, decode=None):
+        """Iterate over stored orders in settled date order.
+
+        :param BetStatus bet_status:
+        :param settled_from: Earliest settled date, inclusive
+        :param settled_to: Latest settled date, exclusive
+        :param str decode: `DECODE_RAW` for dicts; defaults to
+            `ClearedOrderSummary` models
+
+        """
+        where, params = self._where(bet_status, settled_from, settled_to)
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT record FROM cleared_orders WHERE {0} '
+                'ORDER BY settled_date, bet_id'.format(where),
+                params).fetchall()
+        for row in rows:
+            record = self.codec.loads(bytes(row[0]))
+            yield record if decode == DECODE_RAW else \
+                models.ClearedOrderSummary(**record)
+
+    def profit_by(self, group='day', bet_status=BetStatus.SETTLED,
+                  settled_from=None, settled_to=None):
+        """Sum profit by event type, event, market or (UTC) settlement day.
+
+        :param str group: Key of `GROUPS`
+        :param BetStatus bet_status:
+        :param settled_from: Earliest settled date, inclusive
+        :param settled_to: Latest settled date, exclusive
+        :returns: List of `ProfitRow`, ordered by key
+
+        """
+        if group not in GROUPS:
+            raise ValueError('Unknown group {0!r}; expected one of {1}'.format(
+                group, ', '.join(sorted(GROUPS))))
+        where, params = self._where(bet_status, settled_from, settled_to)
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT {0} AS key, COUNT(*), TOTAL(size_settled), '
+                'TOTAL(profit), TOTAL(commission) FROM cleared_orders '
+                'WHERE {1} GROUP BY key ORDER BY key'.format(
+                    GROUPS[group], where),
+                params).fetchall()
+        return [ProfitRow(*row) for row in rows]
+
+    def export_parquet(self, path, **kwargs):
+        """Write stored orders to a Parquet file with
+        `columnar.ClearedOrderWriter`. Requires `pyarrow`.
+
+        :param str path: Output file
+        :param dict kwargs: Filters passed to `orders`
+
+        """
+        from .columnar import ClearedOrderWriter
+        with ClearedOrderWriter(path) as writer:
+            batch = []
+            for order in self.orders(decode=DECODE_RAW, **kwargs):
+                batch.append(order)
+                if len(batch) >= writer.batch_size:
+                    writer.write(batch)
+                    batch = []
+            writer.write(batch)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m betfair.settlements',
+        description='Sync cleared orders to a local store and report on '
+                    'them.')
+    subparsers = parser.add_subparsers(dest='command')
+    sync = subparsers.add_parser('sync', help='fetch new settlements')
+    sync.add_argument('path', help='database file')
+    sync.add_argument('--exchange', default='UK', choices=[
+        exchange.name for exchange in Exchange])
+    report = subparsers.add_parser('report', help='print profit and loss')
+    report.add_argument('path', help='database file')
+    report.add_argument('--by', default='day', choices=sorted(GROUPS))
+    report.add_argument('--from', dest='settled_from')
+    report.add_argument('--to', dest='settled_to')
+    for subparser in (sync, report):
+        subparser.add_argument('--status', default='SETTLED', choices=[
+            status.name for status in BetStatus])
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.error('expected a command')
+    bet_status = BetStatus[args.status]
+
+    with ClearedOrderStore(args.path) as store:
+        if args.command == 'sync':
+            from .betfair import Betfair
+            client = Betfair(
+                os.environ['BETFAIR_APP_KEY'],
+                os.environ['BETFAIR_CERT_FILE'], Exchange[args.exchange])
+            try:
+                client.login(
+                    os.environ['BETFAIR_USERNAME'],
+                    os.environ['BETFAIR_PASSWORD'])
+            except BetfairLoginError as error:
+                parser.exit(1, 'Login failed: {0}\n'.format(error.message))
+            count = store.sync(client, bet_status)
+            sys.stdout.write('Fetched {0} orders; settled up to {1}\n'.format(
+                count, store.high_water(bet_status)))
+            return
+        for row in store.profit_by(
+                args.by, bet_status, args.settled_from, args.settled_to):
+            sys.stdout.write('{0}\t{1}\t{2:.2f}\t{3:.2f}\t{4:.2f}\n'.format(
+                row.key, row.bet_count, row.size_settled, row.profit,
+                row.commission))
+
+
+if __name__ == '__main__':
+    main()
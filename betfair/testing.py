@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Minimal local JSON-RPC server used to test and benchmark the transport
+without touching the real Betfair endpoints.
+
+"""
+
+import json
+import zlib
+import threading
+
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from .network import gzip_bytes
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    # HTTP/1.1 so that clients can keep connections alive between calls
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        data = self.rfile.read(length)
+        if self.headers.get('Content-Encoding') == 'gzip':
+            data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+        self.server.requests.append(data)
+        request = json.loads(data.decode('utf-8'))
+        compress = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = self.server.body(
+            request.get('method'), request.get('id'), compress)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if compress:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Serve canned JSON-RPC results keyed by method name, gzipped when the
+    client accepts it. Decoded request bodies are kept in `requests`.
+    Encoded responses are cached, so that benchmarks time the client rather
+    than the server.
+
+    :param dict results: Mapping of JSON-RPC method to `result` payload
+
+    """
+    daemon_threads = True
+
+    def __init__(self, results=None, address=('127.0.0.1', 0)):
+        BaseHTTPServer.HTTPServer.__init__(self, address, StubHandler)
+        self.results = results or {}
+        self.requests = []
+        self.bodies = {}
+        self.thread = None
+
+    def body(self, method, id, compress):
+        """Get the encoded response to a request."""
+        result = self.results.get(method, [])
+        key = (method, id, compress)
+        cached = self.bodies.get(key)
+        if cached is not None and cached[0] is result:
+            return cached[1]
+        body = json.dumps({
+            'jsonrpc': '2.0',
+            'result': result,
+            'id': id,
+        }).encode('utf-8')
+        if compress:
+            body = gzip_bytes(body)
+        self.bodies[key] = (result, body)
+        return body
+
+    @property
+    def url(self):
+        return 'http://{0}:{1}'.format(*self.server_address)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""Betfair price ladder ("CLASSIC" tick table) and tick arithmetic. Odds
+between 1.01 and 1000 move in increments that widen with the price; see
+https://docs.developer.betfair.com/display/1smk3cen4v3lu3yomq5qye0ni/placeOrders
+
+Prices are looked up in a precomputed table: exact ticks in O(1) through a
+dict keyed by hundredths, other prices with `bisect`. `nearest_ticks`,
+`tick_offsets` and `tick_distances` call the single-price functions on each
+item of an iterable and return a list.
+
+"""
+
+import bisect
+
+import six
+
+from . import exceptions
+
+
+# (upper bound, increment) of each band, in hundredths
+_BANDS = (
+    (200, 1),
+    (300, 2),
+    (400, 5),
+    (600, 10),
+    (1000, 20),
+    (2000, 50),
+    (3000, 100),
+    (5000, 200),
+    (10000, 500),
+    (100000, 1000),
+)
+
+
+def _build_ticks():
+    ticks = [101]
+    for upper, increment in _BANDS:
+        while ticks[-1] < upper:
+            ticks.append(ticks[-1] + increment)
+    return ticks
+
+
+_HUNDREDTHS = _build_ticks()
+
+# All valid prices, ascending
+TICKS = tuple(value / 100.0 for value in _HUNDREDTHS)
+
+# Index of each tick, keyed by price in hundredths
+_INDEX = {value: idx for idx, value in enumerate(_HUNDREDTHS)}
+
+MIN_PRICE = TICKS[0]
+MAX_PRICE = TICKS[-1]
+
+ROUND_NEAREST = 'nearest'
+ROUND_UP = 'up'
+ROUND_DOWN = 'down'
+
+# Tolerance when matching floats against ticks, in hundredths
+_EPSILON = 1e-6
+
+
+def _exact_index(price):
+    hundredths = price * 100
+    key = int(round(hundredths))
+    if abs(hundredths - key) > _EPSILON:
+        return None
+    return _INDEX.get(key)
+
+
+def is_tick(price):
+    """Check whether `price` is a valid Betfair price."""
+    return _exact_index(float(price)) is not None
+
+
+def tick_index(price):
+    """Get the position of `price` in `TICKS`.
+
+    :raises: InvalidPriceError if `price` is not a valid price
+
+    """
+    idx = _exact_index(float(price))
+    if idx is None:
+        raise exceptions.InvalidPriceError(price)
+    return idx
+
+
+def nearest_tick_index(price, rounding=ROUND_NEAREST):
+    """Get the position in `TICKS` of the tick nearest to `price`. Prices
+    outside the ladder are clamped to `MIN_PRICE` or `MAX_PRICE`.
+
+    :param float price:
+    :param str rounding: `ROUND_NEAREST`, `ROUND_UP` or `ROUND_DOWN`
+
+    """
+    price = float(price)
+    idx = _exact_index(price)
+    if idx is not None:
+        return idx
+    upper = bisect.bisect_left(TICKS, price)
+    if upper == 0:
+        return 0
+    if upper == len(TICKS):
+        return len(TICKS) - 1
+    if rounding == ROUND_UP:
+        return upper
+    if rounding == ROUND_DOWN:
+        return upper - 1
+    if rounding != ROUND_NEAREST:
+        raise ValueError('Unknown rounding {0!r}'.format(rounding))
+    if TICKS[upper] - price < price - TICKS[upper - 1]:
+        return upper
+    return upper - 1
+
+
+def nearest_tick(price, rounding=ROUND_NEAREST):
+    """Round `price` to a valid Betfair price.
+
+    :param float price:
+    :param str rounding: `ROUND_NEAREST`, `ROUND_UP` or `ROUND_DOWN`
+
+    """
+    return TICKS[nearest_tick_index(price, rounding)]
+
+
+def tick_offset(price, ticks):
+    """Get the price `ticks` ticks above (or, if negative, below) `price`,
+    clamped to the ladder.
+
+    :param float price: Valid Betfair price
+    :param int ticks: Number of ticks
+    :raises: InvalidPriceError if `price` is not a valid price
+
+    """
+    idx = tick_index(price) + ticks
+    return TICKS[min(max(idx, 0), len(TICKS) - 1)]
+
+
+def tick_distance(price, other):
+    """Get the number of ticks from `price` up to `other`; negative if
+    `other` is lower.
+
+    :raises: InvalidPriceError if either price is not a valid price
+
+    """
+    return tick_index(other) - tick_index(price)
+
+
+def nearest_ticks(prices, rounding=ROUND_NEAREST):
+    """Round each of `prices` to a valid Betfair price."""
+    return [TICKS[nearest_tick_index(price, rounding)] for price in prices]
+
+
+def tick_offsets(prices, ticks):
+    """Apply `tick_offset` to each of `prices`.
+
+    :param prices: Iterable of valid prices
+    :param ticks: Number of ticks, or an iterable with one per price
+
+    """
+    if isinstance(ticks, six.integer_types):
+        return [tick_offset(price, ticks) for price in prices]
+    return [
+        tick_offset(price, count)
+        for price, count in six.moves.zip(prices, ticks)
+    ]
+
+
+def tick_distances(prices, others):
+    """Apply `tick_distance` to pairs from `prices` and `others`."""
+    return [
+        tick_distance(price, other)
+        for price, other in six.moves.zip(prices, others)
+    ]
+
+
+def check_price(price):
+    """Check that `price` is a valid Betfair price.
+
+    :returns: `price`
+    :raises: InvalidPriceError
+
+    """
+    if price is not None and not is_tick(price):
+        raise exceptions.InvalidPriceError(price)
+    return price
+
+
+def _instruction_prices(instruction):
+    if isinstance(instruction, dict):
+        for key in ('limitOrder', 'limitOnCloseOrder'):
+            order = instruction.get(key)
+            if order:
+                yield order.get('price')
+        yield instruction.get('newPrice')
+        return
+    for key in ('limit_order', 'limit_on_close_order'):
+        order = getattr(instruction, key, None)
+        if order is not None:
+            yield order.price
+    yield getattr(instruction, 'new_price', None)
+
+
+def check_instruction_prices(instructions):
+    """Check the prices of `PlaceInstruction`s or `ReplaceInstruction`s
+    (models or serialised dicts) against the price ladder.
+
+    :raises: InvalidPriceError
+
+    """
+    for instruction in instructions or ():
+        for price in _instruction_prices(instruction):
+            check_price(price)
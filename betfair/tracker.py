@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""Track successive `list_market_book` snapshots and report what changed.
+
+`MarketBookTracker.update` takes `MarketBook` models or raw
+(`DECODE_RAW`) result dicts and returns compact change events. Each market
+keeps one `MarketState` that is updated in place from poll to poll.
+
+Betfair increments `MarketBook.version` when the market definition changes
+(e.g. suspension or turning in-play), not on price moves. The tracker uses
+it to drop stale snapshots, such as those arriving out of order from
+concurrent requests, and to report definition changes; ladders are diffed
+on every snapshot.
+
+"""
+
+import collections
+
+import six
+
+from .ladder import iter_levels
+
+
+LADDERS = ('available_to_back', 'available_to_lay', 'traded_volume')
+
+# Keys of `LADDERS` in raw result dicts
+RAW_LADDERS = ('availableToBack', 'availableToLay', 'tradedVolume')
+
+
+# Change to one ladder level; `size` is the new size at `price`, or 0 if the
+# level was removed
+LadderChange = collections.namedtuple('LadderChange', [
+    'market_id', 'selection_id', 'handicap', 'ladder', 'price', 'size',
+])
+
+# New version, status or in-play flag of a market
+MarketChange = collections.namedtuple('MarketChange', [
+    'market_id', 'version', 'status', 'inplay',
+])
+
+
+class RunnerState(object):
+    """Current ladders of a runner, as `{price: size}` dicts keyed by ladder
+    name (see `LADDERS`).
+
+    """
+    __slots__ = ('selection_id', 'handicap', 'ladders')
+
+    def __init__(self, selection_id, handicap):
+        self.selection_id = selection_id
+        self.handicap = handicap
+        self.ladders = {ladder: {} for ladder in LADDERS}
+
+    def best(self, ladder):
+        """Get the best `(price, size)` level of a ladder, or `None`.
+
+        :param str ladder: `available_to_back` or `available_to_lay`
+
+        """
+        levels = self.ladders[ladder]
+        if not levels:
+            return None
+        price = max(levels) if ladder == 'available_to_back' else min(levels)
+        return price, levels[price]
+
+
+class MarketState(object):
+    """Current state of a market.
+
+    :param str market_id:
+
+    """
+    __slots__ = ('market_id', 'version', 'status', 'inplay', 'runners')
+
+    def __init__(self, market_id):
+        self.market_id = market_id
+        self.version = None
+        self.status = None
+        self.inplay = None
+        self.runners = {}
+
+    def runner(self, selection_id, handicap=0.0):
+        """Get the state of a runner.
+
+        :raises: KeyError if the runner has not been seen
+
+        """
+        return self.runners[(selection_id, handicap)]
+
+
+def _diff_ladder(market_id, runner, ladder, levels, events):
+    """Update `runner.ladders[ladder]` from `(price, size)` pairs in place
+    and append a `LadderChange` for each level that changed.
+
+    """
+    current = runner.ladders[ladder]
+    seen = set()
+    for price, size in levels:
+        seen.add(price)
+        if current.get(price) != size:
+            current[price] = size
+            events.append(LadderChange(
+                market_id, runner.selection_id, runner.handicap, ladder,
+                price, size))
+    if len(seen) != len(current):
+        for price in [price for price in current if price not in seen]:
+            del current[price]
+            events.append(LadderChange(
+                market_id, runner.selection_id, runner.handicap, ladder,
+                price, 0.0))
+
+
+def _model_book(book):
+    status = book.status
+    return (
+        book.market_id, book.version, getattr(status, 'name', status),
+        book.inplay, book.runners,
+    )
+
+
+def _model_runner(runner):
+    ex = runner.ex
+    return runner.selection_id, runner.handicap, [
+        iter_levels(getattr(ex, ladder)) if ex is not None else ()
+        for ladder in LADDERS
+    ]
+
+
+def _raw_book(book):
+    return (
+        book['marketId'], book.get('version'), book.get('status'),
+        book.get('inplay'), book.get('runners') or [],
+    )
+
+
+def _raw_runner(runner):
+    ex = runner.get('ex') or {}
+    return runner['selectionId'], runner.get('handicap', 0.0), [
+        [(level['price'], level['size']) for level in ex.get(ladder) or []]
+        for ladder in RAW_LADDERS
+    ]
+
+
+class MarketBookTracker(object):
+    """Keep the latest state of each market and diff new snapshots against
+    it. Runners are keyed by `(selection_id, handicap)`.
+
+    """
+    def __init__(self):
+        self.markets = {}
+
+    def update(self, books):
+        """Apply `MarketBook` snapshots.
+
+        :param list books: `MarketBook` models or raw result dicts
+        :returns: List of `MarketChange` and `LadderChange` events, in
+            snapshot order
+
+        """
+        events = []
+        for book in books:
+            self.update_book(book, events)
+        return events
+
+    def update_book(self, book, events=None):
+        """Apply one `MarketBook` snapshot.
+
+        :param book: `MarketBook` model or raw result dict
+        :param list events: List to append change events to
+        :returns: List of change events
+
+        """
+        events = [] if events is None else events
+        if isinstance(book, dict):
+            market_id, version, status, inplay, runners = _raw_book(book)
+            read_runner = _raw_runner
+        else:
+            market_id, version, status, inplay, runners = _model_book(book)
+            read_runner = _model_runner
+        state = self.markets.get(market_id)
+        if state is None:
+            state = self.markets[market_id] = MarketState(market_id)
+        if version is not None and state.version is not None:
+            if version < state.version:
+                # Stale snapshot
+                return events
+        if (version, status, inplay) != \
+                (state.version, state.status, state.inplay):
+            state.version = version
+            state.status = status
+            state.inplay = inplay
+            events.append(MarketChange(market_id, version, status, inplay))
+        for runner in runners:
+            selection_id, handicap, ladders = read_runner(runner)
+            key = (selection_id, handicap)
+            runner_state = state.runners.get(key)
+            if runner_state is None:
+                runner_state = state.runners[key] = RunnerState(
+                    selection_id, handicap)
+            for ladder, levels in six.moves.zip(LADDERS, ladders):
+                _diff_ladder(market_id, runner_state, ladder, levels, events)
+        return events
+
+    def remove(self, market_id):
+        """Stop tracking a market, e.g. once it has closed."""
+        self.markets.pop(market_id, None)
@@ -3,13 +3,65 @@
 import six
 import decorator
 import inflection
-import collections
+import enum
 import json
+import functools
+import collections
+from concurrent import futures
+from six.moves import collections_abc
 from six.moves import http_client as httplib
 
+from . import constants
 from . import exceptions
 
 
+def memoize(maxsize=4096):
+    """Cache the results of a single-argument function. The cache is
+    cleared whenever it reaches `maxsize` entries, so memory stays bounded
+    even for unbounded inputs.
+
+    :param int maxsize: Maximum number of cached results
+
+    """
+    def decorator(func):
+        cache = {}
+
+        @functools.wraps(func)
+        def wrapped(key):
+            try:
+                return cache[key]
+            except KeyError:
+                pass
+            if len(cache) >= maxsize:
+                cache.clear()
+            value = cache[key] = func(key)
+            return value
+        wrapped.cache = cache
+        return wrapped
+    return decorator
+
+
+@memoize()
+def camelize_key(key):
+    """Convert an internal (underscore) key to Betfair's camel-cased format,
+    dropping trailing underscores used to avoid conflicts with built-ins.
+
+    :param str key:
+
+    """
+    return inflection.camelize(key, uppercase_first_letter=False).rstrip('_')
+
+
+@memoize()
+def underscore_key(key):
+    """Convert a camel-cased Betfair key to underscore format.
+
+    :param str key:
+
+    """
+    return inflection.underscore(key)
+
+
 def get_chunks(sequence, chunk_size):
     """Split sequence into chunks.
 
@@ -23,15 +75,143 @@ def get_chunks(sequence, chunk_size):
     ]
 
 
+def iter_concurrent(func, chunks, max_workers, window=None):
+    """Apply `func` to each chunk on a bounded thread pool and yield the
+    items of each result in chunk order, as soon as that chunk completes. At
+    most `window` chunks are in flight or awaiting consumption at any time.
+
+    :param func: Callable taking one chunk and returning a list of results
+    :param list chunks: Chunks of arguments, e.g. from `get_chunks`
+    :param int max_workers: Number of worker threads
+    :param int window: Maximum number of outstanding chunks; defaults to
+        twice `max_workers`
+
+    """
+    window = max(window or 2 * max_workers, 1)
+    pending = collections.deque()
+    executor = futures.ThreadPoolExecutor(max_workers)
+    try:
+        for chunk in chunks:
+            if len(pending) >= window:
+                for item in pending.popleft().result():
+                    yield item
+            pending.append(executor.submit(func, chunk))
+        while pending:
+            for item in pending.popleft().result():
+                yield item
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def page_records(page, key):
+    """Get the records and `more_available` flag of a paged report, such as
+    a `CurrentOrderSummaryReport` or its raw (`DECODE_RAW`) dict.
+
+    :param page: Report model or dict
+    :param str key: Model attribute holding the records, e.g.
+        `current_orders`
+
+    """
+    if isinstance(page, dict):
+        return (
+            page.get(inflection.camelize(key, False)) or [],
+            page.get('moreAvailable', False),
+        )
+    return getattr(page, key) or [], page.more_available
+
+
+def record_bet_id(record):
+    """Get the bet id of an order record, or `None` (e.g. for cleared orders
+    grouped by market).
+
+    """
+    if isinstance(record, dict):
+        return record.get('betId')
+    return getattr(record, 'bet_id', None)
+
+
+def iter_pages(fetch, key, from_record=0, prefetch=True, dedupe_window=1):
+    """Yield the records of a paged method one by one, following
+    `more_available`. While the caller consumes a page, the next one is
+    fetched on a background thread if `prefetch` is set.
+
+    Orders placed or settled between calls shift records across page
+    boundaries; records whose bet id was already yielded on the current page
+    or the previous `dedupe_window` pages are skipped. At most two pages and
+    the bet ids of `dedupe_window + 1` pages are held at once.
+
+    :param fetch: Callable taking `from_record` and returning a report
+    :param str key: Report attribute holding the records
+    :param int from_record: Index of the first record
+    :param bool prefetch: Fetch the next page in the background
+    :param int dedupe_window: Number of previous pages checked for
+        duplicate bet ids
+
+    """
+    executor = futures.ThreadPoolExecutor(1) if prefetch else None
+
+    def request(start):
+        if executor is None:
+            return functools.partial(fetch, start)
+        return executor.submit(fetch, start).result
+
+    seen = collections.deque(maxlen=dedupe_window + 1)
+    pending = request(from_record)
+    try:
+        while pending is not None:
+            records, more_available = page_records(pending(), key)
+            from_record += len(records)
+            pending = request(from_record) \
+                if more_available and records else None
+            page_ids = set()
+            seen.append(page_ids)
+            for record in records:
+                bet_id = record_bet_id(record)
+                if bet_id is not None:
+                    if any(bet_id in ids for ids in seen):
+                        continue
+                    page_ids.add(bet_id)
+                yield record
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def with_market_ids(market_filter, market_ids):
+    """Build a serialized copy of a market filter restricted to the given
+    market IDs.
+
+    :param market_filter: `MarketFilter`, dict of camel-cased filter fields,
+        or `None`
+    :param list market_ids: List of market IDs
+
+    """
+    if hasattr(market_filter, 'serialize'):
+        market_filter = market_filter.serialize()
+    out = {
+        key: value for key, value in six.iteritems(market_filter or {})
+        if value is not None and value != []
+    }
+    out['marketIds'] = list(market_ids)
+    return out
+
+
+# Method arguments that configure the client call rather than the request
+CLIENT_KWARGS = ('self', 'decode', 'validate_prices')
+
+
 def get_kwargs(kwargs):
-    """Get all keys and values from dictionary where key is not `self`.
+    """Get all keys and values from dictionary where key is not `self` or
+    another client-side option such as `decode`.
 
     :param dict kwargs: Input parameters
 
     """
     return {
         key: value for key, value in six.iteritems(kwargs)
-        if key != 'self'
+        if key not in CLIENT_KWARGS
     }
 
 
@@ -53,36 +233,96 @@ def check_status_code(response, codes=None):
         raise exceptions.BetfairError(response)
 
 
-def result_or_error(response):
+def result_or_error(response, data=None):
     """Get `result` field from Betfair response or raise exception if not
     found.
 
     :param Response response:
+    :param dict data: Decoded response body; read from `response` if `None`
     :raises: BetfairAPIError if no results passed
 
     """
-    data = response.json()
+    if data is None:
+        data = response.json()
     result = data.get('result')
     if result is not None:
         return result
     raise exceptions.BetfairAPIError(response, data)
 
 
-def process_result(result, model=None):
+def check_decode(decode):
+    """Check that `decode` is one of `constants.DECODE_MODES`.
+
+    :param str decode: Decoding mode
+    :raises: ValueError if the mode is not supported
+
+    """
+    if decode not in constants.DECODE_MODES:
+        raise ValueError('Unknown decode mode {0!r}'.format(decode))
+    return decode
+
+
+def check_records_decode(decode):
+    """Check that `decode` yields records that can be iterated over, i.e. is
+    not `constants.DECODE_BYTES`.
+
+    :param str decode: Decoding mode
+    :raises: ValueError for undecoded response bodies
+
+    """
+    if check_decode(decode) == constants.DECODE_BYTES:
+        raise ValueError('Chunked iterators require decoded results')
+
+
+def process_result(result, model=None, lazy=False):
     """Cast response JSON to Betfair model(s).
 
     :param result: Betfair response JSON
     :param BetfairModel model: Deserialization format; if `None`, return raw
         JSON
+    :param bool lazy: Defer building nested models (e.g. runners and price
+        ladders) until they are first accessed
 
     """
     if model is None:
         return result
-    if isinstance(result, collections.Sequence):
+    if lazy:
+        if isinstance(result, collections_abc.Sequence):
+            return [model.from_dict(item, lazy=True) for item in result]
+        return model.from_dict(result, lazy=True)
+    if isinstance(result, collections_abc.Sequence):
         return [model(**item) for item in result]
     return model(**result)
 
 
+# Values passed through `serialize_value` as they are
+JSON_SCALARS = six.string_types + (six.text_type, float, bool, type(None)) + \
+    six.integer_types
+
+
+def serialize_value(value):
+    """Serialize a request parameter value to JSON types, leaving datetimes
+    to the JSON codec.
+
+    :param value: Model, `Enum` member, or list or dict of them
+
+    """
+    if isinstance(value, JSON_SCALARS):
+        return value
+    if hasattr(value, 'serialize'):
+        return value.serialize()
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (list, tuple, collections_abc.Set)):
+        return [serialize_value(item) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: serialize_value(item)
+            for key, item in six.iteritems(value)
+        }
+    return value
+
+
 def serialize_params(params):
     """Serialize input parameters to Betfair-formatted JSON.
 
@@ -91,11 +331,8 @@ def serialize_params(params):
     """
     out = {}
     for key, value in six.iteritems(params):
-        key = inflection.camelize(
-            key, uppercase_first_letter=False
-        ).rstrip('_')
-        value = value.serialize() if hasattr(value, 'serialize') else value
-        out[key] = value
+        key = camelize_key(key)
+        out[key] = serialize_value(value)
     return out
 
 
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Request weights for Betfair market data calls. Betfair rejects
+`listMarketBook` and `listMarketCatalogue` requests whose total weight
+exceeds `MAX_WEIGHT` with `TOO_MUCH_DATA`; the weight of a request is the
+per-market weight of its projections multiplied by the number of markets.
+See https://docs.developer.betfair.com/display/1smk3cen4v3lu3yomq5qye0ni/Market+Data+Request+Limits
+
+"""
+
+from .constants import MarketProjection, PriceData
+from . import utils
+
+
+MAX_WEIGHT = 200
+
+# listMarketCatalogue returns at most 1000 markets per call
+MAX_CATALOGUE_RESULTS = 1000
+
+MARKET_PROJECTION_WEIGHTS = {
+    MarketProjection.COMPETITION: 0,
+    MarketProjection.EVENT: 0,
+    MarketProjection.EVENT_TYPE: 0,
+    MarketProjection.MARKET_START_TIME: 0,
+    MarketProjection.MARKET_DESCRIPTION: 1,
+    MarketProjection.RUNNER_DESCRIPTION: 0,
+    MarketProjection.RUNNER_METADATA: 1,
+}
+
+PRICE_DATA_WEIGHTS = {
+    PriceData.SP_AVAILABLE: 3,
+    PriceData.SP_TRADED: 7,
+    PriceData.EX_BEST_OFFERS: 5,
+    PriceData.EX_ALL_OFFERS: 17,
+    PriceData.EX_TRADED: 17,
+}
+
+# Combinations that Betfair weighs less than the sum of their parts
+PRICE_DATA_COMBINED_WEIGHTS = [
+    ((PriceData.EX_ALL_OFFERS, PriceData.EX_TRADED), 32),
+    ((PriceData.EX_BEST_OFFERS, PriceData.EX_TRADED), 20),
+]
+
+# Weight of a listMarketBook call without price data
+EMPTY_PRICE_PROJECTION_WEIGHT = 2
+
+# Default depth of EX_BEST_OFFERS; deeper ladders weigh proportionally more
+DEFAULT_BEST_PRICES_DEPTH = 3
+
+
+def _get(value, key):
+    if isinstance(value, dict):
+        return value.get(key)
+    return getattr(value, key, None)
+
+
+def _to_enum(enum, value):
+    return value if isinstance(value, enum) else enum[value]
+
+
+def market_book_weight(price_projection=None):
+    """Get the per-market weight of a `listMarketBook` call.
+
+    :param PriceProjection price_projection: Price projection, as a model or
+        serialized dict
+    :returns: Weight of one market
+
+    """
+    price_data = _get(price_projection, 'price_data')
+    if price_data is None:
+        price_data = _get(price_projection, 'priceData')
+    price_data = set(
+        _to_enum(PriceData, item) for item in (price_data or [])
+    )
+    if not price_data:
+        return EMPTY_PRICE_PROJECTION_WEIGHT
+    weight = 0
+    remaining = set(price_data)
+    for combination, combined_weight in PRICE_DATA_COMBINED_WEIGHTS:
+        if remaining.issuperset(combination):
+            remaining.difference_update(combination)
+            weight += combined_weight
+    for item in remaining:
+        weight += PRICE_DATA_WEIGHTS[item]
+    overrides = _get(price_projection, 'ex_best_offers_overrides')
+    if overrides is None:
+        overrides = _get(price_projection, 'exBestOffersOverrides')
+    depth = _get(overrides, 'best_prices_depth')
+    if depth is None:
+        depth = _get(overrides, 'bestPricesDepth')
+    if depth and depth > DEFAULT_BEST_PRICES_DEPTH and \
+            PriceData.EX_BEST_OFFERS in price_data:
+        extra = PRICE_DATA_WEIGHTS[PriceData.EX_BEST_OFFERS]
+        weight += extra * depth / float(DEFAULT_BEST_PRICES_DEPTH) - extra
+    return weight
+
+
+def market_catalogue_weight(market_projection=None):
+    """Get the per-market weight of a `listMarketCatalogue` call.
+
+    :param list market_projection: List of `MarketProjection` values
+    :returns: Weight of one market
+
+    """
+    return sum(
+        MARKET_PROJECTION_WEIGHTS[_to_enum(MarketProjection, item)]
+        for item in (market_projection or [])
+    )
+
+
+def plan_chunks(market_ids, weight, max_weight=MAX_WEIGHT, max_size=None):
+    """Pack market IDs into the fewest calls whose total weight stays within
+    `max_weight`.
+
+    :param list market_ids: List of market IDs
+    :param weight: Per-market weight of each call
+    :param int max_weight: Weight limit per call
+    :param int max_size: Optional upper bound on markets per call
+    :returns: List of market ID chunks
+
+    """
+    if weight > 0:
+        chunk_size = max(int(max_weight // weight), 1)
+    else:
+        chunk_size = max_size or len(market_ids) or 1
+    if max_size:
+        chunk_size = min(chunk_size, max_size)
+    return utils.get_chunks(market_ids, chunk_size)
@@ -72,6 +72,13 @@ setup(
     install_requires=[
         line.strip() for line in open('requirements.txt')
     ],
+    python_requires='>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*, !=3.4.*, '
+                    '!=3.5.*',
+    extras_require={
+        'aio': ['aiohttp'],
+        'json': ['orjson; python_version >= "3.6"', 'ujson'],
+        'arrow': ['pyarrow'],
+    },
     license=read('LICENSE'),
     zip_safe=False,
     classifiers=[
@@ -80,11 +87,14 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Natural Language :: English',
         'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.6',
         'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
     ],
     test_suite='tests',
     tests_require=TEST_REQUIRES,
@@ -5,6 +5,7 @@ from invoke import task, run
 
 DEFAULT_NAME = 'certs/betfair'
 DEFAULT_BITS = 2048
+BENCHMARK_STORAGE = '.benchmarks'
 
 
 @task
@@ -51,3 +52,24 @@ def ssl(name=DEFAULT_NAME, bits=DEFAULT_BITS):
     sign_cert(name)
     generate_pem(name)
 
+
+
+@task
+def benchmark(compare=None, filter=None):
+    """Run the benchmarks and save the results under `BENCHMARK_STORAGE`,
+    named after the current commit.
+
+    :param str compare: Saved run to compare against, e.g. `0001`; use
+        `last` for the previous run
+    :param str filter: Only run benchmarks matching this `-k` expression
+
+    """
+    cmd = 'py.test benchmarks --benchmark-autosave ' \
+        '--benchmark-storage={0}'.format(BENCHMARK_STORAGE)
+    if compare == 'last':
+        cmd += ' --benchmark-compare'
+    elif compare:
+        cmd += ' --benchmark-compare={0}'.format(compare)
+    if filter:
+        cmd += " -k '{0}'".format(filter)
+    run(cmd)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+import sys
+
+import pytest
+
+from betfair.testing import StubServer
+from tests.utils import make_client
+
+
+collect_ignore = []
+if sys.version_info < (3, 6):
+    # The asyncio client and its tests use async/await syntax and async generators
+    collect_ignore.append('test_aio.py')
+
+
+@pytest.fixture
+def client():
+    return make_client()
+
+
+@pytest.fixture
+def stub_results():
+    """JSON-RPC results served by `stub_server`, by method; override in a
+    test module to serve other results.
+
+    """
+    return {}
+
+
+@pytest.fixture
+def stub_server(stub_results):
+    server = StubServer(stub_results).start()
+    yield server
+    server.stop()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import asyncio
+import threading
+
+pytest.importorskip('aiohttp')
+
+from betfair import models
+from betfair.aio import AsyncBetfair, iter_pages
+from betfair.cache import MemoryCache, ResponseCache
+from betfair.constants import (
+    Exchange, LIST_MARKET_BOOK, LIST_EVENT_TYPES, GET_ACCOUNT_FUNDS,
+)
+
+
+MARKET_BOOK = {
+    'marketId': '1.1',
+    'isMarketDataDelayed': False,
+    'runners': [{
+        'selectionId': 1,
+        'handicap': 0.0,
+        'status': 'ACTIVE',
+        'ex': {'availableToBack': [{'price': 2.0, 'size': 10.0}]},
+    }],
+}
+
+
+@pytest.fixture
+def stub_results():
+    return {
+        LIST_MARKET_BOOK: [MARKET_BOOK],
+        GET_ACCOUNT_FUNDS: {'availableToBetBalance': 100.0},
+        LIST_EVENT_TYPES: [
+            {'eventType': {'id': '7', 'name': 'Horse Racing'},
+             'marketCount': 1},
+        ],
+    }
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+def test_list_market_book(stub_server):
+    client = AsyncBetfair('test', None, Exchange.UK, api_url=stub_server.url)
+
+    async def call():
+        async with client:
+            return await client.list_market_book(['1.1'])
+
+    books = run(call())
+    assert isinstance(books[0], models.MarketBook)
+    assert books[0].runners[0].ex.available_to_back[0].price == 2.0
+
+
+def test_concurrent_calls_share_pool(stub_server):
+    client = AsyncBetfair(
+        'test', None, Exchange.UK, api_url=stub_server.url, pool_maxsize=4)
+
+    async def call():
+        async with client:
+            results = await asyncio.gather(*[
+                client.get_account_funds() for _ in range(20)
+            ])
+            return results, len(client.network_client.sessions)
+
+    results, session_count = run(call())
+    assert all(
+        isinstance(result, models.AccountFundsResponse) for result in results)
+    assert session_count == 1
+
+
+def test_iter_list_market_book(stub_server):
+    client = AsyncBetfair('test', None, Exchange.UK, api_url=stub_server.url)
+
+    async def call():
+        async with client:
+            return [
+                book async for book in client.iter_list_market_book(
+                    ['1.1', '1.2', '1.3'], 1, concurrency=3)
+            ]
+
+    books = run(call())
+    assert len(books) == 3
+    assert all(isinstance(book, models.MarketBook) for book in books)
+
+
+class ThreadRecordingCache(MemoryCache):
+
+    def __init__(self):
+        super(ThreadRecordingCache, self).__init__()
+        self.threads = []
+
+    def get(self, key, now):
+        self.threads.append(threading.current_thread())
+        return super(ThreadRecordingCache, self).get(key, now)
+
+    def set(self, key, value, expires, now):
+        self.threads.append(threading.current_thread())
+        super(ThreadRecordingCache, self).set(key, value, expires, now)
+
+
+def test_cache_runs_in_executor(stub_server, stub_results):
+    backend = ThreadRecordingCache()
+    client = AsyncBetfair(
+        'test', None, Exchange.UK, api_url=stub_server.url,
+        cache=ResponseCache(backend))
+
+    async def call():
+        async with client:
+            first = await client.list_event_types()
+            stub_results[LIST_EVENT_TYPES] = []
+            return first, await client.list_event_types()
+
+    first, second = run(call())
+    assert first[0].event_type.name == 'Horse Racing'
+    assert second[0].event_type.name == 'Horse Racing'
+    assert len(backend.threads) == 3
+    assert threading.current_thread() not in backend.threads
+
+
+def test_iter_pages():
+    pages = {
+        0: {'clearedOrders': [{'betId': '1'}, {'betId': '2'}],
+            'moreAvailable': True},
+        2: {'clearedOrders': [{'betId': '2'}, {'betId': '3'}],
+            'moreAvailable': False},
+    }
+
+    async def fetch(start):
+        return pages[start]
+
+    async def call():
+        return [
+            record['betId']
+            async for record in iter_pages(fetch, 'cleared_orders')
+        ]
+
+    assert run(call()) == ['1', '2', '3']
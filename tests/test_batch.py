@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import responses
+
+import json
+
+from betfair import models
+from betfair import exceptions
+from betfair.constants import Endpoint, Exchange
+from tests.utils import add_body
+
+
+@responses.activate
+def test_batch_demultiplexes_by_id(client):
+    add_body(client, [
+        {'jsonrpc': '2.0', 'id': 2, 'result': {
+            'currentOrders': [], 'moreAvailable': False}},
+        {'jsonrpc': '2.0', 'id': 1, 'result': [{
+            'marketId': '1.1', 'isMarketDataDelayed': False}]},
+    ])
+    with client.batch() as batch:
+        books = batch.list_market_book(['1.1'])
+        orders = batch.list_current_orders()
+    assert len(responses.calls) == 1
+    sent = json.loads(responses.calls[0].request.body)
+    assert [item['id'] for item in sent] == [1, 2]
+    assert isinstance(books.result()[0], models.MarketBook)
+    assert isinstance(orders.result(), models.CurrentOrderSummaryReport)
+
+
+@responses.activate
+def test_batch_call_error_is_isolated(client):
+    add_body(client, [
+        {'jsonrpc': '2.0', 'id': 1, 'error': {'data': {'APINGException': {
+            'errorCode': 'TOO_MUCH_DATA'}}}},
+        {'jsonrpc': '2.0', 'id': 2, 'result': []},
+    ])
+    with client.batch() as batch:
+        books = batch.list_market_book(['1.1'])
+        events = batch.list_events()
+    with pytest.raises(exceptions.BetfairAPIError) as excinfo:
+        books.result()
+    assert excinfo.value.message == 'TOO_MUCH_DATA'
+    assert events.result() == []
+
+
+@responses.activate
+def test_batch_one_request_per_endpoint(client):
+    add_body(client, [
+        {'jsonrpc': '2.0', 'id': 1, 'result': []},
+    ])
+    add_body(client, [
+        {'jsonrpc': '2.0', 'id': 1, 'result': {'availableToBetBalance': 5.0}},
+    ], Endpoint.Account)
+    with client.batch() as batch:
+        pnl = batch.list_market_profit_and_loss(['1.1'])
+        funds = batch.get_account_funds()
+    assert len(responses.calls) == 2
+    assert pnl.result() == []
+    assert funds.result().available_to_bet_balance == 5.0
+
+
+@responses.activate
+def test_failed_endpoint_does_not_stop_batch(client):
+    responses.add(
+        responses.POST,
+        client.network_client.get_url(Exchange.UK, Endpoint.Betting),
+        body='<html>Service Unavailable</html>',
+        status=503,
+    )
+    add_body(client, [
+        {'jsonrpc': '2.0', 'id': 1, 'result': {'availableToBetBalance': 5.0}},
+    ], Endpoint.Account)
+    with client.batch() as batch:
+        pnl = batch.list_market_profit_and_loss(['1.1'])
+        events = batch.list_events()
+        funds = batch.get_account_funds()
+    assert len(responses.calls) == 2
+    for call in (pnl, events):
+        with pytest.raises(exceptions.BetfairError) as excinfo:
+            call.result()
+        assert not isinstance(excinfo.value, exceptions.BetfairAPIError)
+    assert funds.result().available_to_bet_balance == 5.0
+
+
+def test_result_before_send(client):
+    batch = client.batch()
+    call = batch.list_events()
+    with pytest.raises(exceptions.BetfairError):
+        call.result()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import responses
+
+from betfair import cache
+from betfair import models
+from betfair.constants import Exchange
+from betfair.constants import LIST_EVENTS, LIST_MARKET_BOOK, DECODE_RAW
+from betfair.instrumentation import Instrument
+from tests.utils import Clock, add_response, make_client
+
+
+@pytest.fixture
+def clock():
+    return Clock(1000.0)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmpdir):
+    if request.param == 'memory':
+        return cache.MemoryCache(max_size=2)
+    return cache.SqliteCache(str(tmpdir.join('cache.db')), max_size=2)
+
+
+def test_make_key_is_canonical():
+    first = cache.make_key(Exchange.UK, LIST_EVENTS, {
+        'filter': models.MarketFilter(event_type_ids=['1'], text_query='a'),
+        'locale': None,
+    })
+    second = cache.make_key(Exchange.UK, LIST_EVENTS, {
+        'filter': {'textQuery': 'a', 'eventTypeIds': ['1']},
+    })
+    assert first == second
+    assert first != cache.make_key(Exchange.AUS, LIST_EVENTS, {
+        'filter': {'textQuery': 'a', 'eventTypeIds': ['1']},
+    })
+
+
+def test_ttl(backend, clock):
+    response_cache = cache.ResponseCache(backend, timer=clock)
+    response_cache.set(Exchange.UK, LIST_EVENTS, {}, [{'marketCount': 1}])
+    assert response_cache.get(Exchange.UK, LIST_EVENTS, {}) == [
+        {'marketCount': 1},
+    ]
+    clock.now += cache.DEFAULT_TTLS[LIST_EVENTS]
+    with pytest.raises(KeyError):
+        response_cache.get(Exchange.UK, LIST_EVENTS, {})
+
+
+def test_lru_eviction(backend, clock):
+    response_cache = cache.ResponseCache(backend, timer=clock)
+    for idx in range(3):
+        clock.now += 1
+        response_cache.set(Exchange.UK, LIST_EVENTS, {'locale': idx}, idx)
+        if idx == 1:
+            clock.now += 1
+            response_cache.get(Exchange.UK, LIST_EVENTS, {'locale': 0})
+    assert len(backend) == 2
+    assert response_cache.get(Exchange.UK, LIST_EVENTS, {'locale': 0}) == 0
+    with pytest.raises(KeyError):
+        response_cache.get(Exchange.UK, LIST_EVENTS, {'locale': 1})
+
+
+def test_invalidate(backend, clock):
+    response_cache = cache.ResponseCache(backend, timer=clock)
+    response_cache.set(Exchange.UK, LIST_EVENTS, {'locale': 'en'}, 1)
+    response_cache.set(Exchange.UK, LIST_EVENTS, {'locale': 'it'}, 2)
+    response_cache.invalidate(Exchange.UK, LIST_EVENTS, {'locale': 'en'})
+    assert len(backend) == 1
+    response_cache.invalidate(Exchange.UK, LIST_EVENTS)
+    assert len(backend) == 0
+
+
+def test_sqlite_persists(tmpdir, clock):
+    path = str(tmpdir.join('cache.db'))
+    backend = cache.SqliteCache(path)
+    cache.ResponseCache(backend, timer=clock).set(
+        Exchange.UK, LIST_EVENTS, {}, [{'marketCount': 1}])
+    backend.close()
+    response_cache = cache.ResponseCache(cache.SqliteCache(path), timer=clock)
+    assert response_cache.get(Exchange.UK, LIST_EVENTS, {}) == [
+        {'marketCount': 1},
+    ]
+
+
+@responses.activate
+def test_client_cache():
+    client = make_client(cache=cache.ResponseCache())
+    add_response(client, [{'event': {'id': '1'}, 'marketCount': 2}])
+    first = client.list_events(filter=models.MarketFilter(event_ids=['1']))
+    second = client.list_events(filter={'eventIds': ['1']}, decode=DECODE_RAW)
+    assert len(responses.calls) == 1
+    assert isinstance(first[0], models.EventResult)
+    assert second == [{'event': {'id': '1'}, 'marketCount': 2}]
+    client.invalidate_cache(LIST_EVENTS)
+    client.list_events(filter={'eventIds': ['1']})
+    assert len(responses.calls) == 2
+    assert not client.cache.cacheable(LIST_MARKET_BOOK)
+
+
+@responses.activate
+def test_cache_hits_are_not_measured():
+    client = make_client(cache=cache.ResponseCache())
+    calls = []
+    instrument = Instrument()
+    instrument.after_call = calls.append
+    client.network_client.instruments.append(instrument)
+    add_response(client, [])
+    client.list_events()
+    client.list_events()
+    assert len(responses.calls) == 1
+    assert len(calls) == 1
+    assert calls[0].model >= 0
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import datetime
+
+from betfair import codec
+from betfair import models
+from betfair import network
+from betfair.constants import MarketProjection, MarketSort
+
+
+PARAMS = {
+    'filter': models.MarketFilter(event_type_ids=['1']),
+    'placed_date': datetime.datetime(2015, 4, 14, 10, 59, 33),
+    'market_projection': [MarketProjection.RUNNER_METADATA],
+    'sort': MarketSort.FIRST_TO_START,
+    'max_results': 10,
+}
+
+
+@pytest.mark.parametrize('name', codec.available_codecs())
+def test_codecs_encode_alike(name):
+    json_codec = codec.get_codec(name)
+    body = network.make_json_request('method', PARAMS, json_codec)
+    decoded = json_codec.loads(body)
+    assert decoded == codec.JSONCodec().loads(
+        network.make_json_request('method', PARAMS))
+    assert decoded['params']['marketProjection'] == ['RUNNER_METADATA']
+    assert decoded['params']['sort'] == 'FIRST_TO_START'
+    assert decoded['params']['filter']['eventTypeIds'] == ['1']
+    assert decoded['params']['placedDate'] == '2015-04-14T10:59:33'
+
+
+@pytest.mark.parametrize('name', codec.available_codecs())
+def test_codecs_decode_bytes(name):
+    assert codec.get_codec(name).loads(b'{"result": [1.5]}') == {
+        'result': [1.5],
+    }
+
+
+def test_get_codec():
+    assert codec.get_codec().name == codec.available_codecs()[0]
+    json_codec = codec.JSONCodec()
+    assert codec.get_codec(json_codec) is json_codec
+    with pytest.raises(ValueError):
+        codec.get_codec('xml')
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import datetime
+
+pyarrow = pytest.importorskip('pyarrow')
+import pyarrow.parquet
+
+from betfair import models
+from betfair import columnar
+
+
+BOOK = {
+    'marketId': '1.1',
+    'isMarketDataDelayed': False,
+    'status': 'OPEN',
+    'version': 5,
+    'runners': [
+        {
+            'selectionId': 10,
+            'handicap': 0,
+            'status': 'ACTIVE',
+            'lastPriceTraded': 2.0,
+            'sp': {'nearPrice': 2.1},
+            'ex': {
+                'availableToBack': [
+                    {'price': 2.0, 'size': 10}, {'price': 1.98, 'size': 5},
+                ],
+                'availableToLay': [{'price': 2.02, 'size': 7}],
+            },
+        },
+        {'selectionId': 11, 'handicap': 0, 'status': 'REMOVED'},
+    ],
+}
+
+
+def test_model_columns():
+    columns = {
+        column.name: column.type
+        for column in columnar.model_columns(models.ClearedOrderSummary)
+    }
+    assert columns['bet_id'] == pyarrow.string()
+    assert columns['side'] == pyarrow.string()
+    assert columns['profit'] == pyarrow.float64()
+    assert columns['placed_date'] == pyarrow.timestamp('us', tz='UTC')
+    assert columns['item_description_market_desc'] == pyarrow.string()
+
+
+def test_market_book_writer(tmpdir):
+    path = str(tmpdir.join('books.parquet'))
+    received_at = datetime.datetime(2015, 4, 14, 12, 0, 0)
+    with columnar.MarketBookWriter(path, batch_size=2) as writer:
+        writer.write([BOOK], received_at=received_at)
+        writer.write([models.MarketBook(**BOOK)], received_at=received_at)
+    table = pyarrow.parquet.read_table(path).to_pydict()
+    assert len(table['market_id']) == 8
+    assert table['ladder'][:4] == [
+        'available_to_back', 'available_to_back', 'available_to_lay', None,
+    ]
+    assert table['level'][:3] == [0, 1, 0]
+    assert table['price'][:3] == [2.0, 1.98, 2.02]
+    assert table['runner_selection_id'][3] == 11.0
+    assert table['runner_status'][3] == 'REMOVED'
+    assert table['runner_sp_near_price'][0] == 2.1
+    assert table['status'][0] == 'OPEN'
+
+
+def test_cleared_order_writer(tmpdir):
+    path = str(tmpdir.join('orders.parquet'))
+    report = models.ClearedOrderSummaryReport(
+        clearedOrders=[{
+            'betId': '1',
+            'side': 'BACK',
+            'profit': 2.5,
+            'settledDate': '2015-04-14T12:00:00.000Z',
+            'itemDescription': {'marketDesc': 'Win'},
+        }],
+        moreAvailable=False,
+    )
+    with columnar.ClearedOrderWriter(path) as writer:
+        writer.write(report)
+    table = pyarrow.parquet.read_table(path).to_pydict()
+    assert table['bet_id'] == ['1']
+    assert table['profit'] == [2.5]
+    assert table['item_description_market_desc'] == ['Win']
+    assert table['settled_date'][0].year == 2015
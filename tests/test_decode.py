@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import responses
+
+import json
+
+from betfair import models
+from betfair.betfair import Betfair
+from betfair.constants import Exchange
+from betfair.constants import DECODE_MODEL, DECODE_RAW, DECODE_BYTES
+from tests.utils import add_response
+
+
+BOOKS = [{'marketId': '1.1', 'isMarketDataDelayed': False}]
+
+
+@responses.activate
+def test_decode_model(client):
+    add_response(client, BOOKS)
+    books = client.list_market_book(['1.1'])
+    assert isinstance(books[0], models.MarketBook)
+
+
+@responses.activate
+def test_decode_raw_per_call(client):
+    add_response(client, BOOKS)
+    assert client.list_market_book(['1.1'], decode=DECODE_RAW) == BOOKS
+    sent = json.loads(responses.calls[0].request.body)
+    assert 'decode' not in sent['params']
+
+
+@responses.activate
+def test_decode_raw_per_client(client):
+    add_response(client, BOOKS)
+    client.decode = DECODE_RAW
+    assert client.list_market_book(['1.1']) == BOOKS
+    add_response(client, BOOKS)
+    books = client.list_market_book(['1.1'], decode=DECODE_MODEL)
+    assert isinstance(books[0], models.MarketBook)
+
+
+@responses.activate
+def test_decode_bytes(client):
+    body = add_response(client, BOOKS)
+    content = client.list_market_book(['1.1'], decode=DECODE_BYTES)
+    assert content == body.encode('utf-8')
+
+
+def test_decode_unknown(client):
+    with pytest.raises(ValueError):
+        Betfair('test', 'path/to/cert', Exchange.UK, decode='xml')
+    with pytest.raises(ValueError):
+        list(client.iter_list_market_book(['1.1'], decode=DECODE_BYTES))
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from betfair import models
+from betfair import exceptions
+from betfair.constants import OrderType, PersistenceType, Side, PLACE_ORDERS
+from betfair.gateway import OrderGateway, split_report
+
+
+def place_instruction(selection_id, price=2.0):
+    return models.PlaceInstruction(
+        order_type=OrderType.LIMIT, selection_id=selection_id,
+        side=Side.BACK, limit_order=models.LimitOrder(
+            size=2.0, price=price, persistence_type=PersistenceType.LAPSE))
+
+
+class Client(object):
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def place_orders(self, market_id, instructions):
+        with self.lock:
+            self.calls.append((market_id, list(instructions)))
+        if self.error is not None:
+            raise self.error
+        return models.PlaceExecutionReport(
+            status='SUCCESS', market_id=market_id, instruction_reports=[
+                models.PlaceInstructionReport(
+                    status='SUCCESS', instruction=instruction,
+                    bet_id=str(instruction.selection_id))
+                for instruction in instructions
+            ])
+
+
+def bet_ids(report):
+    return [item.bet_id for item in report.instruction_reports]
+
+
+def test_coalesces_instructions_per_market():
+    client = Client()
+    with OrderGateway(client, window=0.05) as gateway:
+        first = gateway.place_orders('1.1', [place_instruction(1)])
+        second = gateway.place_orders(
+            '1.1', [place_instruction(2), place_instruction(3)])
+        other = gateway.place_orders('1.2', [place_instruction(4)])
+        assert bet_ids(first.result(1)) == ['1']
+        assert bet_ids(second.result(1)) == ['2', '3']
+        assert bet_ids(other.result(1)) == ['4']
+    assert sorted(
+        (market_id, len(instructions))
+        for market_id, instructions in client.calls
+    ) == [('1.1', 3), ('1.2', 1)]
+    assert first.result().market_id == '1.1'
+
+
+def test_sends_full_batches_early():
+    client = Client()
+    gateway = OrderGateway(client, window=10, limits={PLACE_ORDERS: 2})
+    try:
+        first = gateway.place_orders('1.1', [place_instruction(1)])
+        second = gateway.place_orders('1.1', [place_instruction(2)])
+        assert bet_ids(first.result(1)) == ['1']
+        assert bet_ids(second.result(1)) == ['2']
+        third = gateway.place_orders('1.1', [place_instruction(3)])
+        assert not third.done()
+        with pytest.raises(ValueError):
+            gateway.place_orders('1.1', [place_instruction(4)] * 3)
+    finally:
+        gateway.close()
+    assert bet_ids(third.result(1)) == ['3']
+    assert [len(instructions) for _, instructions in client.calls] == [2, 1]
+
+
+def test_errors_reach_every_caller():
+    client = Client(error=RuntimeError('down'))
+    with OrderGateway(client, window=0.01) as gateway:
+        futures = [
+            gateway.place_orders('1.1', [place_instruction(idx)])
+            for idx in range(2)
+        ]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(1)
+    assert len(client.calls) == 1
+
+
+def test_cancelled_instructions_are_not_sent():
+    client = Client()
+    with OrderGateway(client, window=10) as gateway:
+        first = gateway.place_orders('1.1', [place_instruction(1)])
+        second = gateway.place_orders('1.1', [place_instruction(2)])
+        assert first.cancel()
+    assert bet_ids(second.result(1)) == ['2']
+    assert [
+        [item.selection_id for item in instructions]
+        for _, instructions in client.calls
+    ] == [['2']]
+
+
+def test_split_report_raw():
+    report = {
+        'status': 'SUCCESS', 'marketId': '1.1',
+        'instructionReports': [{'betId': '1'}, {'betId': '2'}],
+    }
+    assert split_report(report, 1, 2) == {
+        'status': 'SUCCESS', 'marketId': '1.1',
+        'instructionReports': [{'betId': '2'}],
+    }
+    assert len(report['instructionReports']) == 2
+
+
+def test_checks_prices_before_batching():
+    client = Client()
+    client.validate_prices = True
+    with OrderGateway(client, window=0.01) as gateway:
+        with pytest.raises(exceptions.InvalidPriceError):
+            gateway.place_orders('1.1', [place_instruction(1, price=2.01)])
+        future = gateway.place_orders('1.1', [place_instruction(2)])
+        assert bet_ids(future.result(1)) == ['2']
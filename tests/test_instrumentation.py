@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+import json
+import socket
+import logging
+
+import pytest
+import responses
+
+from betfair import Betfair
+from betfair import models
+from betfair import exceptions
+from betfair.constants import Endpoint, Exchange, LIST_MARKET_BOOK
+from betfair.network import Network
+from betfair.instrumentation import (
+    CallMetrics, Histogram, Instrument, MetricsAggregator, StatsdExporter,
+    method_name, prometheus_text,
+)
+
+
+class Calls(Instrument):
+
+    def __init__(self):
+        self.before = []
+        self.after = []
+
+    def before_call(self, call):
+        self.before.append(call)
+
+    def after_call(self, call):
+        self.after.append(call)
+
+
+MARKET_BOOK = {
+    'marketId': '1.1',
+    'isMarketDataDelayed': False,
+    'status': 'OPEN',
+    'runners': [
+        {
+            'selectionId': selection_id,
+            'handicap': 0.0,
+            'status': 'ACTIVE',
+            'ex': {'availableToBack': [{'price': 2.0, 'size': 10.0}]},
+        }
+        for selection_id in (1, 2)
+    ],
+}
+
+
+@pytest.fixture
+def stub_results():
+    return {LIST_MARKET_BOOK: [MARKET_BOOK]}
+
+
+@pytest.fixture
+def calls():
+    return Calls()
+
+
+@pytest.fixture
+def network(stub_server, calls):
+    return Network(
+        app_key='test', session_token='secret', api_url=stub_server.url,
+        instruments=[calls], time_connections=True)
+
+
+def list_market_book(network):
+    return network.invoke_sync(
+        Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK,
+        {'market_ids': ['1.1']})
+
+
+def test_method_name():
+    assert method_name(LIST_MARKET_BOOK) == 'listMarketBook'
+    assert method_name([LIST_MARKET_BOOK]) == 'batch'
+
+
+def test_histogram():
+    histogram = Histogram(bounds=(1, 2, 4))
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        histogram.observe(value)
+    assert histogram.count == 5
+    assert histogram.sum == 16.5
+    assert histogram.cumulative() == [
+        (1, 1), (2, 3), (4, 4), (float('inf'), 5)]
+    assert histogram.quantile(0.5) == pytest.approx(1.75)
+    assert histogram.quantile(1) == 4
+    assert Histogram().quantile(0.5) is None
+
+
+def test_invoke_sync_metrics(network, calls):
+    list_market_book(network)
+    assert calls.before == calls.after
+    call = calls.after[0]
+    assert call is network.last_call
+    assert call.endpoint == Endpoint.Betting
+    assert call.name == 'listMarketBook'
+    assert call.status == 200
+    assert call.error is None
+    assert call.request_bytes > 0
+    assert call.response_bytes > 0
+    assert call.connect > 0
+    for key in ('dns', 'tls', 'server', 'transfer', 'decode'):
+        assert getattr(call, key) >= 0
+    assert call.total >= call.server
+    assert call.model is None
+    # The second call reuses the pooled connection
+    list_market_book(network)
+    assert calls.after[1].connect == 0
+
+
+def test_connections_untimed_by_default(stub_server, calls):
+    network = Network(
+        app_key='test', session_token='secret', api_url=stub_server.url,
+        instruments=[calls])
+    list_market_book(network)
+    call = calls.after[0]
+    for key in ('dns', 'connect', 'tls'):
+        assert getattr(call, key) is None
+    assert call.server > 0
+
+
+def test_timed_connection_tries_each_address(
+        stub_server, calls, monkeypatch):
+    # The first address refuses connections; urllib3 must move on to the
+    # next one rather than fail
+    closed = socket.socket()
+    closed.bind(('127.0.0.1', 0))
+    host, port = stub_server.server_address
+    addresses = [
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', closed.getsockname()),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', (host, port)),
+    ]
+    resolved = []
+
+    def getaddrinfo(name, *args, **kwargs):
+        if name != 'stub.invalid':
+            return socket_getaddrinfo(name, *args, **kwargs)
+        resolved.append(name)
+        return addresses
+
+    socket_getaddrinfo = socket.getaddrinfo
+    monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo)
+    network = Network(
+        app_key='test', session_token='secret',
+        api_url='http://stub.invalid:{0}'.format(port),
+        instruments=[calls], time_connections=True)
+    try:
+        list_market_book(network)
+    finally:
+        closed.close()
+    assert resolved == ['stub.invalid']
+    assert calls.after[0].status == 200
+    assert calls.after[0].dns >= 0
+    assert calls.after[0].connect > 0
+
+
+def test_timed_connections_leave_socket_module_alone():
+    getaddrinfo = socket.getaddrinfo
+    Network(time_connections=True)
+    assert socket.getaddrinfo is getaddrinfo
+
+
+def test_make_api_request_metrics(network, calls):
+    client = Betfair('test', None, Exchange.UK)
+    client.network_client = network
+    client.make_api_request(
+        Endpoint.Betting, LIST_MARKET_BOOK, {'market_ids': ['1.1']},
+        models.MarketBook)
+    assert len(calls.after) == 1
+    assert calls.after[0].model >= 0
+    assert calls.after[0].decode >= 0
+
+
+@responses.activate
+def test_error_metrics(calls):
+    network = Network(
+        app_key='test', session_token='secret', instruments=[calls])
+    responses.add(
+        responses.POST,
+        network.get_url(Exchange.UK, Endpoint.Betting),
+        body=json.dumps({'jsonrpc': '2.0', 'error': {}, 'id': 1}),
+        content_type='application/json',
+    )
+    with pytest.raises(exceptions.BetfairAPIError):
+        list_market_book(network)
+    assert isinstance(calls.after[0].error, exceptions.BetfairAPIError)
+
+
+def test_no_token_in_debug_log(network, caplog):
+    caplog.set_level(logging.DEBUG)
+    list_market_book(network)
+    assert caplog.records
+    assert 'secret' not in caplog.text
+
+
+def test_aggregator(network):
+    aggregator = MetricsAggregator()
+    network.instruments.append(aggregator)
+    for _ in range(3):
+        list_market_book(network)
+    assert aggregator.calls['listMarketBook'] == 3
+    summary = aggregator.summary()['listMarketBook']
+    assert summary['server']['count'] == 3
+    assert summary['response_bytes']['p50'] > 0
+    text = prometheus_text(aggregator)
+    assert '# TYPE betfair_call_seconds histogram' in text
+    assert 'betfair_call_seconds_count{method="listMarketBook",' \
+        'phase="server"} 3' in text
+    assert 'betfair_calls_total{method="listMarketBook"} 3' in text
+
+
+def test_statsd_exporter():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(('127.0.0.1', 0))
+    server.settimeout(5)
+    exporter = StatsdExporter(port=server.getsockname()[1])
+    call = CallMetrics(Endpoint.Betting, LIST_MARKET_BOOK)
+    call.server = 0.0125
+    call.response_bytes = 2048
+    exporter.after_call(call)
+    lines = server.recv(4096).decode('ascii').split('\n')
+    assert lines == [
+        'betfair.listMarketBook.calls:1|c',
+        'betfair.listMarketBook.server:12.500|ms',
+        'betfair.listMarketBook.response_bytes:2048|h',
+    ]
+    exporter.close()
+    server.close()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import responses
+
+from betfair import models
+from betfair.ladder import PriceLadder, iter_levels
+from tests.utils import add_response, make_client
+
+
+@pytest.fixture
+def prices():
+    return models.LadderExchangePrices(
+        availableToBack=[
+            {'price': 2.0, 'size': 10},
+            {'price': 1.98, 'size': 30},
+            {'price': 1.96, 'size': 60},
+        ],
+    )
+
+
+def test_decodes_to_ladder(prices):
+    ladder = prices.available_to_back
+    assert isinstance(ladder, PriceLadder)
+    assert len(ladder) == 3
+    assert isinstance(ladder[0], models.PriceSize)
+    assert ladder[0].size == 10.0
+    assert [level.price for level in ladder] == [2.0, 1.98, 1.96]
+    assert list(ladder[1:].levels()) == [(1.98, 30.0), (1.96, 60.0)]
+    assert prices.available_to_lay == PriceLadder()
+    assert prices.serialize()['availableToBack'][2] == {
+        'price': 1.96, 'size': 60.0,
+    }
+
+
+def test_ladder_helpers(prices):
+    ladder = prices.available_to_back
+    assert ladder.best() == (2.0, 10.0)
+    assert ladder.best_price() == 2.0
+    assert ladder.size_at(1.98) == 30.0
+    assert ladder.size_at(1.5) == 0.0
+    assert ladder.total_size() == 100.0
+    assert ladder.total_size(2) == 40.0
+    assert list(ladder.cumulative_sizes()) == [10.0, 40.0, 100.0]
+    assert ladder.vwap(2) == pytest.approx((2.0 * 10 + 1.98 * 30) / 40)
+    assert PriceLadder().best() is None
+    assert PriceLadder().vwap() is None
+
+
+def test_default_ladders_are_lists():
+    prices = models.ExchangePrices(
+        availableToBack=[{'price': 2.0, 'size': 10}])
+    assert isinstance(prices.available_to_back[0], models.PriceSize)
+    prices.available_to_back.append({'price': 1.98, 'size': 5})
+    assert list(iter_levels(prices.available_to_back)) == \
+        [(2.0, 10.0), (1.98, 5.0)]
+
+
+@responses.activate
+@pytest.mark.parametrize('ladders', [False, True])
+def test_client_ladders(ladders):
+    client = make_client(ladders=ladders)
+    add_response(client, [{
+        'marketId': '1.1',
+        'isMarketDataDelayed': False,
+        'runners': [{
+            'selectionId': 1, 'handicap': 0.0, 'status': 'ACTIVE',
+            'ex': {'availableToBack': [{'price': 2.0, 'size': 10}]},
+            'sp': {'backStakeTaken': [{'price': 1.5, 'size': 2}]},
+        }],
+    }])
+    runner = client.list_market_book(['1.1'])[0].runners[0]
+    assert isinstance(runner.ex.available_to_back, PriceLadder) is ladders
+    assert isinstance(runner.sp.back_stake_taken, PriceLadder) is ladders
+    assert list(iter_levels(runner.ex.available_to_back)) == [(2.0, 10.0)]
+
+
+def test_ladder_from_pairs():
+    ladder = PriceLadder([(3.0, 5.0), (3.05, 2.5)])
+    assert ladder[1] == (3.05, 2.5)
+    assert ladder == PriceLadder.from_arrays([3.0, 3.05], [5.0, 2.5])
@@ -2,8 +2,12 @@
 
 import pytest
 
+from betfair import models
+from betfair import constants
+from betfair import utils
 from betfair.models import BetfairModel
-from betfair.meta import DataType, Field
+from betfair.meta import DataType, Field, Model
+from betfair.meta.field import RawValue
 
 
 @pytest.fixture
@@ -29,3 +33,87 @@ def test_field_trailing_underscore(model):
     assert 'underscoreTrailingField' in serialized
     assert 'underscoreTrailingField_' not in serialized
     assert serialized['underscoreTrailingField'] == 'test'
+
+
+def test_fields_use_slots(model):
+    record = model(underscoreSeparatedField='test')
+    assert not hasattr(record, '__dict__')
+    with pytest.raises(AttributeError):
+        record.undeclared = 'test'
+
+
+def test_inherited_field_access():
+    report = models.PlaceInstructionReport(
+        status='SUCCESS',
+        instruction={
+            'orderType': 'LIMIT',
+            'selectionId': '1',
+            'side': 'BACK',
+        },
+    )
+    assert report.status == constants.InstructionReportStatus.SUCCESS
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_compiled_matches_generic(compiled, monkeypatch):
+    monkeypatch.setattr(Model, 'compiled', compiled)
+    data = {
+        'marketId': '1.1',
+        'isMarketDataDelayed': False,
+        'status': 'OPEN',
+        'runners': [{
+            'selectionId': 1,
+            'handicap': 0,
+            'status': 'ACTIVE',
+            'ex': {
+                'availableToBack': [{'price': 2.0, 'size': 10}],
+                'availableToLay': [{'price': 2.02, 'size': 5.5}],
+            },
+        }],
+    }
+    book = models.MarketBook(**data)
+    assert book.status == constants.MarketStatus.OPEN
+    assert book.runners[0].ex.available_to_back[0].size == 10.0
+    serialized = book.serialize()
+    assert serialized['runners'][0]['ex']['availableToLay'] == [
+        {'price': 2.02, 'size': 5.5},
+    ]
+    assert serialized['marketId'] == '1.1'
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_missing_required_field(compiled, monkeypatch):
+    monkeypatch.setattr(Model, 'compiled', compiled)
+    with pytest.raises(ValueError):
+        models.PriceSize(price=2.0)
+
+
+def test_lazy_nested_fields():
+    data = {
+        'marketId': '1.1',
+        'isMarketDataDelayed': False,
+        'runners': [{
+            'selectionId': 1,
+            'handicap': 0,
+            'status': 'ACTIVE',
+            'ex': {'availableToBack': [{'price': 2.0, 'size': 10}]},
+        }],
+    }
+    book = models.MarketBook.from_dict(data, lazy=True)
+    assert isinstance(book._runners, RawValue)
+    runner = book.runners[0]
+    assert book.runners[0] is runner
+    assert isinstance(runner._ex, RawValue)
+    assert runner.ex.available_to_back[0].size == 10.0
+    assert book.serialize() == models.MarketBook(**data).serialize()
+
+
+def test_lazy_process_result():
+    data = [{
+        'marketId': '1.1',
+        'isMarketDataDelayed': False,
+        'runners': [{'selectionId': 1, 'handicap': 0, 'status': 'ACTIVE'}],
+    }]
+    books = utils.process_result(data, models.MarketBook, lazy=True)
+    assert isinstance(books[0]._runners, RawValue)
+    assert books[0].runners[0].selection_id == 1.0
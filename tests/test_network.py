@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import responses
+
+import json
+
+from betfair import exceptions
+from betfair.constants import Endpoint, Exchange, LIST_MARKET_BOOK
+from betfair.network import Network, API_URLS, IDENTITY_URL
+
+
+@pytest.fixture
+def network():
+    return Network(app_key='test', session_token='secret')
+
+
+def test_one_session_per_endpoint(network):
+    sessions = [network.sessions[endpoint] for endpoint in Endpoint]
+    assert len(set(id(session) for session in sessions)) == len(sessions)
+
+
+def test_pool_size(network):
+    adapter = network.sessions[Endpoint.Betting].get_adapter(
+        API_URLS[Exchange.UK])
+    assert adapter._pool_maxsize == network.pool_maxsize
+
+
+def test_get_url(network):
+    assert network.get_url(Exchange.AUS, Endpoint.Account) == \
+        API_URLS[Exchange.AUS] + '/account/json-rpc/v1'
+    assert network.get_url('', Endpoint.Betting) == \
+        API_URLS[Exchange.UK] + '/betting/json-rpc/v1'
+
+
+@responses.activate
+def test_invoke_sync_uses_session(network, monkeypatch):
+    responses.add(
+        responses.POST,
+        network.get_url(Exchange.UK, Endpoint.Betting),
+        body=json.dumps({'jsonrpc': '2.0', 'result': [], 'id': 1}),
+        content_type='application/json',
+    )
+    calls = []
+    session = network.sessions[Endpoint.Betting]
+    post = session.post
+    monkeypatch.setattr(
+        session, 'post', lambda *a, **kw: calls.append(a) or post(*a, **kw))
+    result = network.invoke_sync(
+        Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK, {'market_ids': []})
+    assert result == []
+    assert len(calls) == 1
+
+
+@responses.activate
+def test_keep_alive_uses_identity_session(network):
+    responses.add(
+        responses.POST,
+        IDENTITY_URL + 'keepAlive',
+        body=json.dumps({'status': 'SUCCESS'}),
+        content_type='application/json',
+    )
+    network.keep_alive()
+    request = responses.calls[0].request
+    assert request.headers['X-Authentication'] == 'secret'
+
+
+def login_network(monkeypatch, status, cert_file):
+    responses.add(
+        responses.POST,
+        IDENTITY_URL + 'certlogin',
+        body=json.dumps({'loginStatus': status, 'sessionToken': 'token'}),
+        content_type='application/json',
+    )
+    network = Network(app_key='test', cert_file=cert_file)
+    calls = []
+    session = network.sessions[Endpoint.Identity]
+    post = session.post
+    monkeypatch.setattr(
+        session, 'post', lambda *a, **kw: calls.append(kw) or post(*a, **kw))
+    return network, calls
+
+
+@responses.activate
+def test_login_uses_cert_file(monkeypatch):
+    network, calls = login_network(
+        monkeypatch, 'SUCCESS', ['client.crt', 'client.key'])
+    network.login('name', 'pass')
+    assert network.session_token == 'token'
+    assert calls[0]['cert'] == ('client.crt', 'client.key')
+
+
+@responses.activate
+def test_login_failure(monkeypatch):
+    network, _ = login_network(
+        monkeypatch, 'INVALID_USERNAME_OR_PASSWORD', 'client.pem')
+    with pytest.raises(exceptions.BetfairLoginError) as excinfo:
+        network.login('name', 'wrong')
+    assert excinfo.value.message == 'INVALID_USERNAME_OR_PASSWORD'
+    assert not network.session_token
+
+
+@pytest.fixture
+def stub_results():
+    return {LIST_MARKET_BOOK: [{'marketId': '1.1'}] * 100}
+
+
+@pytest.mark.parametrize('gzip_compress, accept_encoding', [
+    (True, 'gzip, deflate'),
+    (False, 'identity'),
+])
+@responses.activate
+def test_accept_encoding_header(gzip_compress, accept_encoding):
+    responses.add(
+        responses.POST,
+        API_URLS[Exchange.UK] + '/betting/json-rpc/v1',
+        body=json.dumps({'jsonrpc': '2.0', 'result': [], 'id': 1}),
+        content_type='application/json',
+    )
+    network = Network(
+        app_key='test', session_token='secret', gzip_compress=gzip_compress)
+    network.invoke_sync(
+        Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK, {'market_ids': []})
+    request = responses.calls[0].request
+    assert request.headers['Accept-Encoding'] == accept_encoding
+
+
+def test_gzip_response(stub_server):
+    network = Network(
+        app_key='test', session_token='secret', api_url=stub_server.url,
+        gzip_compress=True)
+    result = network.invoke_sync(
+        Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK, {'market_ids': []})
+    assert len(result) == 100
+    stats = network.last_transfer
+    assert stats.response_bytes > 1000
+    assert stats.response_wire_bytes < stats.response_bytes / 10
+    assert network.transfer_totals.calls == 1
+    network.close()
+
+
+def test_uncompressed_response(stub_server):
+    network = Network(
+        app_key='test', session_token='secret', api_url=stub_server.url,
+        gzip_compress=False)
+    network.invoke_sync(
+        Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK, {'market_ids': []})
+    stats = network.last_transfer
+    assert stats.response_wire_bytes == stats.response_bytes
+    network.close()
+
+
+def test_gzip_request(stub_server):
+    network = Network(
+        app_key='test', session_token='secret', api_url=stub_server.url,
+        compress_request_min_size=1024)
+    market_ids = ['1.{0}'.format(idx) for idx in range(200)]
+    network.invoke_sync(
+        Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK,
+        {'market_ids': market_ids})
+    stats = network.last_transfer
+    assert stats.request_wire_bytes < stats.request_bytes
+    assert json.loads(stub_server.requests[-1].decode('utf-8'))[
+        'params']['marketIds'] == market_ids
+    network.close()
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from betfair import models
+from betfair.constants import OrderStatus, OrderType, PersistenceType, Side
+from betfair.orders import Order, OrderManager
+from tests.utils import Clock
+
+
+def place_report(bet_id, side='BACK', price=3.0, size=10.0, matched=0.0,
+                 selection_id='1', market_id='1.1'):
+    report = {
+        'status': 'SUCCESS',
+        'instruction': {
+            'orderType': 'LIMIT',
+            'selectionId': selection_id,
+            'handicap': 0.0,
+            'side': side,
+            'limitOrder': {
+                'size': size, 'price': price, 'persistenceType': 'LAPSE',
+            },
+        },
+        'betId': bet_id,
+        'sizeMatched': matched,
+    }
+    if matched:
+        report['averagePriceMatched'] = price
+    return {
+        'status': 'SUCCESS',
+        'marketId': market_id,
+        'instructionReports': [report],
+    }
+
+
+def cancel_report(bet_id, cancelled):
+    return models.CancelExecutionReport(**{
+        'status': 'SUCCESS',
+        'marketId': '1.1',
+        'instructionReports': [{
+            'status': 'SUCCESS',
+            'instruction': {'betId': bet_id},
+            'sizeCancelled': cancelled,
+        }],
+    })
+
+
+@pytest.fixture
+def manager():
+    return OrderManager()
+
+
+def test_apply_place(manager):
+    orders = manager.apply_place(place_report('100', matched=4.0))
+    order = manager.get('100')
+    assert orders == [order]
+    assert order.market_id == '1.1'
+    assert order.selection_id == '1'
+    assert order.side == Side.BACK
+    assert order.size_matched == 4.0
+    assert order.size_remaining == 6.0
+    assert order.status == OrderStatus.EXECUTABLE
+    assert manager.market_orders('1.1') == [order]
+    assert manager.runner_orders('1.1', '1') == [order]
+
+
+def test_apply_place_failure(manager):
+    report = place_report('100')
+    report['instructionReports'][0]['status'] = 'FAILURE'
+    assert manager.apply_place(report) == []
+    assert manager.get('100') is None
+
+
+def test_apply_place_fully_matched(manager):
+    manager.apply_place(place_report('100', matched=10.0))
+    assert manager.get('100').status == OrderStatus.EXECUTION_COMPLETE
+    assert manager.executable_orders() == []
+
+
+def test_position(manager):
+    manager.apply_place(place_report('100', 'BACK', 3.0, 10.0, matched=10.0))
+    manager.apply_place(place_report('101', 'LAY', 2.5, 4.0, matched=4.0))
+    manager.apply_place(place_report('102', 'LAY', 2.0, 5.0))
+    position = manager.position('1.1', '1')
+    assert position.back_stake == 10.0
+    assert position.back_profit == 20.0
+    assert position.lay_stake == 4.0
+    assert position.lay_liability == 6.0
+    assert position.lay_unmatched == 5.0
+    assert position.lay_unmatched_liability == 5.0
+    assert position.if_win == 14.0
+    assert position.if_lose == -6.0
+
+
+def test_position_mixed_selection_id_types(manager):
+    manager.apply_place(place_report('100', 'BACK', 3.0, 10.0, matched=10.0))
+    manager.add(Order(
+        '101', '1.1', 1, side=Side.LAY, price=2.0, size=4.0,
+        average_price_matched=2.0, size_matched=4.0))
+    manager.add(Order(
+        '102', '1.1', 1.0, handicap=0, side=Side.BACK, price=2.0, size=5.0))
+    for selection_id in ('1', 1, 1.0):
+        position = manager.position('1.1', selection_id)
+        assert position.back_stake == 10.0
+        assert position.lay_stake == 4.0
+        assert position.back_unmatched == 5.0
+        assert len(manager.runner_orders('1.1', selection_id, 0)) == 3
+    assert manager.market_position('1.1').profit_if_wins(1.0) == 16.0
+    assert manager.position('1.1', 1.5).matched == 0.0
+
+
+def test_market_position(manager):
+    manager.apply_place(place_report('100', 'BACK', 3.0, 10.0, 10.0, '1'))
+    manager.apply_place(place_report('101', 'BACK', 4.0, 5.0, 5.0, '2'))
+    market = manager.market_position('1.1')
+    assert market.if_lose == -15.0
+    assert market.profit_if_wins('1') == 20.0 - 5.0
+    assert market.profit_if_wins('2') == 15.0 - 10.0
+    assert market.profit_if_wins('3') == -15.0
+    assert market.worst_case() == -15.0
+    assert market.exposure == 15.0
+    assert market.unmatched_exposure == 0.0
+
+
+def test_apply_cancel(manager):
+    manager.apply_place(place_report('100', 'LAY', 3.0, 10.0, matched=4.0))
+    assert manager.position('1.1', '1').lay_unmatched == 6.0
+    manager.apply_cancel(cancel_report('100', 6.0))
+    order = manager.get('100')
+    assert order.size_cancelled == 6.0
+    assert order.size_remaining == 0.0
+    assert order.status == OrderStatus.EXECUTION_COMPLETE
+    position = manager.position('1.1', '1')
+    assert position.lay_unmatched == 0.0
+    assert position.lay_stake == 4.0
+
+
+def test_apply_cancel_unknown_bet(manager):
+    assert manager.apply_cancel(cancel_report('999', 1.0)) == []
+
+
+def test_apply_replace(manager):
+    manager.apply_place(place_report('100', price=3.0, size=10.0))
+    new_place = place_report('101', price=3.5, size=10.0)
+    report = models.ReplaceExecutionReport(**{
+        'status': 'SUCCESS',
+        'marketId': '1.1',
+        'instructionReports': [{
+            'status': 'SUCCESS',
+            'cancelInstructionReport': {
+                'status': 'SUCCESS',
+                'instruction': {'betId': '100'},
+                'sizeCancelled': 10.0,
+            },
+            'placeInstructionReport': new_place['instructionReports'][0],
+        }],
+    })
+    orders = manager.apply(report)
+    assert [order.bet_id for order in orders] == ['101']
+    assert not manager.get('100').executable
+    assert manager.get('101').price == 3.5
+    assert manager.position('1.1', '1').back_unmatched == 10.0
+
+
+def test_apply_update(manager):
+    manager.apply_place(place_report('100'))
+    manager.apply(models.UpdateExecutionReport(**{
+        'status': 'SUCCESS',
+        'instructionReports': [{
+            'status': 'SUCCESS',
+            'instruction': {'betId': '100', 'newPersistenceType': 'PERSIST'},
+        }],
+    }))
+    assert manager.get('100').persistence_type == PersistenceType.PERSIST
+
+
+def test_reconcile(manager):
+    manager.apply_place(place_report('100', 'BACK', 3.0, 10.0))
+    count = manager.reconcile(models.CurrentOrderSummaryReport(**{
+        'currentOrders': [{
+            'betId': '100', 'marketId': '1.1', 'selectionId': '1',
+            'handicap': 0.0, 'priceSize': {'price': 3.0, 'size': 10.0},
+            'bspLiability': 0.0, 'side': 'BACK', 'status': 'EXECUTABLE',
+            'persistenceType': 'LAPSE', 'orderType': 'LIMIT',
+            'averagePriceMatched': 3.0, 'sizeMatched': 7.0,
+            'sizeRemaining': 3.0,
+        }],
+        'moreAvailable': False,
+    }))
+    assert count == 1
+    assert manager.get('100').size_matched == 7.0
+    position = manager.position('1.1', '1')
+    assert position.back_stake == 7.0
+    assert position.back_unmatched == 3.0
+    assert manager.reconciled_at is not None
+
+
+class Client(object):
+
+    def __init__(self, orders=()):
+        self.orders = list(orders)
+        self.calls = []
+        self.cancel_status = 'SUCCESS'
+
+    def iter_current_orders(self, **kwargs):
+        self.calls.append(kwargs)
+        return iter(self.orders)
+
+    def cancel_orders(self, market_id, instructions, customer_ref=None):
+        self.calls.append(market_id)
+        return models.CancelExecutionReport(**{
+            'status': self.cancel_status,
+            'marketId': market_id,
+            'instructionReports': [],
+        })
+
+
+def test_maybe_reconcile():
+    clock = Clock()
+    client = Client()
+    manager = OrderManager(client, reconcile_interval=60, timer=clock)
+    assert manager.maybe_reconcile()
+    clock.now = 30
+    assert not manager.maybe_reconcile()
+    clock.now = 61
+    assert manager.maybe_reconcile(market_ids=['1.1'])
+    assert client.calls == [{}, {'market_ids': ['1.1']}]
+
+
+def current_order(bet_id, market_id='1.1', matched=0.0):
+    return {
+        'betId': bet_id, 'marketId': market_id, 'selectionId': '1',
+        'handicap': 0.0, 'priceSize': {'price': 3.0, 'size': 10.0},
+        'bspLiability': 0.0, 'side': 'LAY', 'status': 'EXECUTABLE',
+        'persistenceType': 'LAPSE', 'orderType': 'LIMIT',
+        'sizeMatched': matched, 'sizeRemaining': 10.0 - matched,
+    }
+
+
+def test_reconcile_completes_missing_orders():
+    clock = Clock()
+    client = Client([
+        current_order('100'), current_order('101'),
+        current_order('200', market_id='1.2'),
+    ])
+    manager = OrderManager(client, reconcile_interval=60, timer=clock)
+    manager.maybe_reconcile()
+    assert manager.position('1.1', '1').lay_unmatched == 20.0
+    # Bet 101 lapsed and bet 200 was cancelled elsewhere
+    client.orders = [current_order('100')]
+    clock.now = 61
+    manager.maybe_reconcile(market_ids=['1.1'])
+    order = manager.get('101')
+    assert order.status == OrderStatus.EXECUTION_COMPLETE
+    assert order.size_remaining == 0.0
+    assert manager.position('1.1', '1').lay_unmatched == 10.0
+    assert manager.market_position('1.1').unmatched_exposure == 20.0
+    # Outside the queried markets
+    assert manager.get('200').executable
+    clock.now = 122
+    client.orders = []
+    manager.maybe_reconcile()
+    assert manager.executable_orders() == []
+
+
+def test_reconcile_partial_snapshot_keeps_orders(manager):
+    manager.apply_place(place_report('100'))
+    manager.reconcile([])
+    assert manager.get('100').executable
+    manager.reconcile([], complete=True, known=set())
+    assert manager.get('100').executable
+    manager.reconcile([], complete=True)
+    assert not manager.get('100').executable
+
+
+def test_remove_and_clear_market(manager):
+    manager.apply_place(place_report('100', matched=10.0))
+    manager.apply_place(place_report('101', market_id='1.2'))
+    manager.remove('100')
+    assert manager.position('1.1', '1').back_stake == 0
+    manager.clear_market('1.2')
+    assert manager.get('101') is None
+    assert manager.market_orders('1.2') == []
+
+
+def test_cancel_orders_without_market(manager):
+    manager.client = Client()
+    manager.apply_place(place_report('100', matched=4.0))
+    manager.apply_place(place_report('101', market_id='1.2'))
+    manager.cancel_orders()
+    assert manager.client.calls == [None]
+    assert manager.executable_orders() == []
+    assert manager.get('100').size_cancelled == 6.0
+    assert manager.get('101').size_cancelled == 10.0
+    assert manager.position('1.1', '1').back_unmatched == 0.0
+
+
+def test_cancel_orders_market(manager):
+    manager.client = Client()
+    manager.apply_place(place_report('100'))
+    manager.apply_place(place_report('101', market_id='1.2'))
+    manager.cancel_orders('1.1')
+    assert [order.bet_id for order in manager.executable_orders()] == ['101']
+
+
+def test_cancel_orders_failure_keeps_orders(manager):
+    manager.client = Client()
+    manager.client.cancel_status = 'FAILURE'
+    manager.apply_place(place_report('100'))
+    manager.cancel_orders()
+    assert manager.get('100').executable
+    assert manager.position('1.1', '1').back_unmatched == 10.0
+
+
+def test_update_market_on_close_order_stays_executable(manager):
+    manager.add(Order(
+        '100', '1.1', '1', side=Side.BACK,
+        order_type=OrderType.MARKET_ON_CLOSE, bsp_liability=10.0))
+    manager.update('100', persistence_type=PersistenceType.MARKET_ON_CLOSE)
+    assert manager.get('100').executable
+
+
+def test_order_defaults():
+    order = Order('1', '1.1', '5', price=2.0, size=10.0, size_matched=4.0)
+    assert order.size_remaining == 6.0
+    assert order.handicap == 0.0
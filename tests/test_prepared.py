@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+import responses
+
+from betfair import models
+from betfair.constants import PriceData, DECODE_BYTES, LIST_MARKET_BOOK
+from betfair.network import make_json_request
+from betfair.prepared import PreparedCall
+from tests.utils import add_response
+
+
+MARKET_BOOK = {
+    'marketId': '1.1',
+    'isMarketDataDelayed': False,
+    'runners': [{'selectionId': 1, 'handicap': 0.0, 'status': 'ACTIVE'}],
+}
+
+PROJECTION = models.PriceProjection(price_data=[PriceData.EX_BEST_OFFERS])
+
+
+def request_json(call):
+    body = call.request.body
+    return json.loads(body.decode('utf-8') if isinstance(body, bytes) else body)
+
+
+def test_render_matches_encoded_request(client):
+    prepared = client.prepare('market_ids').list_market_book(
+        ['1.1'], price_projection=PROJECTION)
+    assert isinstance(prepared, PreparedCall)
+    assert prepared.render() == make_json_request(
+        LIST_MARKET_BOOK, prepared.params, client.network_client.codec)
+    params = json.loads(
+        prepared.render(market_ids=['1.2', '1.3']).decode('utf-8'))['params']
+    assert params['marketIds'] == ['1.2', '1.3']
+    assert params['priceProjection']['priceData'] == ['EX_BEST_OFFERS']
+
+
+def test_invalid_variables(client):
+    with pytest.raises(ValueError):
+        client.prepare('market_id').list_market_book(['1.1'])
+    prepared = client.prepare().list_market_book(['1.1'])
+    with pytest.raises(ValueError):
+        prepared.render(market_ids=['1.2'])
+
+
+@responses.activate
+def test_call(client):
+    add_response(client, [MARKET_BOOK])
+    prepared = client.prepare('market_ids').list_market_book(
+        ['1.1'], price_projection=PROJECTION)
+    books = prepared()
+    assert isinstance(books[0], models.MarketBook)
+    prepared(market_ids=['1.2'])
+    assert [
+        request_json(call)['params']['marketIds'] for call in responses.calls
+    ] == [['1.1'], ['1.2']]
+    assert client.network_client.last_call.request_bytes == \
+        len(prepared.render(market_ids=['1.2']))
+
+
+@responses.activate
+def test_call_bytes(client):
+    add_response(client, [MARKET_BOOK])
+    prepared = client.prepare().list_market_book(['1.1'], decode=DECODE_BYTES)
+    body = prepared()
+    assert json.loads(body.decode('utf-8'))['result'] == [MARKET_BOOK]
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+import pytest
+
+from betfair import models
+from betfair.constants import (
+    Endpoint, Exchange, LIST_EVENTS, LIST_MARKET_BOOK, PLACE_ORDERS,
+    CANCEL_ORDERS,
+)
+from betfair.network import Network
+from betfair.instrumentation import Instrument
+from betfair.ratelimit import (
+    Budget, RateLimiter, TokenBucket, call_cost, CATALOGUE, DATA, ORDERS,
+)
+from tests.utils import Clock
+
+
+def test_token_bucket():
+    clock = Clock()
+    bucket = TokenBucket(rate=2, burst=4, timer=clock)
+    assert bucket.wait_time(4, clock()) == 0
+    bucket.take(4, clock())
+    assert bucket.wait_time(1, clock()) == 0.5
+    clock.now = 1.0
+    assert bucket.wait_time(2, clock()) == 0
+    clock.now = 10.0
+    bucket.refill(clock())
+    assert bucket.tokens == 4
+    # Requests larger than the bucket wait for a full bucket
+    assert bucket.wait_time(10, clock()) == 0
+
+
+def test_call_cost():
+    instructions = [models.CancelInstruction(bet_id='1')] * 3
+    assert call_cost(PLACE_ORDERS, {'instructions': instructions}) == 3
+    assert call_cost(CANCEL_ORDERS, {'instructions': None}) == 1
+    assert call_cost(LIST_MARKET_BOOK, {'market_ids': ['1.1', '1.2']}) == 1
+
+
+def test_categories():
+    limiter = RateLimiter(categories={LIST_EVENTS: DATA})
+    assert limiter.category(PLACE_ORDERS) == ORDERS
+    assert limiter.category(LIST_MARKET_BOOK) == DATA
+    assert limiter.category(LIST_EVENTS) == DATA
+    assert limiter.category('AccountAPING/v1.0/getAccountFunds') == CATALOGUE
+
+
+def test_unlimited_category():
+    limiter = RateLimiter(budgets={})
+    for _ in range(100):
+        assert limiter.acquire(LIST_MARKET_BOOK) < 0.01
+
+
+def test_reserve():
+    clock = Clock()
+    limiter = RateLimiter(budgets={DATA: Budget(10, 1)}, timer=clock)
+    assert limiter.reserve(LIST_MARKET_BOOK) == 0
+    assert limiter.reserve(LIST_MARKET_BOOK) == pytest.approx(0.1)
+    assert limiter.reserve(LIST_MARKET_BOOK) == pytest.approx(0.2)
+
+
+def test_acquire_waits():
+    limiter = RateLimiter(budgets={DATA: Budget(20, 1)})
+    assert limiter.acquire(LIST_MARKET_BOOK) < 0.01
+    assert limiter.acquire(LIST_MARKET_BOOK) >= 0.04
+
+
+def test_orders_jump_queue():
+    limiter = RateLimiter(budgets={}, total=Budget(10, 1))
+    limiter.acquire(LIST_EVENTS)
+    done = []
+
+    def acquire(method):
+        limiter.acquire(method)
+        done.append(method)
+
+    threads = [
+        threading.Thread(target=acquire, args=(LIST_EVENTS, )),
+        threading.Thread(target=acquire, args=(PLACE_ORDERS, )),
+    ]
+    threads[0].start()
+    time.sleep(0.02)
+    threads[1].start()
+    for thread in threads:
+        thread.join(5)
+    assert done == [PLACE_ORDERS, LIST_EVENTS]
+
+
+def test_separate_buckets_do_not_block():
+    limiter = RateLimiter(budgets={DATA: Budget(1, 1), ORDERS: Budget(1, 1)})
+    limiter.acquire(LIST_MARKET_BOOK)
+    thread = threading.Thread(
+        target=limiter.acquire, args=(LIST_MARKET_BOOK, ))
+    thread.start()
+    time.sleep(0.02)
+    assert limiter.acquire(PLACE_ORDERS) < 0.1
+    thread.join(5)
+
+
+def test_network_queue_metrics(stub_server):
+    clock = Clock()
+    calls = []
+    instrument = Instrument()
+    instrument.after_call = calls.append
+    network = Network(
+        app_key='test', session_token='secret', api_url=stub_server.url,
+        rate_limiter=RateLimiter(
+            budgets={DATA: Budget(10, 1)}, timer=clock),
+        instruments=[instrument])
+    network.invoke_sync(
+        Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK,
+        {'market_ids': ['1.1']})
+    # The bucket is empty; the next call waits until the clock has
+    # moved on by one token
+    waiter = threading.Thread(
+        target=network.invoke_sync, args=(
+            Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK,
+            {'market_ids': ['1.1']}))
+    waiter.start()
+    time.sleep(0.05)
+    assert waiter.is_alive()
+    clock.now = 0.1
+    with network.rate_limiter.condition:
+        network.rate_limiter.condition.notify_all()
+    waiter.join(5)
+    assert not waiter.is_alive()
+    assert [call.queue for call in calls] == [0, pytest.approx(0.1)]
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+import pytest
+
+from betfair import exceptions
+from betfair.constants import (
+    Endpoint, Exchange, LIST_MARKET_BOOK, LIST_EVENTS, GET_ACCOUNT_FUNDS,
+)
+from betfair.network import Network
+from betfair.recording import (
+    Record, ReplayServer, TrafficRecorder, read_log, canonical_request,
+)
+
+
+def make_record(method, params, result, elapsed=0.0,
+                endpoint=Endpoint.Betting):
+    request = json.dumps({
+        'jsonrpc': '2.0', 'method': method, 'params': params, 'id': 1,
+    })
+    response = json.dumps({'jsonrpc': '2.0', 'result': result, 'id': 1})
+    return Record(0.0, elapsed, endpoint, method, request, 200, response)
+
+
+@pytest.fixture
+def stub_results():
+    return {LIST_MARKET_BOOK: [{'marketId': '1.1'}]}
+
+
+@pytest.mark.parametrize('name', ['traffic.log', 'traffic.log.gz'])
+def test_record(tmpdir, stub_server, name):
+    path = str(tmpdir.join(name))
+    with TrafficRecorder(path) as recorder:
+        network = Network(
+            app_key='test', session_token='secret', api_url=stub_server.url,
+            recorder=recorder)
+        network.invoke_sync(
+            Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK,
+            {'market_ids': ['1.1']})
+    records = list(read_log(path))
+    assert len(records) == 1
+    record = records[0]
+    assert record.endpoint == Endpoint.Betting
+    assert record.method == LIST_MARKET_BOOK
+    assert record.status == 200
+    assert json.loads(record.request)['params'] == {'marketIds': ['1.1']}
+    assert json.loads(record.response)['result'] == [{'marketId': '1.1'}]
+    assert record.elapsed >= 0
+    assert 'secret' not in open(path, 'rb').read().decode('latin-1')
+
+
+def test_read_log_skips_truncated_line(tmpdir):
+    path = tmpdir.join('traffic.log')
+    with TrafficRecorder(str(path)) as recorder:
+        recorder.record(
+            Endpoint.Account, GET_ACCOUNT_FUNDS, b'{}', 200, b'{}', 1.0, 0.1)
+    path.write('{"t": 2', mode='a')
+    assert len(list(read_log(str(path)))) == 1
+
+
+def test_canonical_request():
+    assert canonical_request('{"b": 1, "a": [1, 2]}') == \
+        canonical_request(b'{"a":[1,2],"b":1}')
+
+
+@pytest.fixture
+def replay_server():
+    server = ReplayServer([
+        make_record(LIST_MARKET_BOOK, {'marketIds': ['1.1']}, ['one']),
+        make_record(LIST_MARKET_BOOK, {'marketIds': ['1.2']}, ['two']),
+        make_record(LIST_MARKET_BOOK, {'marketIds': ['1.1']}, ['three']),
+    ], speed=None)
+    yield server.start()
+    server.stop()
+
+
+@pytest.fixture
+def replay_network(replay_server):
+    return Network(
+        app_key='test', session_token='secret', api_url=replay_server.url)
+
+
+def list_market_book(network, market_ids):
+    return network.invoke_sync(
+        Exchange.UK, Endpoint.Betting, LIST_MARKET_BOOK,
+        {'market_ids': market_ids})
+
+
+def test_replay_matches_request(replay_network):
+    assert list_market_book(replay_network, ['1.2']) == ['two']
+    assert list_market_book(replay_network, ['1.1']) == ['one']
+    assert list_market_book(replay_network, ['1.1']) == ['three']
+    # Loops once all replies are served
+    assert list_market_book(replay_network, ['1.1']) == ['one']
+
+
+def test_replay_falls_back_to_method(replay_network):
+    assert list_market_book(replay_network, ['1.9']) == ['one']
+    assert list_market_book(replay_network, ['1.9']) == ['two']
+
+
+def test_replay_unknown_method(replay_network):
+    with pytest.raises(exceptions.BetfairAPIError):
+        replay_network.invoke_sync(
+            Exchange.UK, Endpoint.Betting, LIST_EVENTS, {})
+
+
+def test_replay_speed():
+    server = ReplayServer(
+        [make_record(LIST_MARKET_BOOK, {}, [], elapsed=0.2)], speed=4)
+    server.start()
+    try:
+        network = Network(
+            app_key='test', session_token='secret', api_url=server.url)
+        start = time.time()
+        list_market_book(network, [])
+        assert time.time() - start >= 0.05
+    finally:
+        server.stop()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+import pytest
+
+from betfair import exceptions, models
+from betfair.betfair import Betfair
+from betfair.constants import BetStatus, DECODE_RAW, Side
+from betfair.settlements import ClearedOrderStore, format_date, main
+
+
+def cleared_order(bet_id, settled_date, profit, market_id='1.1',
+                  event_type_id='7'):
+    return {
+        'betId': bet_id,
+        'eventTypeId': event_type_id,
+        'eventId': '100',
+        'marketId': market_id,
+        'selectionId': 1,
+        'handicap': 0.0,
+        'side': 'BACK',
+        'placedDate': '2016-01-01T10:00:00.000Z',
+        'settledDate': settled_date,
+        'priceMatched': 2.0,
+        'sizeSettled': 10.0,
+        'profit': profit,
+    }
+
+
+class Client(object):
+
+    def __init__(self, orders):
+        self.orders = orders
+        self.calls = []
+
+    def iter_cleared_orders(self, bet_status, decode=None, **kwargs):
+        self.calls.append(kwargs)
+        assert decode == DECODE_RAW
+        return iter(self.orders)
+
+
+@pytest.fixture
+def store(tmpdir):
+    store = ClearedOrderStore(str(tmpdir.join('settled.db')))
+    yield store
+    store.close()
+
+
+def test_format_date():
+    assert format_date('2016-01-01T12:00:00Z') == '2016-01-01T12:00:00.000Z'
+    assert format_date('2016-01-01T13:00:00.5+01:00') == \
+        '2016-01-01T12:00:00.500Z'
+    assert format_date(datetime.datetime(2016, 1, 1)) == \
+        '2016-01-01T00:00:00.000Z'
+
+
+def test_sync_is_incremental(store):
+    client = Client([
+        cleared_order('1', '2016-01-01T12:00:00.000Z', 10.0),
+        cleared_order('2', '2016-01-02T12:00:00.000Z', -5.0),
+    ])
+    assert store.sync(client, batch_size=1) == 2
+    assert client.calls == [{}]
+    assert store.high_water() == '2016-01-02T12:00:00.000Z'
+
+    # The next sync starts from the high-water mark, less the overlap;
+    # orders fetched again replace those stored
+    client.orders = [
+        cleared_order('2', '2016-01-02T12:00:00.000Z', -5.0),
+        cleared_order('3', '2016-01-03T12:00:00.000Z', 2.0),
+    ]
+    assert store.sync(client, overlap=datetime.timedelta(hours=1)) == 2
+    time_range = client.calls[1]['settled_date_range']
+    assert time_range.from_ == '2016-01-02T11:00:00.000Z'
+    assert len(store) == 3
+    assert store.high_water() == '2016-01-03T12:00:00.000Z'
+    assert store.high_water(BetStatus.VOIDED) is None
+
+
+def test_sync_without_orders(store):
+    assert store.sync(Client([])) == 0
+    assert store.high_water() is None
+
+
+def test_profit_by(store):
+    store.add([
+        cleared_order('1', '2016-01-01T09:00:00.000Z', 10.0, '1.1', '7'),
+        cleared_order('2', '2016-01-01T18:00:00.000Z', -4.0, '1.2', '7'),
+        cleared_order('3', '2016-01-02T12:00:00.000Z', 1.5, '1.2', '1'),
+    ])
+    assert [tuple(row) for row in store.profit_by('day')] == [
+        ('2016-01-01', 2, 20.0, 6.0, 0.0),
+        ('2016-01-02', 1, 10.0, 1.5, 0.0),
+    ]
+    assert [(row.key, row.profit) for row in store.profit_by('market')] == [
+        ('1.1', 10.0), ('1.2', -2.5),
+    ]
+    rows = store.profit_by(
+        'event_type', settled_from=datetime.datetime(2016, 1, 1, 12))
+    assert [(row.key, row.profit) for row in rows] == [('1', 1.5), ('7', -4.0)]
+    with pytest.raises(ValueError):
+        store.profit_by('runner')
+
+
+def test_orders(store):
+    store.add([
+        cleared_order('2', '2016-01-02T12:00:00.000Z', 1.0),
+        cleared_order('1', '2016-01-01T12:00:00.000Z', 2.0),
+    ])
+    orders = list(store.orders())
+    assert [order.bet_id for order in orders] == ['1', '2']
+    assert isinstance(orders[0], models.ClearedOrderSummary)
+    assert orders[0].side == Side.BACK
+    raw = list(store.orders(
+        settled_to='2016-01-02T00:00:00Z', decode=DECODE_RAW))
+    assert raw == [cleared_order('1', '2016-01-01T12:00:00.000Z', 2.0)]
+
+
+def test_report_command(store, capsys):
+    store.add([cleared_order('1', '2016-01-01T12:00:00.000Z', 2.0)])
+    main(['report', store.path, '--by', 'market'])
+    out, _ = capsys.readouterr()
+    assert out == '1.1\t1\t10.00\t2.00\t0.00\n'
+
+
+def test_sync_command_login_failure(store, monkeypatch, capsys):
+    def login(client, username, password):
+        raise exceptions.BetfairLoginError(
+            None, {'loginStatus': 'INVALID_USERNAME_OR_PASSWORD'})
+
+    def sync(*args):
+        raise AssertionError('synced without a session')
+
+    for name in ('APP_KEY', 'CERT_FILE', 'USERNAME', 'PASSWORD'):
+        monkeypatch.setenv('BETFAIR_' + name, 'test')
+    monkeypatch.setattr(Betfair, 'login', login)
+    monkeypatch.setattr(ClearedOrderStore, 'sync', sync)
+    with pytest.raises(SystemExit) as excinfo:
+        main(['sync', store.path])
+    assert excinfo.value.code == 1
+    _, err = capsys.readouterr()
+    assert 'INVALID_USERNAME_OR_PASSWORD' in err
+
+
+def test_export_parquet(store, tmpdir):
+    pyarrow_parquet = pytest.importorskip('pyarrow.parquet')
+    store.add([cleared_order('1', '2016-01-01T12:00:00.000Z', 2.0)])
+    path = str(tmpdir.join('settled.parquet'))
+    store.export_parquet(path)
+    table = pyarrow_parquet.read_table(path)
+    assert table.column('bet_id').to_pylist() == ['1']
+    assert table.column('profit').to_pylist() == [2.0]
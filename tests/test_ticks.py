@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+import responses
+
+from betfair import ticks
+from betfair import models
+from betfair import exceptions
+from tests.utils import add_response
+
+
+def test_tick_table():
+    assert len(ticks.TICKS) == 350
+    assert ticks.TICKS[:3] == (1.01, 1.02, 1.03)
+    assert ticks.MAX_PRICE == 1000.0
+    assert ticks.TICKS == tuple(sorted(set(ticks.TICKS)))
+    assert ticks.is_tick(3.05)
+    assert ticks.is_tick(1.1 + 0.2)
+    assert not ticks.is_tick(3.01)
+    assert not ticks.is_tick(1000.5)
+
+
+@pytest.mark.parametrize('price, rounding, expected', [
+    (3.01, ticks.ROUND_NEAREST, 3.0),
+    (3.03, ticks.ROUND_NEAREST, 3.05),
+    (3.01, ticks.ROUND_UP, 3.05),
+    (3.04, ticks.ROUND_DOWN, 3.0),
+    (2.0, ticks.ROUND_UP, 2.0),
+    (0.5, ticks.ROUND_NEAREST, 1.01),
+    (2000, ticks.ROUND_NEAREST, 1000.0),
+])
+def test_nearest_tick(price, rounding, expected):
+    assert ticks.nearest_tick(price, rounding) == expected
+
+
+def test_tick_arithmetic():
+    assert ticks.tick_offset(1.99, 2) == 2.02
+    assert ticks.tick_offset(2.02, -2) == 1.99
+    assert ticks.tick_offset(1.02, -5) == 1.01
+    assert ticks.tick_distance(1.99, 2.02) == 2
+    assert ticks.tick_distance(2.02, 1.99) == -2
+    with pytest.raises(exceptions.InvalidPriceError):
+        ticks.tick_offset(2.01, 1)
+
+
+def test_batch_functions():
+    assert ticks.nearest_ticks([3.01, 3.03]) == [3.0, 3.05]
+    assert ticks.tick_offsets([2.0, 3.0], 1) == [2.02, 3.05]
+    assert ticks.tick_offsets([2.0, 3.0], [1, -1]) == [2.02, 2.98]
+    assert ticks.tick_distances([2.0, 3.0], [2.04, 2.9]) == [2, -5]
+
+
+def test_check_instruction_prices():
+    limit_order = models.LimitOrder(
+        size=2, price=2.01, persistence_type='LAPSE')
+    # Models accept any price
+    assert limit_order.price == 2.01
+    place = models.PlaceInstruction(
+        order_type='LIMIT', selection_id='1', side='BACK',
+        limit_order=limit_order)
+    with pytest.raises(exceptions.InvalidPriceError):
+        ticks.check_instruction_prices([place])
+    with pytest.raises(exceptions.InvalidPriceError):
+        ticks.check_instruction_prices([
+            models.ReplaceInstruction(bet_id='1', new_price=3.01)])
+    with pytest.raises(exceptions.InvalidPriceError):
+        ticks.check_instruction_prices([{'betId': '1', 'newPrice': 3.01}])
+    ticks.check_instruction_prices([
+        models.ReplaceInstruction(bet_id='1', new_price=3.05),
+        {'limitOrder': {'price': 2.02}},
+        models.CancelInstruction(bet_id='1'),
+    ])
+
+
+def test_reports_accept_prices_off_the_ladder():
+    report = models.PlaceExecutionReport(**{
+        'status': 'SUCCESS',
+        'marketId': '1.1',
+        'instructionReports': [{
+            'status': 'SUCCESS',
+            'betId': '100',
+            'instruction': {
+                'orderType': 'LIMIT', 'selectionId': '1', 'side': 'BACK',
+                'limitOrder': {
+                    'size': 2.0, 'price': 2.015, 'persistenceType': 'LAPSE',
+                },
+            },
+        }],
+    })
+    assert report.instruction_reports[0].bet_id == '100'
+    assert report.instruction_reports[0].instruction.limit_order.price == \
+        2.015
+
+
+@responses.activate
+def test_client_validates_prices(client):
+    add_response(client, {
+        'status': 'SUCCESS', 'marketId': '1.1', 'instructionReports': [],
+    })
+    instructions = [models.ReplaceInstruction(bet_id='1', new_price=3.01)]
+    with pytest.raises(exceptions.InvalidPriceError):
+        client.replace_orders('1.1', instructions)
+    assert len(responses.calls) == 0
+    client.replace_orders('1.1', instructions, validate_prices=False)
+    client.validate_prices = False
+    client.replace_orders('1.1', instructions)
+    assert len(responses.calls) == 2
+    body = responses.calls[0].request.body
+    params = json.loads(
+        body.decode('utf-8') if isinstance(body, bytes) else body)['params']
+    assert sorted(params) == ['customerRef', 'instructions', 'marketId']
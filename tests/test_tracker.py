@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from betfair import models
+from betfair.tracker import MarketBookTracker, LadderChange, MarketChange
+
+
+def make_book(version, back, lay=None, status='OPEN'):
+    return {
+        'marketId': '1.1',
+        'isMarketDataDelayed': False,
+        'status': status,
+        'inplay': False,
+        'version': version,
+        'runners': [{
+            'selectionId': 10,
+            'handicap': 0.0,
+            'status': 'ACTIVE',
+            'ex': {
+                'availableToBack': [
+                    {'price': price, 'size': size} for price, size in back
+                ],
+                'availableToLay': [
+                    {'price': price, 'size': size} for price, size in lay or []
+                ],
+            },
+        }],
+    }
+
+
+@pytest.mark.parametrize('model', [None, models.MarketBook,
+                                   models.LadderMarketBook])
+def test_ladder_changes(model):
+    def decode(book):
+        return book if model is None else model(**book)
+    tracker = MarketBookTracker()
+    events = tracker.update([decode(make_book(1, [(2.0, 10), (1.98, 5)]))])
+    assert events[0] == MarketChange('1.1', 1, 'OPEN', False)
+    assert len(events) == 3
+    state = tracker.markets['1.1']
+    runner = state.runner(10)
+    events = tracker.update([decode(make_book(1, [(2.0, 12), (1.96, 3)]))])
+    assert events == [
+        LadderChange('1.1', 10, 0.0, 'available_to_back', 2.0, 12.0),
+        LadderChange('1.1', 10, 0.0, 'available_to_back', 1.96, 3.0),
+        LadderChange('1.1', 10, 0.0, 'available_to_back', 1.98, 0.0),
+    ]
+    assert tracker.markets['1.1'] is state
+    assert state.runner(10) is runner
+    assert runner.ladders['available_to_back'] == {2.0: 12.0, 1.96: 3.0}
+    assert runner.best('available_to_back') == (2.0, 12.0)
+    assert runner.best('available_to_lay') is None
+
+
+def test_unchanged_and_stale_books():
+    tracker = MarketBookTracker()
+    tracker.update([make_book(2, [(2.0, 10)])])
+    assert tracker.update([make_book(2, [(2.0, 10)])]) == []
+    assert tracker.update([make_book(1, [(3.0, 10)])]) == []
+    events = tracker.update([make_book(3, [(2.0, 10)], status='SUSPENDED')])
+    assert events == [MarketChange('1.1', 3, 'SUSPENDED', False)]
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+from betfair import utils
+from betfair.models import MarketFilter
+
+
+def test_get_chunks():
+    assert utils.get_chunks([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+
+
+def test_iter_concurrent_keeps_order():
+    def func(chunk):
+        # Earlier chunks finish last
+        time.sleep(0.01 * (5 - chunk[0]))
+        return [item * 10 for item in chunk]
+    chunks = utils.get_chunks(list(range(6)), 1)
+    results = list(utils.iter_concurrent(func, chunks, max_workers=6))
+    assert results == [0, 10, 20, 30, 40, 50]
+
+
+def test_iter_concurrent_bounds_window():
+    lock = threading.Lock()
+    state = {'started': 0}
+
+    def func(chunk):
+        with lock:
+            state['started'] += 1
+        return chunk
+    chunks = utils.get_chunks(list(range(20)), 1)
+    iterator = utils.iter_concurrent(func, chunks, max_workers=2, window=3)
+    assert next(iterator) == 0
+    time.sleep(0.05)
+    # The first chunk has been consumed; at most `window` more are queued
+    assert state['started'] <= 4
+    assert list(iterator) == list(range(1, 20))
+
+
+def test_with_market_ids():
+    market_filter = MarketFilter(event_type_ids=['7'], in_play_only=True)
+    out = utils.with_market_ids(market_filter, ['1.1', '1.2'])
+    assert out == {
+        'eventTypeIds': ['7'],
+        'inPlayOnly': True,
+        'marketIds': ['1.1', '1.2'],
+    }
+    assert utils.with_market_ids(None, ['1.1']) == {'marketIds': ['1.1']}
+
+
+def orders_page(bet_ids, more_available):
+    return {
+        'currentOrders': [{'betId': bet_id} for bet_id in bet_ids],
+        'moreAvailable': more_available,
+    }
+
+
+def test_iter_pages_follows_more_available():
+    pages = {
+        0: orders_page(['1', '2'], True),
+        2: orders_page(['3', '4'], True),
+        4: orders_page(['5'], False),
+    }
+    calls = []
+
+    def fetch(start):
+        calls.append(start)
+        return pages[start]
+    records = list(utils.iter_pages(fetch, 'current_orders'))
+    assert [record['betId'] for record in records] == ['1', '2', '3', '4', '5']
+    assert calls == [0, 2, 4]
+
+
+def test_iter_pages_skips_duplicates_across_pages():
+    # A new order shifted bet 2 onto the second page
+    pages = {
+        0: orders_page(['1', '2'], True),
+        2: orders_page(['2', '3'], False),
+    }
+    records = utils.iter_pages(pages.get, 'current_orders', prefetch=False)
+    assert [record['betId'] for record in records] == ['1', '2', '3']
+
+
+def test_iter_pages_prefetches_next_page():
+    fetched = threading.Event()
+
+    def fetch(start):
+        if start:
+            fetched.set()
+            return orders_page(['2'], False)
+        return orders_page(['1'], True)
+    iterator = utils.iter_pages(fetch, 'current_orders')
+    assert next(iterator) == {'betId': '1'}
+    assert fetched.wait(1)
+    assert list(iterator) == [{'betId': '2'}]
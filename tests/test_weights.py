@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from betfair import weights
+from betfair.constants import MarketProjection, PriceData
+from betfair.models import ExBestOffersOverrides, PriceProjection
+
+
+@pytest.mark.parametrize(('price_data', 'expected'), [
+    ([], 2),
+    ([PriceData.EX_BEST_OFFERS], 5),
+    ([PriceData.EX_TRADED, PriceData.EX_BEST_OFFERS], 20),
+    ([PriceData.EX_ALL_OFFERS, PriceData.EX_TRADED], 32),
+    ([PriceData.SP_AVAILABLE, PriceData.SP_TRADED], 10),
+    (['EX_ALL_OFFERS', 'EX_TRADED', 'SP_TRADED'], 39),
+])
+def test_market_book_weight(price_data, expected):
+    projection = PriceProjection(price_data=price_data)
+    assert weights.market_book_weight(projection) == expected
+    assert weights.market_book_weight(projection.serialize()) == expected
+
+
+def test_market_book_weight_without_projection():
+    assert weights.market_book_weight(None) == 2
+
+
+def test_market_book_weight_best_prices_depth():
+    projection = PriceProjection(
+        price_data=[PriceData.EX_BEST_OFFERS],
+        ex_best_offers_overrides=ExBestOffersOverrides(best_prices_depth=6),
+    )
+    assert weights.market_book_weight(projection) == 10
+
+
+def test_market_catalogue_weight():
+    assert weights.market_catalogue_weight(None) == 0
+    assert weights.market_catalogue_weight([
+        MarketProjection.EVENT,
+        MarketProjection.MARKET_DESCRIPTION,
+        MarketProjection.RUNNER_METADATA,
+    ]) == 2
+
+
+def test_plan_chunks():
+    market_ids = [str(idx) for idx in range(20)]
+    chunks = weights.plan_chunks(market_ids, 32)
+    assert [len(chunk) for chunk in chunks] == [6, 6, 6, 2]
+    assert sum(chunks, []) == market_ids
+
+
+def test_plan_chunks_zero_weight():
+    market_ids = [str(idx) for idx in range(20)]
+    assert weights.plan_chunks(market_ids, 0) == [market_ids]
+    assert len(weights.plan_chunks(market_ids, 0, max_size=8)) == 3
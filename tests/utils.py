@@ -5,12 +5,55 @@ import responses
 
 import json
 
+from betfair.betfair import Betfair
+from betfair.constants import Endpoint, Exchange
+
 
 noop = lambda *args, **kwargs: None
 
 
+class Clock(object):
+    """Fake timer that only moves when `now` is set."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(**kwargs):
+    """Build a logged-in `Betfair` client on the UK exchange.
+
+    :param dict kwargs: Client options, e.g. `cache`
+    """
+    client = Betfair('test', 'path/to/cert', Exchange.UK, **kwargs)
+    client.network_client.session_token = 'secret'
+    return client
+
+
+def add_body(client, body, endpoint=Endpoint.Betting):
+    """Respond to the next call on `endpoint` with a JSON `body`."""
+    responses.add(
+        responses.POST,
+        client.network_client.get_url(Exchange.UK, endpoint),
+        body=json.dumps(body),
+        content_type='application/json',
+    )
+
+
+def add_response(client, result, endpoint=Endpoint.Betting):
+    """Respond to the next call on `endpoint` with a JSON-RPC `result`.
+
+    :returns: Encoded response body
+    """
+    body = {'jsonrpc': '2.0', 'id': 1, 'result': result}
+    add_body(client, body, endpoint)
+    return json.dumps(body)
+
+
 def response_fixture_factory(url, data):
-    @pytest.yield_fixture
+    @pytest.fixture
     def fixture():
         responses.add(
             responses.POST,